@@ -0,0 +1,146 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from mostlyai.domain import Accuracy
+
+# the number of bins of numeric and datetime columns, and the number of top categories of categorical columns;
+# all other categories are combined into one bin, and missing values are kept in a bin of their own
+DEFAULT_BINS = 10
+
+
+def _to_float(s: pd.Series) -> np.ndarray:
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        s = s.dt.tz_convert(None)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        values = s.to_numpy(dtype="datetime64[ns]").view("int64").astype("float64")
+        values[s.isna().to_numpy()] = np.nan
+        return values
+    return s.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _is_numeric(s: pd.Series) -> bool:
+    return (
+        pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+    ) or pd.api.types.is_datetime64_any_dtype(s)
+
+
+def _discretize(
+    original: pd.Series, synthetic: pd.Series, bins: int
+) -> tuple[np.ndarray, np.ndarray, int]:
+    # map both series onto the same bins, that are derived from the original; returns the codes and the number of bins
+    if _is_numeric(original) and _is_numeric(synthetic):
+        trn, syn = _to_float(original), _to_float(synthetic)
+        finite = trn[~np.isnan(trn)]
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        edges = np.unique(np.quantile(finite, quantiles)) if len(finite) else finite
+        n_bins = len(edges) + 2
+        codes = []
+        for values in (trn, syn):
+            code = np.searchsorted(edges, values, side="right")
+            code[np.isnan(values)] = n_bins - 1
+            codes.append(code)
+        return codes[0], codes[1], n_bins
+    if original.dtype != synthetic.dtype:
+        # compare the values by their string representation, e.g. for integers that are sampled as strings
+        original = original.astype(str).where(original.notna())
+        synthetic = synthetic.astype(str).where(synthetic.notna())
+    # the categories of the original are ranked by their frequency, and the codes are looked up by their rank
+    trn_codes, uniques = pd.factorize(original)
+    counts = np.bincount(trn_codes[trn_codes >= 0], minlength=len(uniques))
+    top = np.argsort(-counts, kind="stable")[:bins]
+    n_bins = len(top) + 2
+    ranks = np.full(len(uniques) + 1, n_bins - 2)  # other categories
+    ranks[top] = np.arange(len(top))
+    ranks[-1] = n_bins - 1  # missing values, as coded by -1
+    trn = ranks[trn_codes]
+    syn = pd.Index(uniques[top]).get_indexer(synthetic)
+    syn[syn == -1] = n_bins - 2
+    syn[synthetic.isna().to_numpy()] = n_bins - 1
+    return trn, syn, n_bins
+
+
+def _accuracy(original: np.ndarray, synthetic: np.ndarray, n_bins: int) -> float:
+    # 1 - the total variation distance of the binned frequencies
+    trn = np.bincount(original, minlength=n_bins) / len(original)
+    syn = np.bincount(synthetic, minlength=n_bins) / len(synthetic)
+    return max(0.0, 1 - 0.5 * np.abs(trn - syn).sum())
+
+
+def _successors(df: pd.DataFrame, sequence_key: str) -> tuple[np.ndarray, np.ndarray]:
+    # the positions of all rows, that are followed by a row of the same sequence, and of their successors
+    keys = pd.factorize(df[sequence_key])[0]
+    order = np.argsort(keys, kind="stable")
+    same = keys[order][1:] == keys[order][:-1]
+    return order[:-1][same], order[1:][same]
+
+
+def compute_accuracy(
+    original: pd.DataFrame,
+    synthetic: pd.DataFrame,
+    sequence_key: Optional[str] = None,
+    max_pairs: int = 1_000,
+    bins: int = DEFAULT_BINS,
+    seed: int = 0,
+) -> Accuracy:
+    columns = [
+        c for c in original.columns if c in synthetic.columns and c != sequence_key
+    ]
+    if not columns:
+        raise ValueError("original and synthetic data have no columns in common")
+    if len(original) == 0 or len(synthetic) == 0:
+        raise ValueError("original and synthetic data must not be empty")
+
+    discretized = [_discretize(original[c], synthetic[c], bins) for c in columns]
+    univariate = [_accuracy(trn, syn, n) for trn, syn, n in discretized]
+
+    # the joint bins of a pair are encoded as a single code, thus all histograms are computed via `bincount`; for
+    # wide tables the pairs are sampled, as their number grows quadratically with the number of columns
+    rng = np.random.default_rng(seed)
+    pairs = np.column_stack(np.triu_indices(len(columns), k=1))
+    if len(pairs) > max_pairs:
+        pairs = pairs[rng.choice(len(pairs), size=max_pairs, replace=False)]
+    bivariate = []
+    for i, j in pairs:
+        (trn_i, syn_i, n_i), (trn_j, syn_j, n_j) = discretized[i], discretized[j]
+        bivariate.append(_accuracy(trn_i * n_j + trn_j, syn_i * n_j + syn_j, n_i * n_j))
+
+    # coherence compares the bins of successive values within the same sequence
+    coherence = []
+    if sequence_key is not None:
+        (trn_prev, trn_next), (syn_prev, syn_next) = (
+            _successors(original, sequence_key),
+            _successors(synthetic, sequence_key),
+        )
+        if len(trn_prev) and len(syn_prev):
+            for trn, syn, n in discretized:
+                coherence.append(
+                    _accuracy(
+                        trn[trn_prev] * n + trn[trn_next],
+                        syn[syn_prev] * n + syn[syn_next],
+                        n * n,
+                    )
+                )
+
+    metrics = {
+        "univariate": float(np.mean(univariate)),
+        "bivariate": float(np.mean(bivariate)) if bivariate else None,
+        "coherence": float(np.mean(coherence)) if coherence else None,
+    }
+    available = [v for v in metrics.values() if v is not None]
+    return Accuracy(overall=float(np.mean(available)), **metrics)
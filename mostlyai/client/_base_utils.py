@@ -14,15 +14,122 @@
 
 import base64
 import io
+import os
+import shutil
+import struct
+import threading
+import zipfile
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Union, Any, Literal
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Union, Any, Literal
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import csv
 
+if TYPE_CHECKING:
+    import polars as pl
+
 warnings.simplefilter("always", DeprecationWarning)
 
+# the tables returned for the `return_type` "auto", "dict", "arrow" and "polars"; polars is an optional dependency,
+# and thus only imported for type checking
+DataTable = Union[pd.DataFrame, pa.Table, "pl.DataFrame"]
+DataTables = Union[DataTable, dict[str, DataTable]]
+
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+MEMORY_BUDGET = 4_000_000_000
+
+_THREAD_NAME_PREFIX = "mostlyai"
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP_LOCAL_HEADER_SIZE = 30  # without its variable-length file name and extra field
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    # lazily create the thread pool, that is shared by all encoding and decoding tasks
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix=_THREAD_NAME_PREFIX
+            )
+        return _executor
+
+
+class _MemoryBudget:
+    """
+    A weighted semaphore, that bounds the estimated number of bytes held by concurrently running tasks.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> int:
+        # a single task larger than the budget is admitted, once it is the only one running
+        size = min(max(size, 0), self.limit)
+        with self._condition:
+            while self.used > 0 and self.used + size > self.limit:
+                self._condition.wait()
+            self.used += size
+        return size
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+_memory_budget = _MemoryBudget(MEMORY_BUDGET)
+
+
+def estimate_size(data: Any) -> int:
+    # estimate the number of bytes, that are held in memory while encoding `data`
+    if isinstance(data, pd.DataFrame):
+        # deep, so that the strings of object columns are accounted for, as these usually dominate the size
+        return int(data.memory_usage(index=True, deep=True).sum())
+    if isinstance(data, pa.Table):
+        return data.nbytes
+    if isinstance(data, (str, Path)) and os.path.isfile(data):
+        return os.path.getsize(data)
+    return 0
+
+
+def parallel_map(
+    fn: Callable[[Any], Any],
+    items: list[Any],
+    sizes: Optional[list[int]] = None,
+) -> list[Any]:
+    """
+    Apply `fn` to all `items` on the shared thread pool, and return the results in order.
+
+    The optional `sizes` are the estimated bytes held by each task. Tasks are only started as long as
+    their total stays within the global memory budget.
+    """
+    items = list(items)
+    sizes = sizes or [0] * len(items)
+    # run sequentially for trivial workloads, and when being called from within the pool itself
+    if len(items) <= 1 or threading.current_thread().name.startswith(
+        _THREAD_NAME_PREFIX
+    ):
+        return [fn(item) for item in items]
+
+    def run(item: Any, size: int) -> Any:
+        size = _memory_budget.acquire(size)
+        try:
+            return fn(item)
+        finally:
+            _memory_budget.release(size)
+
+    executor = get_executor()
+    futures = [executor.submit(run, item, size) for item, size in zip(items, sizes)]
+    return [future.result() for future in futures]
+
 
 def convert_to_base64(
     df: Union[pd.DataFrame, list[dict[str, Any]]],
@@ -42,24 +149,330 @@ def convert_to_base64(
     return base64_encoded_str
 
 
+def encode_seed(
+    seed: Union[pd.DataFrame, pa.Table, str, Path, list[dict[str, Any]]],
+    format: Optional[Literal["parquet", "jsonl"]] = None,
+) -> tuple[str, Literal["parquet", "jsonl"]]:
+    """
+    Encode seed data as base64-encoded Parquet file, respectively JSONL file.
+
+    If no `format` is provided, then any seed, including lists of dictionaries, is converted to Parquet via Arrow,
+    without building an intermediate DataFrame, and without serializing it row by row. Only seeds with values of
+    mixed types within a column are serialized as JSONL, to be sent as `sample_seed_dict`. Parquet files are passed
+    on as is.
+
+    Args:
+        seed: The seed data, as DataFrame, Arrow table, list of dictionaries, or path to a file.
+        format: The format to encode to. If None, the format is chosen based on the seed.
+
+    Returns:
+        The base64-encoded seed, and the format it has been encoded to.
+    """
+    if isinstance(seed, (str, Path)):
+        if str(seed).lower().endswith((".pqt", ".parquet")) and format != "jsonl":
+            return base64.b64encode(Path(seed).read_bytes()).decode(), "parquet"
+        _, seed = read_table_from_path(seed)
+    if isinstance(seed, list):
+        if format == "jsonl":
+            return convert_to_base64(seed, format="jsonl"), "jsonl"
+        try:
+            seed = pa.Table.from_pylist(seed)
+        except pa.ArrowException:
+            try:
+                # e.g. numpy datetimes of a unit, that Arrow does not support
+                seed = pa.Table.from_pandas(pd.DataFrame(seed), preserve_index=False)
+            except pa.ArrowException:
+                # values of mixed types within a column can only be represented in JSONL
+                return convert_to_base64(seed, format="jsonl"), "jsonl"
+    elif isinstance(seed, pd.DataFrame):
+        if format == "jsonl":
+            return convert_to_base64(seed, format="jsonl"), "jsonl"
+        seed = pa.Table.from_pandas(seed, preserve_index=False)
+    elif not isinstance(seed, pa.Table):
+        raise ValueError(
+            "seed must be a DataFrame, an Arrow table, a list of dictionaries or a file path"
+        )
+    if format == "jsonl":
+        return convert_to_base64(seed.to_pandas(), format="jsonl"), "jsonl"
+    sink = pa.BufferOutputStream()
+    pq.write_table(seed, sink)
+    return base64.b64encode(sink.getvalue()).decode(), "parquet"
+
+
+def encode_tables(tables: list[Any], read_paths: bool = True) -> list[Any]:
+    """
+    Convert the `data` of the provided table configurations to base64-encoded Parquet files.
+
+    The tables are read and encoded concurrently. Only dictionaries are processed, any other entries are
+    considered to be encoded already. If `read_paths` is true, then `data` provided as `str` or `Path` is
+    read from disk, otherwise it is considered to be encoded already.
+
+    Returns:
+        The table configurations, whereas dictionaries with `data` are shallow copies, so that the provided
+        dictionaries keep referring to the original data.
+    """
+    tables = [
+        dict(table)
+        if isinstance(table, dict) and table.get("data") is not None
+        else table
+        for table in tables
+    ]
+    pending = []
+    for table in tables:
+        if not isinstance(table, dict) or table.get("data") is None:
+            continue
+        if isinstance(table["data"], pd.DataFrame):
+            pending.append(table)
+        elif isinstance(table["data"], (str, Path)):
+            if read_paths:
+                pending.append(table)
+        else:
+            raise ValueError("data must be a DataFrame or a file path")
+
+    def encode(table: dict[str, Any]) -> None:
+        if isinstance(table["data"], (str, Path)):
+            name, df = read_table_from_path(table["data"])
+            table["data"] = convert_to_base64(df)
+            if "name" not in table:
+                table["name"] = name
+            del df
+        else:
+            table["data"] = convert_to_base64(table["data"])
+
+    parallel_map(encode, pending, sizes=[estimate_size(t["data"]) for t in pending])
+    return tables
+
+
+def index_parquet_parts(names: list[str]) -> dict[str, list[str]]:
+    # map each table to its parquet files, given the file names of a `<table>/<part>.parquet` layout
+    parts = {}
+    for name in sorted(names):
+        table, _, filename = name.partition("/")
+        if filename.endswith(".parquet"):
+            parts.setdefault(table, []).append(name)
+    return parts
+
+
+def read_parquet_parts(
+    parts: dict[str, list[str]],
+    read: Callable[[str], Any],
+    columns: Union[list[str], dict[str, list[str]], None] = None,
+    filters: Union[list, dict[str, list], None] = None,
+) -> dict[str, pa.Table]:
+    """
+    Decode the parquet files of all tables concurrently, and concatenate them to one Arrow table per table.
+
+    Args:
+        parts: The parquet files per table, as returned by `index_parquet_parts`.
+        read: Maps a parquet file name to a source, that can be read by `pyarrow.parquet.read_table`.
+        columns: The columns to read, either for all tables, or as dictionary per table.
+        filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as dictionary
+            per table. Filters are pushed down into the parquet reader, and thus allow skipping of row groups.
+
+    Returns:
+        A dictionary mapping table names to Arrow tables.
+    """
+    tasks = [(table, name) for table, names in parts.items() for name in names]
+
+    def read_part(task: tuple[str, str]) -> pa.Table:
+        table, name = task
+        table_columns = columns.get(table) if isinstance(columns, dict) else columns
+        table_filters = filters.get(table) if isinstance(filters, dict) else filters
+        return pq.read_table(read(name), columns=table_columns, filters=table_filters)
+
+    part_tables = parallel_map(read_part, tasks)
+    tables = {}
+    for (table, _), part_table in zip(tasks, part_tables):
+        tables.setdefault(table, []).append(part_table)
+    return {
+        table: pa.concat_tables(part_tables, promote_options="default")
+        for table, part_tables in tables.items()
+    }
+
+
+def _zip_member_offset(source: pa.Buffer, info: zipfile.ZipInfo) -> int:
+    # the member data starts right after its local file header, which may carry a different extra field than the
+    # central directory, and thus needs to be read; see section 4.3.7 of the ZIP file format specification
+    offset = info.header_offset
+    if source.slice(offset, 4).to_pybytes() != _ZIP_LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"invalid local file header of `{info.filename}`")
+    filename_length, extra_length = struct.unpack_from("<HH", source, offset + 26)
+    return offset + _ZIP_LOCAL_HEADER_SIZE + filename_length + extra_length
+
+
+def read_parquet_archive(
+    file_path: Union[str, Path],
+    columns: Union[list[str], dict[str, list[str]], None] = None,
+    filters: Union[list, dict[str, list], None] = None,
+) -> dict[str, pa.Table]:
+    """
+    Read the parquet files of a ZIP archive, without extracting it.
+
+    The archive is memory-mapped, and the byte ranges of members, that are stored without compression, are handed
+    to pyarrow without copying them first. Compressed members are decompressed into memory instead. Either way, the
+    returned tables are decoded into memory.
+
+    Args:
+        file_path: The path to the ZIP archive, with a `<table>/<part>.parquet` layout.
+        columns: The columns to read, either for all tables, or as dictionary per table.
+        filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as dictionary
+            per table.
+
+    Returns:
+        A dictionary mapping table names to Arrow tables.
+    """
+    with zipfile.ZipFile(file_path, "r") as z:
+        # the buffer keeps the mapping alive for as long as any Arrow buffer refers to it
+        with pa.memory_map(str(file_path), "r") as mmap:
+            source = mmap.read_buffer()
+        infos = {info.filename: info for info in z.infolist()}
+        parts = index_parquet_parts(list(infos))
+        stored = {
+            name: _zip_member_offset(source, infos[name])
+            for names in parts.values()
+            for name in names
+            if infos[name].compress_type == zipfile.ZIP_STORED
+            and not infos[name].flag_bits & 0x1  # encrypted
+        }
+
+        def read(name: str) -> pa.BufferReader:
+            if name in stored:
+                return pa.BufferReader(
+                    source.slice(stored[name], infos[name].file_size)
+                )
+            return pa.BufferReader(z.read(name))
+
+        return read_parquet_parts(parts, read=read, columns=columns, filters=filters)
+
+
+def extract_parquet_archive(
+    file_path: Union[str, Path], target_dir: Union[str, Path]
+) -> Path:
+    """
+    Extract the parquet files of a ZIP archive into a `<table>/<part>.parquet` directory layout, that can be
+    scanned with `pyarrow.dataset`. Members are streamed to disk, without loading them into memory.
+
+    Args:
+        file_path: The path to the ZIP archive.
+        target_dir: The directory to extract the archive into.
+
+    Returns:
+        The path to the target directory.
+    """
+    target_dir = Path(target_dir).resolve()
+    with zipfile.ZipFile(file_path, "r") as z:
+        names = [
+            name
+            for names in index_parquet_parts(z.namelist()).values()
+            for name in names
+        ]
+
+        def extract(name: str) -> None:
+            target = (target_dir / name).resolve()
+            if not target.is_relative_to(target_dir):
+                raise ValueError(f"invalid archive member `{name}`")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with z.open(name) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        parallel_map(extract, names)
+    return target_dir
+
+
+def convert_tables(
+    tables: dict[str, pa.Table],
+    return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+) -> DataTables:
+    """
+    Convert Arrow tables into the requested return type.
+
+    Args:
+        tables: A dictionary mapping table names to Arrow tables.
+        return_type: "auto" and "dict" return pandas DataFrames, "arrow" returns Arrow tables, and "polars" returns
+            polars DataFrames. With "auto", "arrow" and "polars", a single table is returned as is, rather than as
+            a dictionary.
+
+    Returns:
+        A single table, or a dictionary mapping table names to tables.
+    """
+    if return_type not in ("auto", "dict", "arrow", "polars"):
+        raise ValueError(f"unsupported return_type `{return_type}`")
+    if return_type == "polars":
+        try:
+            import polars as pl
+        except ImportError as e:
+            raise ImportError(
+                "return_type='polars' requires polars; install it via `pip install polars`"
+            ) from e
+        data = {
+            table: pl.from_arrow(arrow_table) for table, arrow_table in tables.items()
+        }
+    elif return_type == "arrow":
+        data = tables
+    else:
+        data = {}
+        for table, arrow_table in tables.items():
+            data[table] = arrow_table.to_pandas()
+            data[table].name = table
+    if return_type != "dict" and len(data) == 1:
+        return list(data.values())[0]
+    return data
+
+
+def _is_parquet(fn: str) -> bool:
+    return fn.lower().endswith((".pqt", ".parquet"))
+
+
+def _csv_delimiter(fn: str) -> str:
+    delimiter = ","
+    if fn.lower().endswith((".csv", ".tsv")):
+        try:
+            with open(fn) as f:
+                header = f.readline()
+            sniffer = csv.Sniffer()
+            delimiter = sniffer.sniff(header, ",;|\t' :").delimiter
+        except csv.Error:
+            # happens for example for single column CSV files
+            pass
+    return delimiter
+
+
+def table_name_from_path(path: Union[str, Path]) -> str:
+    fn = str(path)
+    if fn.lower().endswith((".gz", ".gzip", ".bz2")):
+        fn = fn.rsplit(".", 1)[0]
+    return Path(fn).stem
+
+
 def read_table_from_path(path: Union[str, Path]) -> (str, pd.DataFrame):
     # read data from file
     fn = str(path)
-    if fn.lower().endswith((".pqt", ".parquet")):
+    if _is_parquet(fn):
         df = pd.read_parquet(fn)
     else:
-        delimiter = ","
-        if fn.lower().endswith((".csv", ".tsv")):
-            try:
-                with open(fn) as f:
-                    header = f.readline()
-                sniffer = csv.Sniffer()
-                delimiter = sniffer.sniff(header, ",;|\t' :").delimiter
-            except csv.Error:
-                # happens for example for single column CSV files
-                pass
-        df = pd.read_csv(fn, low_memory=False, delimiter=delimiter)
-    if fn.lower().endswith((".gz", ".gzip", ".bz2")):
-        fn = fn.rsplit(".", 1)[0]
-    name = Path(fn).stem
-    return name, df
+        df = pd.read_csv(fn, low_memory=False, delimiter=_csv_delimiter(fn))
+    return table_name_from_path(fn), df
+
+
+def read_table_batches_from_path(
+    path: Union[str, Path], batch_size: int = 100_000
+) -> tuple[str, Iterator[pd.DataFrame]]:
+    """
+    Read data from file in batches of up to `batch_size` rows, so that only one batch is held in memory at a time.
+
+    Returns:
+        The name of the table, and an iterator over its batches.
+    """
+    fn = str(path)
+    if _is_parquet(fn):
+        import pyarrow.dataset as ds
+
+        batches = (
+            batch.to_pandas()
+            for batch in ds.dataset(fn, format="parquet").to_batches(
+                batch_size=batch_size
+            )
+        )
+    else:
+        batches = pd.read_csv(fn, delimiter=_csv_delimiter(fn), chunksize=batch_size)
+    return table_name_from_path(fn), iter(batches)
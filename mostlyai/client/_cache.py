@@ -0,0 +1,255 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+DEFAULT_CACHE_SIZE_LIMIT = 10_000_000_000
+# caching of connector metadata is opt-in, as locations and schemas may change at any time
+DEFAULT_METADATA_CACHE_TTL = 0
+
+_TEMP_PREFIX = ".tmp-"
+_TEMP_MAX_AGE = 24 * 60 * 60
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class DiskCache:
+    """
+    An on-disk cache of directories with a size limit and least-recently-used eviction.
+
+    Entries are written into a temporary directory first, and then atomically renamed into place. Thus,
+    multiple processes can share the same cache directory, without ever observing a partially written entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        size_limit: int = DEFAULT_CACHE_SIZE_LIMIT,
+    ):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.size_limit = size_limit
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return f"DiskCache(cache_dir='{self.cache_dir}', size_limit={self.size_limit})"
+
+    def _entry_path(self, key: tuple[Any, ...]) -> Path:
+        name = "__".join(re.sub(r"[^\w.-]", "_", str(part)) for part in key)
+        return self.cache_dir / name
+
+    def get(self, key: tuple[Any, ...]) -> Optional[Path]:
+        """
+        Return the directory of a cached entry, or None if the key is not cached.
+        """
+        path = self._entry_path(key)
+        if not path.is_dir():
+            return None
+        # mark the entry as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None  # evicted by a concurrent process
+        return path
+
+    def put(
+        self, key: tuple[Any, ...], write: Callable[[Path], None]
+    ) -> Optional[Path]:
+        """
+        Create a cached entry by calling `write` with an empty directory, and return its final location.
+
+        Returns None, if the entry on its own exceeds the size limit, and thus is not cached.
+        """
+        path = self._entry_path(key)
+        tmp_path = Path(tempfile.mkdtemp(prefix=_TEMP_PREFIX, dir=self.cache_dir))
+        try:
+            write(tmp_path)
+            if _dir_size(tmp_path) > self.size_limit:
+                return None
+            os.rename(tmp_path, path)
+        except OSError:
+            # another process has already stored that same entry
+            if not path.is_dir():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """
+        Remove least recently used entries until the cache fits within its size limit. The entry at `keep`, e.g. the
+        one just written, is never removed.
+        """
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if not path.is_dir():
+                continue
+            try:
+                if path.name.startswith(_TEMP_PREFIX):
+                    # clean up leftovers of crashed processes
+                    if path.stat().st_mtime < time.time() - _TEMP_MAX_AGE:
+                        shutil.rmtree(path, ignore_errors=True)
+                    continue
+                entries.append((path.stat().st_mtime, _dir_size(path), path))
+            except FileNotFoundError:
+                continue  # evicted by a concurrent process
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.size_limit:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total_size -= size
+
+    def clear(self) -> None:
+        """
+        Remove all cached entries.
+        """
+        for path in self.cache_dir.iterdir():
+            if path.is_dir() and not path.name.startswith(_TEMP_PREFIX):
+                self._remove(path)
+
+    def _remove(self, path: Path) -> None:
+        # rename first, so that the entry disappears atomically for other processes
+        tmp_path = Path(tempfile.mkdtemp(prefix=_TEMP_PREFIX, dir=self.cache_dir))
+        try:
+            os.replace(path, tmp_path / path.name)
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+class TTLCache:
+    """
+    A thread-safe in-memory cache, whose entries expire after `ttl` seconds.
+
+    Entries are keyed by tuples, and can be invalidated by any prefix of their key. Values are copied on the way in
+    and out, so that callers can not alter cached values. A `ttl` of zero disables caching.
+    """
+
+    def __init__(
+        self, ttl: float = DEFAULT_METADATA_CACHE_TTL, max_entries: int = 100_000
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"TTLCache(ttl={self.ttl}, entries={len(self._entries)})"
+
+    def get_or_set(self, key: tuple[Any, ...], fetch: Callable[[], Any]) -> Any:
+        """
+        Return the cached value of `key`, or fetch, cache and return it, if it is missing or has expired.
+        """
+        if self.ttl <= 0:
+            return fetch()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+        # fetch outside of the lock, so that multiple keys can be fetched concurrently
+        value = fetch()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *prefix: Any) -> None:
+        """
+        Remove all entries, whose key starts with `prefix`. Without a prefix, all entries are removed.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[: len(prefix)] == prefix]:
+                del self._entries[key]
+
+
+class ConditionalCache:
+    """
+    A thread-safe in-memory cache of response bodies along with their validators, i.e. their `ETag` and
+    `Last-Modified` headers, so that resources can be requested conditionally, and their bodies be reused once the
+    server answers with 304. Least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 1_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[dict[str, str], bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"ConditionalCache(entries={len(self._entries)})"
+
+    def lookup(self, key: tuple[Any, ...]) -> Optional[tuple[dict[str, str], bytes]]:
+        """
+        Return the headers to request `key` conditionally, along with its cached body, or None, if it is not cached.
+
+        Both are looked up at once, so that the body always matches the validators, even if the entry is replaced
+        concurrently.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[0]), entry[1]
+
+    @staticmethod
+    def validators(response_headers: Any) -> dict[str, str]:
+        """
+        Return the headers to request the resource of a response conditionally, i.e. empty, if it carries no validators.
+        """
+        validators = {}
+        if etag := response_headers.get("ETag"):
+            validators["If-None-Match"] = etag
+        if last_modified := response_headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+    def put(self, key: tuple[Any, ...], response_headers: Any, content: bytes) -> None:
+        """
+        Cache the body of a response, if it carries any validators. Otherwise, drop a previous entry of `key`.
+        """
+        validators = self.validators(response_headers)
+        with self._lock:
+            if not validators:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = (validators, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url: str) -> None:
+        """
+        Remove all entries of `url`, and of the resources below it.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(url)]:
+                del self._entries[key]
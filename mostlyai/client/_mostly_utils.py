@@ -12,23 +12,44 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
+import re
 import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Callable, Union, Any, Optional
+from typing import Callable, Iterator, Union, Any, Optional
 
+import httpx
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import rich
 from rich.progress import (
     Progress,
     TextColumn,
     BarColumn,
+    DownloadColumn,
     TaskProgressColumn,
     TimeElapsedColumn,
+    TransferSpeedColumn,
+    TaskID,
 )
 from rich.style import Style
 
-from mostlyai.client._base_utils import convert_to_base64, read_table_from_path
+from mostlyai.client._base_utils import (
+    encode_seed,
+    estimate_size,
+    get_executor,
+    parallel_map,
+    read_table_batches_from_path,
+    read_table_from_path,
+    table_name_from_path,
+)
 from mostlyai.domain import (
+    JobProgress,
+    ProgressStep,
     StepCode,
     ProgressStatus,
     Generator,
@@ -40,6 +61,17 @@ from mostlyai.domain import (
     SyntheticDataset,
 )
 from mostlyai.client._naming_conventions import map_camel_to_snake_case
+from mostlyai.client.base import GET, _MostlyBaseClient
+from mostlyai.client.exceptions import APIError, APIStatusError
+from mostlyai.client.progress import (
+    JobFinished,
+    JobStarted,
+    ProgressUpdated,
+    StepFailed,
+    StepFinished,
+    StepStarted,
+    job_events,
+)
 
 
 def job_wait(
@@ -47,8 +79,6 @@ def job_wait(
     interval: float,
     progress_bar: bool = True,
 ) -> None:
-    # ensure that interval is at least 1 sec
-    interval = max(interval, 1)
     # retrieve current JobProgress
     job = get_progress()
     if progress_bar:
@@ -65,85 +95,326 @@ def job_wait(
             TimeElapsedColumn(),
         )
         progress_bars = {
-            "overall": progress.add_task(
+            None: progress.add_task(
                 description="[bold]Overall job progress[/b]",
-                start=job.start_date is not None,
+                start=False,
                 completed=0,
                 total=job.progress.max,
             )
         }
-        for step in job.steps:
-            step_code = step.step_code.value
-            if step_code == StepCode.train_model.value:
-                step_code += " :gem:"
-            progress_bars |= {
-                step.id: progress.add_task(
+
+        def task_id(step: Optional[ProgressStep]) -> TaskID:
+            if step is not None and step.id not in progress_bars:
+                step_code = step.step_code.value
+                if step_code == StepCode.train_model.value:
+                    step_code += " :gem:"
+                progress_bars[step.id] = progress.add_task(
                     description=f"Step {step.model_label or 'common'} [#808080]{step_code}[/]",
-                    start=step.start_date is not None,
+                    start=False,
                     completed=0,
                     total=step.progress.max,
                 )
-            }
+            return progress_bars[step.id if step is not None else None]
+
+        for step in job.steps:
+            task_id(step)
+        progress.start()
+    step = None
     try:
+        # the progress bars are rendered from the same events, that `training.events()` yields
+        for event in job_events(get_progress, interval, job):
+            step = getattr(event, "step", None) or step
+            if isinstance(event, JobFinished):
+                if progress_bar:
+                    progress.stop_task(task_id(None))
+                else:
+                    rich.print(f"Job {event.status.lower()}")
+                return
+            if not progress_bar:
+                continue
+            if isinstance(event, JobStarted):
+                progress.start_task(task_id(None))
+            elif isinstance(event, StepStarted):
+                progress.start_task(task_id(event.step))
+            elif isinstance(event, ProgressUpdated):
+                progress.update(
+                    task_id(event.step), total=event.max, completed=event.value
+                )
+            elif isinstance(event, StepFinished):
+                progress.stop_task(task_id(event.step))
+            elif isinstance(event, StepFailed):
+                # break if step has failed or been canceled
+                rich.print(
+                    f"[red]Step {step.model_label} {step.step_code.value} {step.status.lower()}"
+                )
+                return
+    except KeyboardInterrupt:
+        if step is not None:
+            rich.print(
+                f"[red]Step {step.model_label} {step.step_code.value} {step.status.lower()}"
+            )
+        return
+    finally:
         if progress_bar:
-            # loop until job has completed
-            progress.start()
+            progress.stop()
+
+
+def wait_all(
+    get_progresses: dict[str, Callable[[], JobProgress]],
+    interval: float,
+    progress_bar: bool = True,
+) -> dict[str, Optional[ProgressStatus]]:
+    """
+    Poll the progress of multiple jobs within a single loop, until all of them have ended.
+
+    Args:
+        get_progresses: A dictionary mapping a label of each job to a function that retrieves its progress.
+        interval: The interval in seconds to poll the jobs.
+        progress_bar: If true, displays an overall progress bar, as well as one progress bar per job.
+
+    Returns:
+        A dictionary mapping the label of each job to its final status.
+    """
+    interval = max(interval, 1)
+    labels = list(get_progresses)
+    statuses = {label: None for label in labels}
+    final_statuses = (
+        ProgressStatus.done,
+        ProgressStatus.failed,
+        ProgressStatus.canceled,
+    )
+    if progress_bar:
+        progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(
+                style=Style(color="rgb(245,245,245)"),
+                complete_style=Style(color="rgb(66,77,179)"),
+                finished_style=Style(color="rgb(36,219,149)"),
+                pulse_style=Style(color="rgb(245,245,245)"),
+            ),
+            TaskProgressColumn(),
+            TimeElapsedColumn(),
+        )
+        overall = progress.add_task(
+            description="[bold]Overall job progress[/b]", total=len(labels)
+        )
+        progress_bars = {
+            label: progress.add_task(description=f"Job {label}", start=False)
+            for label in labels
+        }
+        progress.start()
+    try:
         while True:
-            # sleep for interval seconds
-            time.sleep(interval)
-            # retrieve current JobProgress
-            job = get_progress()
+            pending = [
+                label for label in labels if statuses[label] not in final_statuses
+            ]
+            # the progress of all pending jobs is polled concurrently on the shared thread pool
+            jobs = parallel_map(lambda label: get_progresses[label](), pending)
+            for label, job in zip(pending, jobs):
+                statuses[label] = job.status
+                if job.end_date is not None and job.status not in final_statuses:
+                    statuses[label] = ProgressStatus.done
+                if not progress_bar:
+                    continue
+                task_id = progress_bars[label]
+                if not progress.tasks[task_id].started and job.start_date is not None:
+                    progress.start_task(task_id)
+                if job.progress is not None and job.progress.max:
+                    progress.update(
+                        task_id, total=job.progress.max, completed=job.progress.value
+                    )
+                if statuses[label] in final_statuses:
+                    if statuses[label] != ProgressStatus.done:
+                        progress.update(
+                            task_id,
+                            description=f"[red]Job {label} {statuses[label].value.lower()}",
+                        )
+                    progress.stop_task(task_id)
             if progress_bar:
-                current_task_id = progress_bars["overall"]
-                current_task = progress.tasks[current_task_id]
-                if not current_task.started and job.start_date is not None:
-                    progress.start_task(current_task_id)
-                # update progress bars
                 progress.update(
-                    current_task_id,
-                    total=job.progress.max,
-                    completed=job.progress.value,
+                    overall,
+                    completed=sum(
+                        status in final_statuses for status in statuses.values()
+                    ),
                 )
-                if current_task.started and job.end_date is not None:
-                    progress.stop_task(current_task_id)
-                for i, step in enumerate(job.steps):
-                    current_task_id = progress_bars[step.id]
-                    current_task = progress.tasks[current_task_id]
-                    if not current_task.started and step.start_date is not None:
-                        progress.start_task(current_task_id)
-                    if step.progress.max > 0:
-                        progress.update(
-                            current_task_id,
-                            total=step.progress.max,
-                            completed=step.progress.value,
-                        )
-                    if current_task.started and step.end_date is not None:
-                        progress.stop_task(current_task_id)
-                    # break if step has failed or been canceled
-                    if step.status in (ProgressStatus.failed, ProgressStatus.canceled):
-                        rich.print(
-                            f"[red]Step {step.model_label} {step.step_code.value} {step.status.lower()}"
-                        )
-                        progress.stop()
-                        return
-                # check whether we are done
-                if job.progress.value >= job.progress.max:
-                    time.sleep(1)  # give the system a moment to update the status
-                    progress.stop()
-                    return
-            else:
-                if job.end_date or job.progress in (
-                    ProgressStatus.failed,
-                    ProgressStatus.canceled,
-                ):
-                    rich.print(f"Job {job.status.lower()}")
-                    return
+            if all(status in final_statuses for status in statuses.values()):
+                return statuses
+            time.sleep(interval)
     except KeyboardInterrupt:
-        rich.print(
-            f"[red]Step {step.model_label} {step.step_code.value} {step.status.lower()}"
+        return statuses
+    finally:
+        if progress_bar:
+            progress.stop()
+
+
+def train_queue(
+    configs: list[Any],
+    create: Callable[[Any], Generator],
+    slots: int,
+    max_retries: int = 1,
+    interval: float = 2,
+    progress_bar: bool = True,
+    max_poll_errors: int = 5,
+) -> pd.DataFrame:
+    """
+    Train a queue of generators, while keeping at most `slots` trainings in flight.
+
+    The generators of the next `slots` queued configurations are created (i.e. encoded and uploaded) in the
+    background, while earlier ones are training. Trainings, that have failed, are restarted up to `max_retries`
+    times, and are queued again, if the quota does not allow for a restart right away. Errors while polling the
+    progress of a training are retried with backoff, up to `max_poll_errors` times in a row.
+
+    Args:
+        configs: The generator configurations.
+        create: Creates a generator from a configuration, without starting its training.
+        slots: The maximum number of trainings in flight.
+        max_retries: The maximum number of restarts of a failed training.
+        interval: The interval in seconds to poll the trainings.
+        progress_bar: If true, displays the number of completed trainings.
+        max_poll_errors: The maximum number of consecutive errors while polling a training, before giving up on it.
+
+    Returns:
+        A DataFrame with one row per configuration, holding the generator, its final status, the number of
+        training attempts, and the durations of the upload and the training in seconds.
+    """
+    interval = max(interval, 1)
+    slots = max(1, slots)
+    final_statuses = (
+        ProgressStatus.done,
+        ProgressStatus.failed,
+        ProgressStatus.canceled,
+    )
+    records = [
+        {
+            "name": None,
+            "generator_id": None,
+            "status": None,
+            "attempts": 0,
+            "upload_seconds": None,
+            "training_seconds": None,
+            "error": None,
+        }
+        for _ in configs
+    ]
+
+    def timed_create(i: int) -> Generator:
+        t0 = time.monotonic()
+        g = create(configs[i])
+        records[i]["upload_seconds"] = time.monotonic() - t0
+        records[i]["name"], records[i]["generator_id"] = g.name, g.id
+        return g
+
+    executor = get_executor()
+    queue = deque(range(len(configs)))
+    created: dict[int, Future] = {}
+    running: dict[int, Generator] = {}
+    started_at: dict[int, float] = {}
+    poll_errors: dict[int, int] = {}
+    next_poll: dict[
+        int, int
+    ] = {}  # the polling round, in which a training is polled next
+    rounds = 0
+    if progress_bar:
+        progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(
+                style=Style(color="rgb(245,245,245)"),
+                complete_style=Style(color="rgb(66,77,179)"),
+                finished_style=Style(color="rgb(36,219,149)"),
+                pulse_style=Style(color="rgb(245,245,245)"),
+            ),
+            TaskProgressColumn(),
+            TimeElapsedColumn(),
         )
-        progress.stop()
-        return
+        overall = progress.add_task(
+            description="[bold]Trained generators[/b]", total=len(configs)
+        )
+        progress.start()
+
+    def start(i: int, g: Generator) -> bool:
+        try:
+            g.training.start()
+        except APIStatusError:
+            if not running:
+                raise
+            return False  # the quota may be used up by other jobs, thus retry once a slot frees up
+        records[i]["attempts"] += 1
+        started_at.setdefault(i, time.monotonic())
+        running[i] = g
+        return True
+
+    def requeue(i: int, g: Generator) -> None:
+        # the generator has been created already, thus it is queued as a completed upload
+        queue.appendleft(i)
+        created[i] = Future()
+        created[i].set_result(g)
+
+    try:
+        while queue or running:
+            # encode and upload the next queued configurations, while earlier ones are training
+            for i in list(queue)[:slots]:
+                if i not in created:
+                    created[i] = executor.submit(timed_create, i)
+            # fill all free slots
+            while queue and len(running) < slots:
+                i = queue[0]
+                if running and not created[i].done():
+                    break  # poll running jobs, rather than block on the upload
+                queue.popleft()
+                try:
+                    g = created.pop(i).result()
+                    if not start(i, g):
+                        requeue(i, g)
+                        break
+                except Exception as e:
+                    records[i]["status"] = ProgressStatus.failed.value
+                    records[i]["error"] = str(e)
+            time.sleep(interval)
+            rounds += 1
+            # poll running jobs; these are few, thus sequentially, so that uploads do not delay the polling
+            for i, g in list(running.items()):
+                if next_poll.get(i, 0) > rounds:
+                    continue
+                try:
+                    job = g.training.progress()
+                except Exception as e:
+                    # errors, e.g. due to a flaky connection, are retried with backoff, rather than aborting the queue
+                    poll_errors[i] = poll_errors.get(i, 0) + 1
+                    if poll_errors[i] > max_poll_errors:
+                        del running[i]
+                        records[i]["error"] = str(e)
+                    else:
+                        next_poll[i] = rounds + int(
+                            _retry_delay(poll_errors[i]) / interval
+                        )
+                    continue
+                poll_errors.pop(i, None)
+                if job.status not in final_statuses:
+                    continue
+                del running[i]
+                records[i]["status"] = job.status.value
+                records[i]["training_seconds"] = time.monotonic() - started_at[i]
+                if (
+                    job.status == ProgressStatus.failed
+                    and records[i]["attempts"] <= max_retries
+                ):
+                    # restart the training, which resumes from the failed step, once the quota allows for it
+                    try:
+                        if not start(i, g):
+                            requeue(i, g)
+                    except APIError as e:
+                        records[i]["error"] = str(e)
+            if progress_bar:
+                completed = len(configs) - len(queue) - len(running)
+                progress.update(
+                    overall,
+                    completed=completed,
+                    description=f"[bold]Trained generators[/b] ({len(running)} running)",
+                )
+    finally:
+        if progress_bar:
+            progress.stop()
+    return pd.DataFrame(records)
 
 
 def _get_subject_table_names(generator: Generator) -> list[str]:
@@ -155,7 +426,110 @@ def _get_subject_table_names(generator: Generator) -> list[str]:
     return subject_tables
 
 
-Seed = Union[pd.DataFrame, str, Path, list[dict[str, Any]]]
+Seed = Union[pd.DataFrame, pa.Table, str, Path, list[dict[str, Any]]]
+
+
+def _get_attr(obj: Any, key: str) -> Any:
+    # read a key from either a dictionary or a pydantic model
+    if obj is None:
+        return None
+    return obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+
+def _sample_batches(
+    batches: Iterator[pd.DataFrame], n: int, seed: int
+) -> tuple[pd.DataFrame, int]:
+    # draw a uniform sample of `n` rows, by retaining the rows with the `n` smallest random keys across all batches,
+    # so that only the sample and a single batch are held in memory at a time; returns the sample and the total rows
+    rng = np.random.default_rng(seed)
+    sample, keys, total = None, np.empty(0), 0
+    for batch in batches:
+        total += len(batch)
+        sample = batch if sample is None else pd.concat([sample, batch])
+        keys = np.concatenate([keys, rng.random(len(batch))])
+        if len(keys) > n:
+            retained = np.sort(np.argpartition(keys, n)[:n])
+            sample, keys = sample.iloc[retained], keys[retained]
+    sample = sample.reset_index(drop=True) if sample is not None else pd.DataFrame()
+    return sample, total
+
+
+def subsample_tables(
+    tables: list[dict[str, Any]], seed: int = 42
+) -> list[dict[str, Any]]:
+    """
+    Subsample the `data` of the provided table configurations, prior to their upload.
+
+    Subject tables are reduced to the `max_sample_size` of their model configuration, by drawing
+    a reproducible random sample. Tables, that are linked via a context foreign key, are then reduced
+    to those rows, that refer to one of the retained keys of their parent table. File paths are
+    sampled, respectively filtered, batch by batch while being read, so that these are never held in
+    memory as a whole.
+
+    Returns:
+        Shallow copies of the table configurations, so that the provided dictionaries keep referring to
+        the original data.
+    """
+    tables = [dict(table) for table in tables]
+    for table in tables:
+        if isinstance(table.get("data"), (str, Path)):
+            table.setdefault("name", table_name_from_path(table["data"]))
+    # tables are tracked by their position, as unnamed tables can not be told apart by their name
+    positions = {
+        table["name"]: i for i, table in enumerate(tables) if table.get("name")
+    }
+
+    # determine the context relation (if any) of each table
+    context_fks = {}
+    for i, table in enumerate(tables):
+        for fk in table.get("foreign_keys") or []:
+            if _get_attr(fk, "is_context"):
+                context_fks[i] = fk
+                break
+
+    # sample subject tables
+    sampled = set()
+    for i, table in enumerate(tables):
+        data = table.get("data")
+        max_sample_size = _get_attr(table.get("model_configuration"), "max_sample_size")
+        if i in context_fks or max_sample_size is None:
+            continue
+        if isinstance(data, pd.DataFrame) and len(data) > max_sample_size:
+            table["data"] = data.sample(n=max_sample_size, random_state=seed)
+            sampled.add(i)
+        elif isinstance(data, (str, Path)):
+            _, batches = read_table_batches_from_path(data)
+            table["data"], total = _sample_batches(batches, max_sample_size, seed)
+            if total > max_sample_size:
+                sampled.add(i)
+
+    # propagate samples from parent to child tables along context relations
+    while True:
+        propagated = False
+        for i, fk in context_fks.items():
+            parent = positions.get(_get_attr(fk, "referenced_table"))
+            if i in sampled or parent not in sampled:
+                continue
+            child, parent_key = tables[i], tables[parent].get("primary_key")
+            data, column = child.get("data"), _get_attr(fk, "column")
+            if parent_key is None or not isinstance(data, (pd.DataFrame, str, Path)):
+                continue
+            keys = tables[parent]["data"][parent_key]
+            if isinstance(data, pd.DataFrame):
+                child["data"] = data[data[column].isin(keys)]
+            else:
+                _, batches = read_table_batches_from_path(data)
+                filtered = [batch[batch[column].isin(keys)] for batch in batches]
+                child["data"] = (
+                    pd.concat(filtered, ignore_index=True)
+                    if filtered
+                    else pd.DataFrame()
+                )
+            sampled.add(i)
+            propagated = True
+        if not propagated:
+            break
+    return tables
 
 
 def harmonize_sd_config(
@@ -223,42 +597,356 @@ def harmonize_sd_config(
             )
             if table.name in subject_tables:
                 configuration.sample_size = size.get(table.name)
-                configuration.sample_seed_data = (
-                    seed.get(table.name)
-                    if not isinstance(seed.get(table.name), list)
-                    else None
-                )
-                configuration.sample_seed_dict = (
-                    seed.get(table.name)
-                    if isinstance(seed.get(table.name), list)
-                    else None
-                )
+                configuration.sample_seed_data = seed.get(table.name)
             config.tables.append(
                 SyntheticTableConfig(name=table.name, configuration=configuration)
             )
 
-    # convert `sample_seed_data` to base64-encoded Parquet files
-    # convert `sample_seed_dict` to base64-encoded dictionaries
-    for table in config.tables:
-        if not table.configuration:
-            continue
-        if table.configuration.sample_seed_data is not None:
-            if isinstance(table.configuration.sample_seed_data, pd.DataFrame):
-                table.configuration.sample_seed_data = convert_to_base64(
-                    table.configuration.sample_seed_data
-                )
-            elif isinstance(table.configuration.sample_seed_data, (Path, str)):
-                _, df = read_table_from_path(table.configuration.sample_seed_data)
-                table.configuration.sample_seed_data = convert_to_base64(df)
-                del df
-            else:
-                raise ValueError("sample_seed_data must be a DataFrame or a file path")
-        if table.configuration.sample_seed_dict is not None:
-            table.configuration.sample_seed_dict = convert_to_base64(
-                table.configuration.sample_seed_dict, format="jsonl"
+    # convert seeds, including dict lists, to base64-encoded Parquet files, respectively to base64-encoded JSONL files
+    # for seeds with mixed types
+    def encode(configuration: SyntheticTableConfiguration) -> None:
+        seed = configuration.sample_seed_data
+        if seed is None and isinstance(configuration.sample_seed_dict, list):
+            seed, configuration.sample_seed_dict = configuration.sample_seed_dict, None
+        if seed is None:
+            return
+        if not isinstance(seed, (pd.DataFrame, pa.Table, str, Path, list)):
+            raise ValueError(
+                "sample_seed_data must be a DataFrame, an Arrow table, a list of dictionaries or a file path"
             )
+        value, format = encode_seed(seed)
+        if format == "jsonl":
+            configuration.sample_seed_data = None
+            configuration.sample_seed_dict = value
+        else:
+            configuration.sample_seed_data = value
+
+    # seeds of multiple tables are encoded concurrently on the shared thread pool
+    configurations = [table.configuration for table in config.tables]
+    configurations = [c for c in configurations if c is not None]
+    parallel_map(
+        encode,
+        configurations,
+        sizes=[estimate_size(c.sample_seed_data) for c in configurations],
+    )
 
     return config
 
 
 ShareableResource = Union[Connector, Generator, SyntheticDataset]
+
+
+def _split_count(n: int, shards: int) -> list[int]:
+    # split `n` into `shards` parts, that differ by at most one
+    return [n // shards + (1 if k < n % shards else 0) for k in range(shards)]
+
+
+def _split_seed(seed: Seed, shards: int) -> list[Seed]:
+    if isinstance(seed, (str, Path)):
+        _, seed = read_table_from_path(seed)
+    bounds = [0]
+    for count in _split_count(len(seed), shards):
+        bounds.append(bounds[-1] + count)
+    if isinstance(seed, pd.DataFrame):
+        return [
+            seed.iloc[a:b].reset_index(drop=True) for a, b in zip(bounds, bounds[1:])
+        ]
+    if isinstance(seed, pa.Table):
+        return [seed.slice(a, b - a) for a, b in zip(bounds, bounds[1:])]
+    return [seed[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def shard_sd_config(
+    shards: int,
+    size: Union[int, dict[str, int], None] = None,
+    seed: Union[Seed, dict[str, Seed], None] = None,
+    config: Union[SyntheticDatasetConfig, dict, None] = None,
+) -> list[tuple[Any, Any, Optional[SyntheticDatasetConfig]]]:
+    """
+    Split the sample sizes and seeds of a synthetic dataset into at most `shards` disjoint parts.
+
+    Sample sizes are split evenly, and seeds are split into consecutive chunks of rows. Sample sizes, that are
+    part of `config`, are split as well. Seeds need to be provided via `seed`, as seeds within `config` are
+    already encoded, and thus can not be split anymore. The number of shards is limited by the smallest sample
+    size, respectively seed, so that no shard is empty.
+
+    Returns:
+        A list of `(size, seed, config)` tuples, one per shard.
+    """
+    if shards < 1:
+        raise ValueError("shards must be a positive integer")
+    if isinstance(config, dict):
+        config = SyntheticDatasetConfig(**map_camel_to_snake_case(config))
+    for table in (config.tables or []) if config else []:
+        if table.configuration and (
+            table.configuration.sample_seed_data is not None
+            or table.configuration.sample_seed_dict is not None
+        ):
+            raise ValueError(
+                "seeds of a sharded synthetic dataset must be provided via `seed`"
+            )
+
+    # seeds, that are file paths, are read upfront, as their number of rows limits the number of shards
+    def read(value: Seed) -> Seed:
+        return (
+            read_table_from_path(value)[1] if isinstance(value, (str, Path)) else value
+        )
+
+    if isinstance(seed, dict):
+        seed = {table: read(v) for table, v in seed.items()}
+    elif seed is not None:
+        seed = read(seed)
+    counts = []
+    for value in (size, seed):
+        for v in value.values() if isinstance(value, dict) else [value]:
+            if v is not None:
+                counts.append(v if isinstance(v, int) else len(v))
+    for table in (config.tables or []) if config else []:
+        if table.configuration and table.configuration.sample_size is not None:
+            counts.append(table.configuration.sample_size)
+    if not counts:
+        # otherwise each shard would generate the default sample size, instead of a part of it
+        raise ValueError(
+            "a sharded synthetic dataset requires a `size`, a `seed`, or sample sizes within `config`"
+        )
+    shards = max(1, min(shards, *counts))
+
+    def split(value: Any, split_fn: Callable[[Any, int], list]) -> list:
+        if value is None:
+            return [None] * shards
+        if isinstance(value, dict):
+            parts = {table: split_fn(v, shards) for table, v in value.items()}
+            return [{table: p[k] for table, p in parts.items()} for k in range(shards)]
+        return split_fn(value, shards)
+
+    sizes = split(size, _split_count)
+    seeds = split(seed, _split_seed)
+    configs = []
+    for k in range(shards):
+        shard_config = config.model_copy(deep=True) if config else None
+        for table in (shard_config.tables or []) if shard_config else []:
+            if table.configuration and table.configuration.sample_size is not None:
+                table.configuration.sample_size = _split_count(
+                    table.configuration.sample_size, shards
+                )[k]
+        configs.append(shard_config)
+    return list(zip(sizes, seeds, configs))
+
+
+def _transfer_progress(description: str) -> Progress:
+    return Progress(
+        TextColumn(description),
+        BarColumn(
+            style=Style(color="rgb(245,245,245)"),
+            complete_style=Style(color="rgb(66,77,179)"),
+            finished_style=Style(color="rgb(36,219,149)"),
+            pulse_style=Style(color="rgb(245,245,245)"),
+        ),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeElapsedColumn(),
+    )
+
+
+def _retry_delay(attempt: int) -> float:
+    return min(2**attempt, 30)
+
+
+def _get_filename(response: httpx.Response, default: str) -> str:
+    # check if 'Content-Disposition' header is present
+    if "Content-Disposition" in response.headers:
+        content_disposition = response.headers["Content-Disposition"]
+        return re.findall("filename=(.+)", content_disposition)[0]
+    return default
+
+
+def verify_archive(file_path: Path) -> None:
+    # verify the CRC-32 checksums of all members, in case the file is a ZIP archive
+    if not zipfile.is_zipfile(file_path):
+        return
+    with zipfile.ZipFile(file_path) as z:
+        corrupt_member = z.testzip()
+    if corrupt_member is not None:
+        raise APIError(f"The archive {file_path} is corrupt at {corrupt_member!r}")
+
+
+_TRANSIENT_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+def _validator(response: httpx.Response) -> Optional[str]:
+    # the validator of a response, that can be sent as `If-Range`, which does not allow for weak ETags
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def download_file(
+    client: _MostlyBaseClient,
+    path: list[Any],
+    file_path: Union[str, Path, None],
+    default_filename: str,
+    progress_bar: bool = True,
+    max_retries: int = 3,
+    **kwargs,
+) -> Path:
+    """
+    Stream a file to disk, and resume the transfer after network errors via HTTP Range requests.
+
+    The content is written to a `.part` file next to the target, which is only renamed once it has been
+    fully received and verified. A `.part` file, that has been left over by a previous call, is resumed, given that
+    the file has not changed since, as verified via `If-Range` against the ETag stored along with it. Retries are
+    reported to the hooks of the client via `RequestEvent.attempt`.
+    """
+    file_path = Path(file_path or ".")
+    target = file_path if not file_path.is_dir() else None
+    headers = kwargs.pop("headers", {})
+    attempt = 0
+    while True:
+        part = target.with_name(f"{target.name}.part") if target else None
+        etag = part.with_name(f"{part.name}.etag") if part else None
+        validator = etag.read_text() if etag and etag.exists() else None
+        offset = part.stat().st_size if validator and part.exists() else 0
+        request_headers = headers
+        if offset:
+            request_headers = headers | {
+                "Range": f"bytes={offset}-",
+                "If-Range": validator,
+            }
+        try:
+            with client.stream(
+                verb=GET,
+                path=path,
+                headers=request_headers,
+                attempt=attempt,
+                **kwargs,
+            ) as response:
+                if target is None:
+                    # the filename is only known once the response has arrived
+                    target = file_path / _get_filename(response, default_filename)
+                    part = target.with_name(f"{target.name}.part")
+                    if (
+                        part.exists()
+                        and part.with_name(f"{part.name}.etag").exists()
+                        and response.headers.get("Accept-Ranges") == "bytes"
+                    ):
+                        continue  # resume the transfer of a previous call
+                # the server responds with the full content, if the file has changed since the partial transfer
+                resumed = response.status_code == 206
+                if resumed:
+                    total = int(response.headers["Content-Range"].rsplit("/", 1)[-1])
+                elif "Content-Length" in response.headers:
+                    total = int(response.headers["Content-Length"])
+                else:
+                    total = None
+                if "Content-Encoding" in response.headers:
+                    total = None  # sizes refer to the encoded content
+                etag = part.with_name(f"{part.name}.etag")
+                if not resumed:
+                    etag.unlink(missing_ok=True)
+                    if validator := _validator(response):
+                        etag.write_text(validator)
+                with open(part, "ab" if resumed else "wb") as f:
+                    progress = _transfer_progress(f"Downloading {target.name}")
+                    task = progress.add_task(
+                        "", total=total, completed=offset if resumed else 0
+                    )
+                    if progress_bar:
+                        progress.start()
+                    try:
+                        for chunk in response.iter_bytes():
+                            f.write(chunk)
+                            progress.advance(task, len(chunk))
+                    finally:
+                        progress.stop()
+        except APIStatusError as exc:
+            status_code = exc.status_code
+            if offset and status_code == 416:
+                # the partial file can not be resumed; thus start over
+                part.unlink(missing_ok=True)
+                etag.unlink(missing_ok=True)
+                continue
+            if status_code not in _TRANSIENT_STATUS_CODES:
+                raise
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            rich.print(f"Retrying download (attempt {attempt} of {max_retries})")
+            time.sleep(_retry_delay(attempt))
+            continue
+        except APIError:
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            rich.print(f"Resuming download (attempt {attempt} of {max_retries})")
+            time.sleep(_retry_delay(attempt))
+            continue
+        if total is not None and part.stat().st_size != total:
+            raise APIError(
+                f"Received {part.stat().st_size} of {total} bytes; call again to resume"
+            )
+        verify_archive(part)
+        part.replace(target)
+        etag.unlink(missing_ok=True)
+        return target
+
+
+class _ProgressReader(io.BufferedReader):
+    """
+    A buffered file reader, that reports the number of consumed bytes to a callback.
+    """
+
+    def __init__(self, file_path: Path, callback: Callable[[int], Any]):
+        super().__init__(io.FileIO(file_path, "rb"))
+        self.callback = callback
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.callback(len(chunk))
+        return chunk
+
+
+def upload_file(
+    client: _MostlyBaseClient,
+    path: list[Any],
+    file_path: Union[str, Path],
+    progress_bar: bool = True,
+    max_retries: int = 3,
+    **kwargs,
+) -> Any:
+    """
+    Stream a file as multipart upload in chunks, and retry the upload, if the connection could not be established.
+
+    Other errors are not retried, as the server may already have received the file, and thus a retry could import it
+    twice. Retries are reported to the hooks of the client via `RequestEvent.attempt`. ZIP archives are verified against their CRC-32 checksums before being uploaded.
+    """
+    file_path = Path(file_path)
+    verify_archive(file_path)
+    attempt = 0
+    while True:
+        progress = _transfer_progress(f"Uploading {file_path.name}")
+        task = progress.add_task("", total=file_path.stat().st_size)
+        if progress_bar:
+            progress.start()
+        try:
+            with _ProgressReader(
+                file_path, callback=lambda n: progress.advance(task, n)
+            ) as f:
+                return client.request(
+                    path=path,
+                    files={"file": (file_path.name, f)},
+                    attempt=attempt,
+                    **kwargs,
+                )
+        except APIError as exc:
+            if not isinstance(
+                exc.__cause__, (httpx.ConnectError, httpx.ConnectTimeout)
+            ):
+                raise
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            rich.print(f"Retrying upload (attempt {attempt} of {max_retries})")
+            time.sleep(_retry_delay(attempt))
+        finally:
+            progress.stop()
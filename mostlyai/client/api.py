@@ -12,15 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 from pathlib import Path
 from typing import Any, Optional, Union, Literal
 
 import pandas as pd
 import rich
 
+from mostlyai.client._cache import (
+    DEFAULT_CACHE_SIZE_LIMIT,
+    DEFAULT_METADATA_CACHE_TTL,
+    DiskCache,
+)
 from mostlyai.client.base import GET, _MostlyBaseClient
 from mostlyai.client.connectors import _MostlyConnectorsClient
 from mostlyai.client.generators import _MostlyGeneratorsClient
+from mostlyai.client.instrumentation import RequestHook
+from mostlyai.client.pipelines import Pipeline
 from mostlyai.domain import (
     Connector,
     CurrentUser,
@@ -33,20 +41,67 @@ from mostlyai.domain import (
     SourceTableConfig,
     SyntheticDatasetConfig,
     SyntheticProbeConfig,
+    SyntheticTableConfiguration,
     AboutService,
 )
 from mostlyai.client.synthetic_datasets import (
+    ShardedSyntheticDataset,
     _MostlySyntheticDatasetsClient,
     _MostlySyntheticProbesClient,
 )
-from mostlyai.client._base_utils import convert_to_base64
+from mostlyai.client._base_utils import DataTables, convert_to_base64, parallel_map
 from mostlyai.client._mostly_utils import (
     read_table_from_path,
     harmonize_sd_config,
+    shard_sd_config,
+    subsample_tables,
+    train_queue,
     Seed,
 )
 
 
+def _harmonize_generator_config(
+    config: Union[GeneratorConfig, dict, None] = None,
+    data: Union[pd.DataFrame, str, Path, None] = None,
+    name: Optional[str] = None,
+    client_side_sampling: bool = False,
+    sampling_seed: int = 42,
+) -> GeneratorConfig:
+    if data is None and config is None:
+        raise ValueError("Either config or data must be provided")
+    if data is not None and config is not None:
+        raise ValueError("Either config or data must be provided, but not both")
+    if client_side_sampling and not isinstance(config, dict):
+        raise ValueError(
+            "client_side_sampling requires a dictionary `config`, with a `max_sample_size` per table"
+        )
+    if config is not None and isinstance(config, (pd.DataFrame, str, Path)) is None:
+        # map config to data, in case user incorrectly provided data as first argument
+        data = config
+    if isinstance(data, (str, Path)):
+        name, df = read_table_from_path(data)
+        config = GeneratorConfig(
+            name=name,
+            tables=[SourceTableConfig(data=convert_to_base64(df), name=name)],
+        )
+    elif isinstance(data, pd.DataFrame):
+        df = data
+        config = GeneratorConfig(
+            name=f"DataFrame {df.shape}",
+            tables=[SourceTableConfig(data=convert_to_base64(df), name="data")],
+        )
+    if isinstance(config, dict):
+        if client_side_sampling and config.get("tables"):
+            config = {
+                **config,
+                "tables": subsample_tables(config["tables"], seed=sampling_seed),
+            }
+        config = GeneratorConfig(**config)
+    if name is not None:
+        config.name = name
+    return config
+
+
 class MostlyAI(_MostlyBaseClient):
     """
     Instantiate a client for interacting with the MOSTLY AI platform via its [Public API](https://github.com/mostly-ai/mostly-openapi/blob/main/public-api.yaml).
@@ -78,6 +133,12 @@ class MostlyAI(_MostlyBaseClient):
         api_key: The API key for authenticating. If not provided, it would rely on environment variables.
         timeout: Timeout for HTTPS requests in seconds.
         ssl_verify: Whether to verify SSL certificates.
+        cache_dir: Directory for caching the data of finished synthetic datasets on disk. If not provided, it would rely on the `MOSTLY_CACHE_DIR` environment variable, and otherwise disable caching.
+        cache_size_limit: Maximum size of the cache in bytes. Least recently used entries are evicted beyond that limit.
+        metadata_cache_ttl: Time in seconds for caching the locations and schemas of connectors in memory, e.g. 300 when crawling large connectors. Defaults to 0, i.e. no caching.
+        hooks: Hooks, that get notified about the start and the end of each request, e.g. an `InMemoryMetrics` collector. See `mostlyai.client.instrumentation`.
+        http2: Whether to use HTTP/2, so that concurrent requests are multiplexed over few connections. Requires the `h2` package, e.g. via `pip install "mostlyai[http2]"`. Note, that the synchronous HTTP/2 connections of httpcore are not thread-safe, thus concurrent requests from multiple threads, e.g. by `Connector.walk`, may occasionally fail with a protocol error.
+        request_compression: Compress large JSON request bodies, e.g. configurations with embedded data, via "gzip" or "zstd". The latter requires the `zstandard` package, e.g. via `pip install "mostlyai[zstd]"`. Responses are always requested compressed.
     """
 
     def __init__(
@@ -86,19 +147,41 @@ class MostlyAI(_MostlyBaseClient):
         api_key: Optional[str] = None,
         timeout: float = 60.0,
         ssl_verify: bool = True,
+        cache_dir: Union[str, Path, None] = None,
+        cache_size_limit: int = DEFAULT_CACHE_SIZE_LIMIT,
+        metadata_cache_ttl: float = DEFAULT_METADATA_CACHE_TTL,
+        hooks: Optional[list[RequestHook]] = None,
+        http2: bool = False,
+        request_compression: Optional[Literal["gzip", "zstd"]] = None,
     ):
         super().__init__(
-            base_url=base_url, api_key=api_key, timeout=timeout, ssl_verify=ssl_verify
+            base_url=base_url,
+            api_key=api_key,
+            timeout=timeout,
+            ssl_verify=ssl_verify,
+            hooks=hooks,
+            http2=http2,
+            request_compression=request_compression,
         )
         client_kwargs = {
             "base_url": self.base_url,
             "api_key": self.api_key,
             "timeout": self.timeout,
             "ssl_verify": self.ssl_verify,
+            "hooks": self.hooks,
+            "http2": self.http2,
+            "http_client": self._http_client,
+            "request_compression": self.request_compression,
         }
-        self.connectors = _MostlyConnectorsClient(**client_kwargs)
+        self.connectors = _MostlyConnectorsClient(
+            **client_kwargs, metadata_cache_ttl=metadata_cache_ttl
+        )
         self.generators = _MostlyGeneratorsClient(**client_kwargs)
-        self.synthetic_datasets = _MostlySyntheticDatasetsClient(**client_kwargs)
+        cache_dir = cache_dir or os.getenv("MOSTLY_CACHE_DIR")
+        cache = DiskCache(cache_dir, size_limit=cache_size_limit) if cache_dir else None
+        self.synthetic_datasets = _MostlySyntheticDatasetsClient(
+            **client_kwargs, cache=cache
+        )
         self.synthetic_probes = _MostlySyntheticProbesClient(**client_kwargs)
         try:
             version = self.about().version
@@ -278,6 +361,8 @@ class MostlyAI(_MostlyBaseClient):
         start: bool = True,
         wait: bool = True,
         progress_bar: bool = True,
+        client_side_sampling: bool = False,
+        sampling_seed: int = 42,
     ) -> Generator:
         """
         Train a generator.
@@ -328,6 +413,25 @@ class MostlyAI(_MostlyBaseClient):
             )
             ```
 
+        Example for sampling a large table on the client before uploading it:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            g = mostly.train(
+                config={
+                    'name': 'census',
+                    'tables': [
+                        {
+                            'name': 'data',
+                            'data': df_original,
+                            'model_configuration': {'max_sample_size': 100_000}
+                        }
+                    ]
+                },
+                client_side_sampling=True,
+            )
+            ```
+
         Args:
             config: The configuration parameters of the generator to be created. Either `config` or `data` must be provided.
             data: A single pandas DataFrame, or a path to a CSV or PARQUET file. Either `config` or `data` must be provided.
@@ -335,33 +439,19 @@ class MostlyAI(_MostlyBaseClient):
             start: Whether to start training immediately.
             wait: Whether to wait for training to finish.
             progress_bar: Whether to display a progress bar during training.
+            client_side_sampling: Whether to subsample the tables of a dictionary `config` to their `max_sample_size` before uploading. Files are sampled while being read. Not supported for `data`, nor for a `GeneratorConfig`.
+            sampling_seed: The random seed for a reproducible client-side sample.
 
         Returns:
             Generator: The created generator.
         """
-        if data is None and config is None:
-            raise ValueError("Either config or data must be provided")
-        if data is not None and config is not None:
-            raise ValueError("Either config or data must be provided, but not both")
-        if config is not None and isinstance(config, (pd.DataFrame, str, Path)) is None:
-            # map config to data, in case user incorrectly provided data as first argument
-            data = config
-        if isinstance(data, (str, Path)):
-            name, df = read_table_from_path(data)
-            config = GeneratorConfig(
-                name=name,
-                tables=[SourceTableConfig(data=convert_to_base64(df), name=name)],
-            )
-        elif isinstance(data, pd.DataFrame):
-            df = data
-            config = GeneratorConfig(
-                name=f"DataFrame {df.shape}",
-                tables=[SourceTableConfig(data=convert_to_base64(df), name="data")],
-            )
-        if isinstance(config, dict):
-            config = GeneratorConfig(**config)
-        if name is not None:
-            config.name = name
+        config = _harmonize_generator_config(
+            config=config,
+            data=data,
+            name=name,
+            client_side_sampling=client_side_sampling,
+            sampling_seed=sampling_seed,
+        )
         g = self.generators.create(config)
         rich.print(
             f"Created generator [link={self.base_url}/d/generators/{g.id} blue underline]{g.id}[/]"
@@ -379,6 +469,74 @@ class MostlyAI(_MostlyBaseClient):
                 )
         return g
 
+    def train_many(
+        self,
+        configs: list[Union[GeneratorConfig, dict, pd.DataFrame, str, Path]],
+        max_parallel: Optional[int] = None,
+        max_retries: int = 1,
+        progress_bar: bool = True,
+        interval: float = 2,
+        client_side_sampling: bool = False,
+        sampling_seed: int = 42,
+    ) -> pd.DataFrame:
+        """
+        Train many generators, while respecting the account's quota of parallel training jobs.
+
+        The quota is read via `me()`, and exactly that many trainings are kept in flight, while the remaining
+        ones are queued. The data of the next queued generators is encoded and uploaded, while earlier ones are
+        still training. Failed trainings are restarted up to `max_retries` times.
+
+        Example for training a generator for each CSV file of a directory:
+            ```python
+            from pathlib import Path
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            summary = mostly.train_many(list(Path("data").glob("*.csv")))
+            summary[["name", "status", "training_seconds"]]
+            ```
+
+        Args:
+            configs: The generator configurations, each as `GeneratorConfig`, dictionary, pandas DataFrame, or path to a CSV or PARQUET file.
+            max_parallel: An additional limit of trainings in flight, e.g. to leave room for other jobs.
+            max_retries: The maximum number of restarts of a failed training.
+            progress_bar: Whether to display the number of trained generators.
+            interval: The interval in seconds to poll the trainings.
+            client_side_sampling: Whether to subsample the tables of dictionary configs to their `max_sample_size` before uploading.
+            sampling_seed: The random seed for a reproducible client-side sample.
+
+        Returns:
+            pd.DataFrame: A summary with one row per configuration, holding the generator's name and ID, its final
+            status, the number of training attempts, and the upload and training durations in seconds.
+        """
+        quota = self.me().usage
+        quota = quota.parallel_training_jobs if quota else None
+        if quota is not None and quota.limit is not None:
+            slots = quota.limit - (quota.current or 0)
+        else:
+            slots = len(configs)
+        if max_parallel is not None:
+            slots = min(slots, max_parallel)
+
+        def create(config: Any) -> Generator:
+            is_data = isinstance(config, (pd.DataFrame, str, Path))
+            config = _harmonize_generator_config(
+                config=None if is_data else config,
+                data=config if is_data else None,
+                # other configurations of the queue are uploaded as they are
+                client_side_sampling=client_side_sampling and isinstance(config, dict),
+                sampling_seed=sampling_seed,
+            )
+            return self.generators.create(config)
+
+        return train_queue(
+            configs,
+            create=create,
+            slots=slots,
+            max_retries=max_retries,
+            interval=interval,
+            progress_bar=progress_bar,
+        )
+
     def generate(
         self,
         generator: Union[Generator, str, None] = None,
@@ -484,14 +642,146 @@ class MostlyAI(_MostlyBaseClient):
                 )
         return sd
 
+    def generate_sharded(
+        self,
+        generator: Union[Generator, str],
+        shards: int,
+        size: Union[int, dict[str, int], None] = None,
+        seed: Union[Seed, dict[str, Seed], None] = None,
+        config: Union[SyntheticDatasetConfig, dict, None] = None,
+        name: Optional[str] = None,
+        computes: Union[bool, list[str]] = False,
+        start: bool = True,
+        wait: bool = True,
+        progress_bar: bool = True,
+    ) -> ShardedSyntheticDataset:
+        """
+        Generate synthetic data as multiple shards, that are generated in parallel.
+
+        The sample size, respectively the seed, is split into `shards` disjoint parts, and one synthetic dataset
+        is created for each of them. All shards are then awaited within a single polling loop, and their data can
+        be consumed shard by shard via `iter_data`, without downloading all of it at once.
+
+        Example for generating one billion samples in 100 shards, spread across all available computes:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            sharded = mostly.generate_sharded(generator=g, size=1_000_000_000, shards=100, computes=True)
+            for df in sharded.iter_data():
+                print(len(df))
+            ```
+
+        Args:
+            generator: The generator instance or its UUID.
+            shards: The number of shards.
+            size: Total sample size(s) for the subject table(s).
+            seed: Seed data for the subject table(s), which is split into consecutive chunks of rows.
+            config: Configuration for the synthetic datasets. Sample sizes within the configuration are split as well.
+            name: Name of the synthetic datasets, which is suffixed with the number of each shard.
+            computes: The IDs of the computes to spread the shards across in a round-robin fashion. If true, all
+                available computes are used. If false, the default compute is used.
+            start: Whether to start generation immediately.
+            wait: Whether to wait for generation to finish.
+            progress_bar: Whether to display a progress bar during generation.
+
+        Returns:
+            ShardedSyntheticDataset: The sharded synthetic dataset.
+        """
+        if not isinstance(generator, Generator):
+            generator = self.generators.get(generator)
+        if computes is True:
+            computes = [compute["id"] for compute in self.computes()]
+        computes = computes or []
+        name = name or generator.name
+
+        def create(k: int, size: Any, seed: Any, config: Any) -> SyntheticDataset:
+            config = harmonize_sd_config(
+                generator,
+                get_generator=self.generators.get,
+                size=size,
+                seed=seed,
+                config=config,
+                config_type=SyntheticDatasetConfig,
+                name=f"{name} ({k + 1}/{shards})" if name else None,
+            )
+            if computes:
+                for table in config.tables:
+                    table.configuration = (
+                        table.configuration or SyntheticTableConfiguration()
+                    )
+                    table.configuration.tabular_compute = computes[k % len(computes)]
+            sd = self.synthetic_datasets.create(config)
+            try:
+                if start:
+                    sd.generation.start()
+            except Exception:
+                sd.delete()
+                raise
+            return sd
+
+        def try_create(item: tuple[int, tuple]) -> Union[SyntheticDataset, Exception]:
+            try:
+                return create(item[0], *item[1])
+            except Exception as e:
+                return e
+
+        # shards are configured, encoded and created concurrently on the shared thread pool
+        inputs = shard_sd_config(shards, size=size, seed=seed, config=config)
+        shards = len(inputs)
+        results = parallel_map(try_create, list(enumerate(inputs)))
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            # the shards, that have been created already, are deleted, so that no partial dataset is left behind
+            for sd in results:
+                if isinstance(sd, SyntheticDataset):
+                    sd.delete()
+            raise errors[0]
+        sharded = ShardedSyntheticDataset(results)
+        rich.print(
+            f"Created {shards} synthetic dataset shards with generator "
+            f"[link={self.base_url}/d/generators/{generator.id} blue underline]{generator.id}[/]"
+        )
+        if start and wait:
+            sharded.wait(progress_bar=progress_bar)
+            if sharded.generation_status == ProgressStatus.done:
+                rich.print(
+                    ":tada: [bold green]Your sharded synthetic dataset is ready![/] "
+                    "Use `iter_data` to consume the generated data shard by shard."
+                )
+        return sharded
+
+    def pipeline(self) -> Pipeline:
+        """
+        Create a pipeline of training and generation steps.
+
+        Generation steps can be declared against generators, that are still training. Their configurations and
+        seeds are prepared ahead, and their synthetic datasets are created and started the moment that training
+        is done.
+
+        Example for generating synthetic data right after training:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            pipeline = mostly.pipeline()
+            g = pipeline.train(data=df_original)
+            step = pipeline.generate(g, seed=df_seed)
+            pipeline.run()
+            step.synthetic_dataset.data()
+            ```
+
+        Returns:
+            Pipeline: An empty pipeline.
+        """
+        return Pipeline(self)
+
     def probe(
         self,
         generator: Union[Generator, str, None] = None,
         size: Union[int, dict[str, int], None] = None,
         seed: Union[Seed, dict[str, Seed], None] = None,
         config: Union[SyntheticProbeConfig, dict, None] = None,
-        return_type: Literal["auto", "dict"] = "auto",
-    ) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]:
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+    ) -> DataTables:
         """
         Probe a generator.
 
@@ -529,11 +819,15 @@ class MostlyAI(_MostlyBaseClient):
             ```
 
         Args:
-            generator: The generator instance or its UUID.
+            generator: The generator instance or its UUID. If an instance is provided, then the probed columns are
+                typed according to their encoding types, e.g. datetime columns are returned as timestamps.
             size: Sample size(s) for the subject table(s).
             seed: Seed data for the subject table(s).
             config: Configuration for the probe.
             return_type: Format of the return value. "auto" for pandas DataFrame if a single table, otherwise a dictionary.
+                "dict" for a dictionary of pandas DataFrames. "arrow" and "polars" for Arrow tables, respectively
+                polars DataFrames, which are built without an intermediate pandas object. These are returned as a
+                single table, if the probe consists of a single table, otherwise as a dictionary.
 
         Returns:
             The created synthetic probe.
@@ -546,11 +840,12 @@ class MostlyAI(_MostlyBaseClient):
             config=config,
             config_type=SyntheticProbeConfig,
         )
-        dfs = self.synthetic_probes.create(config)
-        if return_type == "auto" and len(dfs) == 1:
-            return list(dfs.values())[0]
-        else:
-            return dfs
+        # the column metadata of the generator is used for typing the probed columns, if it is at hand
+        return self.synthetic_probes.create(
+            config,
+            return_type=return_type,
+            generator=generator if isinstance(generator, Generator) else None,
+        )
 
     def me(self) -> CurrentUser:
         """
@@ -12,15 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
+import json
 import os
 import sys
+import time
 import warnings
 import webbrowser
+import zlib
+from contextlib import contextmanager
 from typing import (
     Annotated,
     Any,
     ClassVar,
     Generic,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -30,10 +36,12 @@ from typing import (
 
 import httpx
 import rich
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from rich.console import Console
 
+from mostlyai.client._cache import ConditionalCache
 from mostlyai.client.exceptions import APIError, APIStatusError
+from mostlyai.client.instrumentation import RequestEvent, RequestHook, path_template
 from mostlyai.client._naming_conventions import (
     map_snake_to_camel_case,
     map_camel_to_snake_case,
@@ -47,6 +55,11 @@ HttpVerb = Literal[GET, POST, PATCH, DELETE]
 
 DEFAULT_BASE_URL = "https://app.mostly.ai"
 MAX_REQUEST_SIZE = 250_000_000
+# keep as many connections alive, as there are concurrent requests by the client, e.g. by `Connector.walk`
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32)
+# JSON bodies below this size are sent uncompressed, as compressing them would not pay off
+REQUEST_COMPRESSION_MIN_SIZE = 64_000
+_COMPRESSION_CHUNK_SIZE = 1 << 20
 
 T = TypeVar("T")
 
@@ -65,6 +78,10 @@ class _MostlyBaseClient:
         api_key: Optional[str] = None,
         timeout: float = 60.0,
         ssl_verify: bool = True,
+        hooks: Optional[List[RequestHook]] = None,
+        http2: bool = False,
+        http_client: Optional[httpx.Client] = None,
+        request_compression: Optional[Literal["gzip", "zstd"]] = None,
     ):
         self.base_url = (
             base_url or os.getenv("MOSTLY_BASE_URL") or DEFAULT_BASE_URL
@@ -72,11 +89,26 @@ class _MostlyBaseClient:
         self.api_key = api_key or os.getenv("MOSTLY_API_KEY")
         self.timeout = timeout
         self.ssl_verify = ssl_verify
+        self.hooks = list(hooks or [])
         if not self.api_key:
             raise APIError(
                 "The API key must be either set by passing api_key to the client or by specifying a "
                 "MOSTLY_API_KEY environment variable"
             )
+        if request_compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unsupported {request_compression=}")
+        if request_compression == "zstd":
+            _import_zstandard()
+        if http2 and http_client is None:
+            _import_h2()
+        self.request_compression = request_compression
+        # responses of GET requests are revalidated via their ETag, respectively Last-Modified header
+        self._conditional_cache = ConditionalCache()
+        # connections are kept alive, and shared by all clients, that are passed the same `http_client`
+        self.http2 = http2
+        self._http_client = http_client or httpx.Client(
+            timeout=timeout, verify=ssl_verify, http2=http2, limits=HTTP_LIMITS
+        )
 
     def headers(self):
         return {
@@ -95,6 +127,8 @@ class _MostlyBaseClient:
         do_response_dict_snake_case: bool = True,
         do_include_client: bool = True,
         extra_key_values: Optional[dict] = None,
+        validators: Optional[dict[str, str]] = None,
+        attempt: int = 0,
         **kwargs,
     ) -> Any:
         """
@@ -110,6 +144,10 @@ class _MostlyBaseClient:
             do_response_dict_snake_case: Convert the response dictionary to snake_case. Defaults to `True`.
             do_include_client: Include the client property in the returned object. Defaults to `True`.
             extra_key_values: Additional key-value pairs to include in the response object.
+            validators: The validators of a previously received body, e.g. `{"If-None-Match": etag}`, to request a
+                GET conditionally on these, rather than on the cached response. Returns None, if the server answers
+                with 304, i.e. the resource has not been modified since that body. Defaults to `None`.
+            attempt: The number of preceding attempts, if the request is a retry, as reported to the hooks. Defaults to `0`.
             **kwargs: Additional arguments passed to the HTTP request.
 
         Returns:
@@ -119,11 +157,7 @@ class _MostlyBaseClient:
             APIStatusError: For HTTP errors (non-2XX responses).
             APIError: For network issues or request errors.
         """
-        path_list = [path] if isinstance(path, str) else [str(p) for p in path]
-        prefix = self.API_SECTION + self.SECTION if is_api_call else []
-        full_path = [self.base_url] + prefix + path_list
-        full_url = "/".join(full_path)
-
+        full_url = self._full_url(path, is_api_call)
         kwargs["headers"] = self.headers() | kwargs.get("headers", {})
 
         if (request_size := _get_total_size(kwargs)) > MAX_REQUEST_SIZE:
@@ -131,54 +165,256 @@ class _MostlyBaseClient:
                 f"The overall {request_size=} exceeds {MAX_REQUEST_SIZE}.", UserWarning
             )
 
-        if "json" in kwargs and do_json_camel_case:
-            if isinstance(kwargs["json"], BaseModel):
-                kwargs["json"] = kwargs["json"].model_dump()
-            kwargs["json"] = map_snake_to_camel_case(kwargs["json"])
-        if "params" in kwargs and do_json_camel_case:
-            if isinstance(kwargs["params"], BaseModel):
-                kwargs["params"] = kwargs["params"].model_dump()
-            kwargs["params"] = map_snake_to_camel_case(kwargs["params"])
+        with self._instrument(verb, full_url, attempt) as event:
+            with event.timer("conversion_seconds"):
+                if "json" in kwargs and do_json_camel_case:
+                    if isinstance(kwargs["json"], BaseModel):
+                        kwargs["json"] = kwargs["json"].model_dump()
+                    kwargs["json"] = map_snake_to_camel_case(kwargs["json"])
+                if "params" in kwargs and do_json_camel_case:
+                    if isinstance(kwargs["params"], BaseModel):
+                        kwargs["params"] = kwargs["params"].model_dump()
+                    kwargs["params"] = map_snake_to_camel_case(kwargs["params"])
+            if "json" in kwargs and self.request_compression:
+                with event.timer("compression_seconds"):
+                    _compress_json(kwargs, self.request_compression, event)
+
+            cache_key, cached = None, None
+            if verb == GET and not raw_response:
+                cache_key = (full_url, json.dumps(kwargs.get("params"), default=str))
+                if validators is not None:
+                    kwargs["headers"] = validators | kwargs["headers"]
+                else:
+                    cached = self._conditional_cache.lookup(cache_key)
+                    if cached is not None:
+                        kwargs["headers"] = cached[0] | kwargs["headers"]
+            elif verb == DELETE:
+                self._conditional_cache.invalidate(full_url)
+
+            with _translate_errors():
+                response = self._http_client.request(
+                    method=verb, url=full_url, **kwargs
+                )
+                _record_response(event, response)
+                content, content_validators = None, None
+                if response.status_code == 304 and validators is not None:
+                    # the resource has not changed since the body of the caller
+                    return None
+                if response.status_code == 304 and cached is not None:
+                    # the resource has not changed, thus the cached body, whose validators have been sent, is
+                    # processed instead
+                    content, content_validators = cached[1], cached[0]
+                if content is None:
+                    response.raise_for_status()
+                    content = response.content
+                    if cache_key is not None:
+                        content_validators = self._conditional_cache.validators(
+                            response.headers
+                        )
+                        self._conditional_cache.put(
+                            cache_key, response.headers, content
+                        )
+
+            if raw_response:
+                return response
+
+            if content:
+                # this section could be split into a separate method
+                with event.timer("conversion_seconds"):
+                    response_json = json.loads(content)
+                    if isinstance(response_json, dict) and not response_type == dict:
+                        if do_include_client:
+                            response_json["client"] = self
+                        if isinstance(extra_key_values, dict):
+                            response_json["extra_key_values"] = extra_key_values
+                    elif response_type == dict and do_response_dict_snake_case:
+                        response_json = map_camel_to_snake_case(response_json)
+                with event.timer("model_seconds"):
+                    if not isinstance(response_json, dict):
+                        return response_json
+                    result = response_type(**response_json)
+                    if isinstance(result, CustomBaseModel) and content_validators:
+                        # so that the instance can be reloaded conditionally on its own state
+                        result._validators = content_validators
+                    return result
+            else:
+                return None
+
+    @contextmanager
+    def stream(
+        self,
+        path: Union[str, List[Any]],
+        verb: HttpVerb,
+        is_api_call: bool = True,
+        attempt: int = 0,
+        **kwargs,
+    ) -> Iterator[httpx.Response]:
+        """
+        Send an HTTP request, and yield the response before its body has been read.
+
+        Args:
+            path: A single string or a list of parts of the path to concatenate.
+            verb: HTTP method (GET, POST, PATCH, DELETE).
+            is_api_call: If `False`, skips prefixing API_SECTION and SECTION. Defaults to `True`.
+            attempt: The number of preceding attempts, if the request is a retry, as reported to the hooks. Defaults to `0`.
+            **kwargs: Additional arguments passed to the HTTP request.
+
+        Yields:
+            The response, whose body can be consumed via `iter_bytes()`.
+
+        Raises:
+            APIStatusError: For HTTP errors (non-2XX responses).
+            APIError: For network issues or request errors, also while consuming the body.
+        """
+        full_url = self._full_url(path, is_api_call)
+        kwargs["headers"] = self.headers() | kwargs.get("headers", {})
+        with self._instrument(verb, full_url, attempt) as event, _translate_errors():
+            with self._http_client.stream(
+                method=verb, url=full_url, **kwargs
+            ) as response:
+                _record_response(event, response)
+                if response.is_error:
+                    response.read()
+                response.raise_for_status()
+                try:
+                    yield response
+                finally:
+                    event.response_bytes = response.num_bytes_downloaded
+
+    def close(self) -> None:
+        """
+        Close the connections of the client.
+        """
+        self._http_client.close()
+
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextmanager
+    def _instrument(
+        self, verb: HttpVerb, full_url: str, attempt: int = 0
+    ) -> Iterator[RequestEvent]:
+        # notify the hooks about the start and the end of a request, and measure its overall duration
+        event = RequestEvent(
+            verb=verb,
+            path=path_template(full_url[len(self.base_url) :]),
+            attempt=attempt,
+        )
+        _notify(self.hooks, "on_request_start", event)
         try:
-            with httpx.Client(timeout=self.timeout, verify=self.ssl_verify) as client:
-                response = client.request(method=verb, url=full_url, **kwargs)
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            try:
-                error_msg = exc.response.json()["message"]
-            except Exception:
-                error_msg = exc.response.content
-            # Handle HTTP errors (not in 2XX range)
-            raise APIStatusError(
-                f"HTTP {exc.response.status_code}: {error_msg}",
-            ) from exc
-        except httpx.RequestError as exc:
-            # Handle request errors (e.g., network issues)
-            raise APIError(
-                f"An error occurred while requesting {exc.request.url!r}."
-            ) from exc
-
-        if raw_response:
-            return response
-
-        if response.content:
-            # this section could be split into a separate method
-            response_json = response.json()
-            if isinstance(response_json, dict) and not response_type == dict:
-                if do_include_client:
-                    response_json["client"] = self
-                if isinstance(extra_key_values, dict):
-                    response_json["extra_key_values"] = extra_key_values
-            elif response_type == dict and do_response_dict_snake_case:
-                response_json = map_camel_to_snake_case(response_json)
-            return (
-                response_type(**response_json)
-                if isinstance(response_json, dict)
-                else response_json
-            )
-        else:
-            return None
+            yield event
+        except Exception as e:
+            event.error = str(e)
+            raise
+        finally:
+            event.total_seconds = time.perf_counter() - event._started
+            _notify(self.hooks, "on_request_end", event)
+
+    def _full_url(self, path: Union[str, List[Any]], is_api_call: bool) -> str:
+        path_list = [path] if isinstance(path, str) else [str(p) for p in path]
+        prefix = self.API_SECTION + self.SECTION if is_api_call else []
+        full_path = [self.base_url] + prefix + path_list
+        return "/".join(full_path)
+
+
+@contextmanager
+def _translate_errors() -> Iterator[None]:
+    # map httpx exceptions to the exceptions of this client
+    try:
+        yield
+    except httpx.HTTPStatusError as exc:
+        try:
+            error_msg = exc.response.json()["message"]
+        except Exception:
+            error_msg = exc.response.content
+        # Handle HTTP errors (not in 2XX range)
+        raise APIStatusError(
+            f"HTTP {exc.response.status_code}: {error_msg}",
+        ) from exc
+    except httpx.RequestError as exc:
+        # Handle request errors (e.g., network issues)
+        raise APIError(
+            f"An error occurred while requesting {exc.request.url!r}."
+        ) from exc
+
+
+def _notify(hooks: list[RequestHook], method: str, event: RequestEvent) -> None:
+    # a failing hook must not fail the request, thus its error is reported as a warning instead
+    for hook in hooks:
+        try:
+            getattr(hook, method)(event)
+        except Exception as e:
+            warnings.warn(f"{type(hook).__name__}.{method} failed: {e!r}")
+
+
+def _record_response(event: RequestEvent, response: httpx.Response) -> None:
+    # measure the latency until the response has been received, i.e. without processing it
+    event.latency_seconds = time.perf_counter() - event._started
+    event.status_code = response.status_code
+    if "content-length" in response.request.headers:
+        # otherwise, the body has been streamed, and its size has been counted along the way
+        event.request_bytes = int(response.request.headers["content-length"])
+    if response.is_closed:
+        # the size on the wire, i.e. before decoding a compressed response
+        event.response_bytes = response.num_bytes_downloaded
+
+
+def _import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd compression requires the `zstandard` package; install it via `pip install 'mostlyai[zstd]'`"
+        ) from e
+    return zstandard
+
+
+def _import_h2() -> Any:
+    try:
+        import h2
+    except ImportError as e:
+        raise ImportError(
+            "HTTP/2 requires the `h2` package; install it via `pip install 'mostlyai[http2]'`"
+        ) from e
+    return h2
+
+
+def _compress_json(kwargs: dict, encoding: str, event: RequestEvent) -> None:
+    # serialize the JSON body, and compress it chunk by chunk while being sent, if it is large enough
+    content = json.dumps(kwargs.pop("json")).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if len(content) >= REQUEST_COMPRESSION_MIN_SIZE:
+        content = _compressed_chunks(content, encoding, event)
+        headers["Content-Encoding"] = encoding
+    kwargs["content"] = content
+    kwargs["headers"] = kwargs["headers"] | headers
+
+
+def _compressed_chunks(
+    content: bytes, encoding: str, event: RequestEvent
+) -> Iterator[bytes]:
+    # the body is sent with chunked transfer encoding, thus the compressed body is never held in memory as a whole,
+    # and its first chunk is sent, while the remaining ones are still to be compressed
+    if encoding == "zstd":
+        compressor = _import_zstandard().ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(wbits=31)  # i.e. with gzip header
+    view = memoryview(content)
+    event.request_bytes = 0
+    for i in range(0, len(content), _COMPRESSION_CHUNK_SIZE):
+        with event.timer("compression_seconds"):
+            chunk = compressor.compress(view[i : i + _COMPRESSION_CHUNK_SIZE])
+        if chunk:
+            event.request_bytes += len(chunk)
+            yield chunk
+    with event.timer("compression_seconds"):
+        chunk = compressor.flush()
+    event.request_bytes += len(chunk)
+    event.compression_ratio = len(content) / event.request_bytes
+    yield chunk
 
 
 class Paginator(Generic[T]):
@@ -242,6 +478,8 @@ class CustomBaseModel(BaseModel):
     OPEN_URL_PARTS: ClassVar[list] = None  # ["d", "object-name"]
     client: Annotated[Optional[Any], Field(exclude=True, repr=False)] = None
     extra_key_values: Annotated[Optional[dict], Field(exclude=True, repr=False)] = None
+    # the validators of the response, that the instance has been built from, e.g. its ETag
+    _validators: Optional[dict[str, str]] = PrivateAttr(None)
     model_config = ConfigDict(protected_namespaces=(), populate_by_name=True)
 
     def _repr_html_(self):
@@ -261,23 +499,75 @@ class CustomBaseModel(BaseModel):
         webbrowser.open_new(url)
         return url
 
-    def reload(self):
+    def reload(self) -> set[str]:
         """
         Reload the instance to reflect its current state.
+
+        Only the changed fields are updated in place, thus nested objects, e.g. the tables of a generator, keep their
+        identity, unless they have been added or removed.
+
+        Note, that `reload()` returns the set of changed fields, whereas it returned None in earlier versions.
+
+        Example for reacting to changes of a generator:
+            ```python
+            changed = g.reload()
+            if "training_status" in changed:
+                print(g.training_status)
+            ```
+
+        Returns:
+            set[str]: The dotted paths of the changed fields, e.g. `{"training_status", "tables.0.total_rows"}`. Items,
+            that have been added to or removed from a list, are reported by their index, e.g. `{"tables.2"}`.
         """
+        changed = set()
         if hasattr(self.client, "get"):
-            reloaded = self.client.get(self.id)
-            for key, value in reloaded.__dict__.items():
-                current_attr = getattr(self, key, None)
-
-                # If the current attribute is a class instance, try updating it instead of overwriting
-                if isinstance(current_attr, type(value)) and hasattr(
-                    current_attr, "__dict__"
-                ):
-                    current_attr.__dict__.update(value.__dict__)
-                else:
-                    # Otherwise, directly overwrite the attribute
-                    setattr(self, key, value)
+            # a resource, that is unchanged since the instance has been built, is answered with 304, and thus not
+            # parsed at all. Whereas a 304 to the cached response of the client, that may be more recent than the
+            # instance, is parsed and patched as any other response.
+            reloaded = self.client.request(
+                verb=GET,
+                path=[self.id],
+                response_type=type(self),
+                validators=self._validators,
+            )
+            if reloaded is not None:
+                _patch_model(self, reloaded, "", changed)
+                self._validators = reloaded._validators
+        return changed
+
+
+def _patch_model(
+    target: BaseModel, source: BaseModel, prefix: str, changed: set
+) -> None:
+    # apply the differences of `source` to `target`, and record the paths of the changed fields
+    for name, field in type(target).model_fields.items():
+        if field.exclude:
+            continue  # e.g. the client, or helpers such as `Generator.training`, which refer to `target` itself
+        old, new = getattr(target, name), getattr(source, name)
+        path = f"{prefix}{name}"
+        if isinstance(old, BaseModel) and type(old) is type(new):
+            _patch_model(old, new, f"{path}.", changed)
+        elif (
+            isinstance(old, list)
+            and isinstance(new, list)
+            and any(isinstance(item, BaseModel) for item in old + new)
+        ):
+            for i, (old_item, new_item) in enumerate(zip(old, new)):
+                if isinstance(old_item, BaseModel) and type(old_item) is type(new_item):
+                    _patch_model(old_item, new_item, f"{path}.{i}.", changed)
+                elif old_item != new_item:
+                    old[i] = new_item
+                    changed.add(f"{path}.{i}")
+            # items, that have been added or removed at the end, are reported by their index
+            changed.update(
+                f"{path}.{i}"
+                for i in range(min(len(old), len(new)), max(len(old), len(new)))
+            )
+            del old[len(new) :]
+            old.extend(new[len(old) :])
+        elif old != new:
+            setattr(target, name, new)
+            changed.add(path)
 
 
 def _get_total_size(obj, seen=None):
@@ -301,6 +591,10 @@ def _get_total_size(obj, seen=None):
             ]
         )
 
+    elif isinstance(obj, io.IOBase):
+        # file objects are streamed, and thus shall not be read here
+        pass
+
     elif hasattr(obj, "__dict__"):
         size += _get_total_size(obj.__dict__, seen)
 
@@ -12,20 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any, Iterator, Optional, List, Dict, Union
 
+from mostlyai.client._cache import DEFAULT_METADATA_CACHE_TTL, TTLCache
 from mostlyai.client.base import DELETE, GET, PATCH, POST, Paginator, _MostlyBaseClient
+from mostlyai.client.exceptions import APIStatusError
 from mostlyai.domain import (
     Connector,
     ConnectorListItem,
     ConnectorPatchConfig,
     ConnectorConfig,
+    GeneratorConfig,
+    SourceForeignKeyConfig,
+    SourceTableConfig,
 )
 
 
 class _MostlyConnectorsClient(_MostlyBaseClient):
     SECTION = ["connectors"]
 
+    def __init__(
+        self, *args, metadata_cache_ttl: float = DEFAULT_METADATA_CACHE_TTL, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.metadata_cache = TTLCache(ttl=metadata_cache_ttl)
+
     # PUBLIC METHODS #
 
     def list(
@@ -128,10 +142,12 @@ class _MostlyConnectorsClient(_MostlyBaseClient):
             json=config,
             response_type=Connector,
         )
+        self._invalidate_cache(connector_id)
         return response
 
     def _delete(self, connector_id: str) -> None:
         self.request(verb=DELETE, path=[connector_id])
+        self._invalidate_cache(connector_id)
 
     def _config(self, connector_id: str) -> ConnectorConfig:
         response = self.request(
@@ -140,13 +156,198 @@ class _MostlyConnectorsClient(_MostlyBaseClient):
         return response
 
     def _locations(self, connector_id: str, prefix: str = "") -> list:
-        response = self.request(
-            verb=GET, path=[connector_id, "locations"], params={"prefix": prefix}
+        response = self.metadata_cache.get_or_set(
+            (connector_id, "locations", prefix),
+            lambda: self.request(
+                verb=GET, path=[connector_id, "locations"], params={"prefix": prefix}
+            ),
         )
         return response
 
     def _schema(self, connector_id: str, location: str) -> List[Dict[str, Any]]:
-        response = self.request(
-            verb=GET, path=[connector_id, "schema"], params={"location": location}
+        response = self.metadata_cache.get_or_set(
+            (connector_id, "schema", location),
+            lambda: self.request(
+                verb=GET, path=[connector_id, "schema"], params={"location": location}
+            ),
         )
         return response
+
+    def _schemas(
+        self, connector_id: str, locations: List[str], max_workers: int = 16
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        # schema requests are I/O bound, thus these are sent via a dedicated pool, rather than the CPU-sized shared one
+        locations = list(dict.fromkeys(locations))
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="mostlyai"
+        ) as executor:
+            schemas = executor.map(
+                lambda location: self._schema(connector_id, location), locations
+            )
+            return dict(zip(locations, schemas))
+
+    def _walk(
+        self,
+        connector_id: str,
+        prefix: str = "",
+        max_depth: Optional[int] = None,
+        concurrency: int = 16,
+        include_schema: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        if max_depth is not None and max_depth < 1:
+            return
+        # crawl breadth-first, as the executor processes its queue in submission order
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, concurrency), thread_name_prefix="mostlyai"
+        )
+        # locations are only crawled once, in case a connector lists a location as a child of its descendants
+        visited = {prefix}
+
+        def list_children(location: str) -> List[str]:
+            try:
+                children = self._locations(connector_id, prefix=location)
+            except APIStatusError as e:
+                if e.status_code in (400, 404):
+                    return []  # a table, respectively file, can not be listed any further
+                raise
+            return [child for child in children or [] if child != location]
+
+        try:
+            pending = {executor.submit(list_children, prefix): ("locations", prefix, 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, location, depth = pending.pop(future)
+                    if kind == "schema":
+                        yield {
+                            "location": location,
+                            "depth": depth,
+                            "is_leaf": True,
+                            "schema": future.result(),
+                        }
+                        continue
+                    children = future.result()
+                    if depth > 0:
+                        if children or not include_schema:
+                            yield {
+                                "location": location,
+                                "depth": depth,
+                                "is_leaf": not children,
+                            }
+                        else:
+                            schema = executor.submit(
+                                self._schema, connector_id, location
+                            )
+                            pending[schema] = ("schema", location, depth)
+                    for child in children:
+                        if child in visited:
+                            continue
+                        visited.add(child)
+                        if max_depth is not None and depth + 1 >= max_depth:
+                            # leaves are only known once listed, thus the deepest level is reported as is
+                            yield {
+                                "location": child,
+                                "depth": depth + 1,
+                                "is_leaf": None,
+                            }
+                        else:
+                            future = executor.submit(list_children, child)
+                            pending[future] = ("locations", child, depth + 1)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generator_config(
+        self,
+        connector_id: str,
+        locations: List[str],
+        name: Optional[str] = None,
+        primary_keys: Optional[Dict[str, str]] = None,
+        foreign_keys: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        max_workers: int = 16,
+    ) -> GeneratorConfig:
+        schemas = self._schemas(connector_id, locations, max_workers=max_workers)
+        table_names = _get_table_names(list(schemas))
+        parsed = {location: _parse_keys(schema) for location, schema in schemas.items()}
+        if len(schemas) > 1 and not any(pk or fks for pk, fks in parsed.values()):
+            warnings.warn(
+                "no primary or foreign keys were found in the schemas of the connector; provide these via "
+                "`primary_keys` and `foreign_keys`, so that the tables are trained as related tables"
+            )
+        tables = []
+        for location, (primary_key, fks) in parsed.items():
+            primary_key = (primary_keys or {}).get(location, primary_key)
+            fks = (foreign_keys or {}).get(location, fks)
+            # foreign keys may reference tables either by their location, or by their table name
+            fks = [
+                SourceForeignKeyConfig(
+                    column=fk["column"],
+                    referenced_table=table_names.get(
+                        fk["referenced_table"], fk["referenced_table"]
+                    ),
+                    is_context=fk.get("is_context"),
+                )
+                for fk in (_snake_case_keys(fk) for fk in fks)
+            ]
+            # only relations between included tables are kept; the first of them becomes the context, unless
+            # `is_context` has been set explicitly for any of them
+            fks = [fk for fk in fks if fk.referenced_table in table_names.values()]
+            if fks and all(fk.is_context is None for fk in fks):
+                fks[0].is_context = True
+            for fk in fks:
+                fk.is_context = bool(fk.is_context)
+            tables.append(
+                SourceTableConfig(
+                    name=table_names[location],
+                    source_connector_id=connector_id,
+                    location=location,
+                    primary_key=primary_key,
+                    foreign_keys=fks or None,
+                )
+            )
+        return GeneratorConfig(name=name, tables=tables)
+
+    def _invalidate_cache(self, connector_id: str) -> None:
+        self.metadata_cache.invalidate(connector_id)
+
+
+def _snake_case_keys(dct: Dict[str, Any]) -> Dict[str, Any]:
+    return {re.sub(r"(?<!^)(?=[A-Z])", "_", k).lower(): v for k, v in dct.items()}
+
+
+def _get_table_names(locations: List[str]) -> Dict[str, str]:
+    # derive table names from locations, e.g. `public.players` for databases, or `bucket/players.csv` for storages
+    names = {}
+    for location in locations:
+        path = location.rstrip("/")
+        if "/" in path:
+            names[location] = path.rsplit("/", 1)[-1].split(".")[0]
+        else:
+            names[location] = path.rsplit(".", 1)[-1]
+    # fall back to the full location for ambiguous names
+    counts = {}
+    for name in names.values():
+        counts[name] = counts.get(name, 0) + 1
+    return {
+        location: name if counts[name] == 1 else re.sub(r"\W", "_", location.strip("/"))
+        for location, name in names.items()
+    }
+
+
+def _parse_keys(schema: Any) -> tuple[Optional[str], List[Dict[str, Any]]]:
+    # the schema is a list of columns, e.g. `{"name": "id", "isPrimaryKey": true}` for a primary key, and
+    # `{"name": "players_id", "foreignKey": {"referencedTable": "public.players"}}` for a foreign key
+    primary_key, foreign_keys = None, []
+    for column in schema or []:
+        column = _snake_case_keys(column)
+        if column.get("is_primary_key") and primary_key is None:
+            primary_key = column["name"]
+        if column.get("foreign_key"):
+            foreign_keys.append(
+                {
+                    "column": column["name"],
+                    "referenced_table": _snake_case_keys(column["foreign_key"])[
+                        "referenced_table"
+                    ],
+                }
+            )
+    return primary_key, foreign_keys
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from typing import Optional
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -32,4 +34,10 @@ class APIError(Exception):
 
 
 class APIStatusError(APIError):
-    pass
+    @property
+    def status_code(self) -> Optional[int]:
+        """
+        The HTTP status code of the response, that caused the error.
+        """
+        response = getattr(self.__cause__, "response", None)
+        return response.status_code if response is not None else None
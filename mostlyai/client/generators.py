@@ -13,8 +13,7 @@
 # limitations under the License.
 
 from pathlib import Path
-from typing import Any, Iterator, Optional, Union
-import re
+from typing import Any, Iterator, Literal, Optional, Union
 
 import pandas as pd
 
@@ -26,10 +25,14 @@ from mostlyai.domain import (
     GeneratorConfig,
     GeneratorPatchConfig,
 )
-from mostlyai.client._base_utils import (
-    convert_to_base64,
+from mostlyai.client._base_utils import encode_tables
+from mostlyai.client.progress import ProgressEvent, job_events, job_timeline
+from mostlyai.client._mostly_utils import (
+    download_file,
+    job_wait,
+    subsample_tables,
+    upload_file,
 )
-from mostlyai.client._mostly_utils import job_wait, read_table_from_path
 
 
 class _MostlyGeneratorsClient(_MostlyBaseClient):
@@ -107,7 +110,12 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
         response = self.request(verb=GET, path=[generator_id], response_type=Generator)
         return response
 
-    def create(self, config: Union[GeneratorConfig, dict]) -> Generator:
+    def create(
+        self,
+        config: Union[GeneratorConfig, dict],
+        client_side_sampling: bool = False,
+        sampling_seed: int = 42,
+    ) -> Generator:
         """
         Create a generator. The generator will be in the NEW state and will need to be trained before it can be used.
 
@@ -138,24 +146,28 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
 
         Args:
             config: Configuration for the generator.
+            client_side_sampling: Whether to subsample the provided `data` to the `max_sample_size` of each table's
+                model configuration before uploading it. Linked tables are reduced to the rows of the retained subjects.
+                Only supported for a dictionary configuration, with data provided as DataFrame or file path. Files are
+                sampled while being read.
+            sampling_seed: The random seed for a reproducible client-side sample.
 
         Returns:
             The created generator object.
         """
+        if client_side_sampling and not isinstance(config, dict):
+            raise ValueError(
+                "client_side_sampling requires a dictionary `config`, with a `max_sample_size` per table"
+            )
         if isinstance(config, dict) and config.get("tables"):
+            if client_side_sampling:
+                config = {
+                    **config,
+                    "tables": subsample_tables(config["tables"], seed=sampling_seed),
+                }
+            # convert `data` to base64-encoded Parquet files
+            config = {**config, "tables": encode_tables(config["tables"])}
             for table in config["tables"]:
-                # convert `data` to base64-encoded Parquet files
-                if table.get("data") is not None:
-                    if isinstance(table["data"], (str, Path)):
-                        name, df = read_table_from_path(table["data"])
-                        table["data"] = convert_to_base64(df)
-                        if "name" not in table:
-                            table["name"] = name
-                        del df
-                    elif isinstance(table["data"], pd.DataFrame):
-                        table["data"] = convert_to_base64(table["data"])
-                    else:
-                        raise ValueError("data must be a DataFrame or a file path")
                 if table.get("columns"):
                     # convert `columns` to list[dict], if provided as list[str]
                     table["columns"] = [
@@ -170,10 +182,17 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
     def import_from_file(
         self,
         file_path: Union[str, Path],
+        progress_bar: bool = True,
+        max_retries: int = 3,
     ) -> Generator:
         """
         Import a generator from a file.
 
+        The file is uploaded in chunks, and the upload is retried, if the connection could not be established. Unlike
+        the export of a generator, the upload can not be resumed, thus it starts over with each retry, and an upload,
+        that fails after it has started, is not retried, as the server may already have received the file. Each retry
+        is reported to the hooks of the client, with `RequestEvent.attempt` being set.
+
         Example for importing a generator from a file:
             ```python
             from mostlyai import MostlyAI
@@ -184,17 +203,22 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
 
         Args:
             file_path: Path to the file to import.
+            progress_bar: Whether to display a progress bar during the upload.
+            max_retries: Maximum number of retries in case of network errors.
 
         Returns:
             The imported generator object.
         """
-        response = self.request(
-            verb=POST,
+        response = upload_file(
+            self,
             path=["import-from-file"],
+            file_path=file_path,
+            progress_bar=progress_bar,
+            max_retries=max_retries,
+            verb=POST,
             headers={
                 "Accept": "application/json, text/plain, */*",
             },
-            files={"file": open(file_path, "rb")},
             response_type=Generator,
         )
         return response
@@ -203,24 +227,22 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
     def _export_to_file(
         self,
         generator_id: str,
-    ) -> (bytes, Optional[str]):
-        response = self.request(
-            verb=GET,
+        file_path: Union[str, Path, None] = None,
+        progress_bar: bool = True,
+        max_retries: int = 3,
+    ) -> Path:
+        return download_file(
+            self,
             path=[generator_id, "export-to-file"],
+            file_path=file_path,
+            default_filename=f"generator-{generator_id[:8]}.mostly",
+            progress_bar=progress_bar,
+            max_retries=max_retries,
             headers={
                 "Content-Type": "application/octet-stream",
                 "Accept": "application/json, text/plain, */*",
             },
-            raw_response=True,
         )
-        content_bytes = response.content
-        # Check if 'Content-Disposition' header is present
-        if "Content-Disposition" in response.headers:
-            content_disposition = response.headers["Content-Disposition"]
-            filename = re.findall("filename=(.+)", content_disposition)[0]
-        else:
-            filename = f"generator-{generator_id[:8]}.mostly"
-        return content_bytes, filename
 
     def _update(
         self, generator_id: str, config: Union[GeneratorPatchConfig, dict[str, Any]]
@@ -264,6 +286,16 @@ class _MostlyGeneratorsClient(_MostlyBaseClient):
         )
         return response
 
+    def _training_events(
+        self, generator_id: str, interval: float
+    ) -> Iterator[ProgressEvent]:
+        return job_events(lambda: self._training_progress(generator_id), interval)
+
+    def _training_timeline(
+        self, generator_id: str, return_type: Literal["dataframe", "chrome"]
+    ) -> Union[pd.DataFrame, dict[str, Any]]:
+        return job_timeline(self._training_progress(generator_id), return_type)
+
     def _training_wait(
         self, generator_id: str, progress_bar: bool, interval: float
     ) -> Generator:
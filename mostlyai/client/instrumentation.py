@@ -0,0 +1,216 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, Optional
+
+import pandas as pd
+
+_ID_PATTERN = re.compile(
+    r"/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)(?=/|$)"
+)
+
+
+def path_template(path: str) -> str:
+    """
+    Strip the ids from a request path, e.g. `/api/v2/generators/{id}/training/progress`.
+    """
+    return _ID_PATTERN.sub("/{id}", path.split("?")[0])
+
+
+@dataclass
+class RequestEvent:
+    """
+    A request sent by the client. Hooks receive the same instance at its start and at its end, with all measurements
+    filled in by then.
+    """
+
+    verb: str
+    path: str
+    started_at: float = field(default_factory=time.time)
+    status_code: Optional[int] = None
+    latency_seconds: Optional[float] = None
+    total_seconds: Optional[float] = None
+    conversion_seconds: float = 0.0
+    model_seconds: float = 0.0
+    compression_seconds: float = 0.0
+    compression_ratio: Optional[float] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    error: Optional[str] = None
+    # the number of preceding attempts, if the request is a retry, e.g. of a file transfer after a network error
+    attempt: int = 0
+    # the monotonic start, from which all durations are measured, as opposed to the wall-clock `started_at`
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def timer(self, attr: str) -> Iterator[None]:
+        # accumulate the time spent within the block in the given attribute
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, attr, getattr(self, attr) + time.perf_counter() - start)
+
+
+_EVENT_COLUMNS = [f for f in RequestEvent.__dataclass_fields__ if not f.startswith("_")]
+
+
+class RequestHook:
+    """
+    Base class for hooks, that get notified about each request of the client. Hooks are called synchronously from the
+    requesting thread, and thus shall be fast and thread-safe. Errors raised by hooks are reported as warnings, and do not
+    fail the request.
+
+    Exporting to other monitoring systems is done by adapting a hook to their API.
+
+    Example for exporting the request latencies to Prometheus:
+        ```python
+        from prometheus_client import Histogram
+        from mostlyai import MostlyAI
+        from mostlyai.client.instrumentation import RequestHook
+
+        class PrometheusHook(RequestHook):
+            latency = Histogram("mostly_request_seconds", "Request latency", ["verb", "path", "status"])
+
+            def on_request_end(self, event):
+                self.latency.labels(event.verb, event.path, event.status_code).observe(event.total_seconds)
+
+        mostly = MostlyAI(hooks=[PrometheusHook()])
+        ```
+
+    Example for tracing requests with OpenTelemetry:
+        ```python
+        from opentelemetry import trace
+        from mostlyai.client.instrumentation import RequestHook
+
+        class TracingHook(RequestHook):
+            tracer = trace.get_tracer("mostlyai")
+
+            def on_request_start(self, event):
+                event.span = self.tracer.start_span(f"{event.verb} {event.path}")
+
+            def on_request_end(self, event):
+                event.span.set_attribute("http.status_code", event.status_code or 0)
+                event.span.end()
+        ```
+    """
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """
+        Called before a request is sent.
+        """
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        """
+        Called after a request has ended, either successfully or with an error.
+        """
+
+
+class InMemoryMetrics(RequestHook):
+    """
+    Collect the requests of the client in memory, and summarize them per endpoint.
+
+    Example for finding the slowest endpoints:
+        ```python
+        from mostlyai import MostlyAI
+        from mostlyai.client.instrumentation import InMemoryMetrics
+        metrics = InMemoryMetrics()
+        mostly = MostlyAI(hooks=[metrics])
+        mostly.probe(generator_id, size=10)
+        metrics.summary().sort_values("p99_seconds", ascending=False)
+        ```
+
+    Args:
+        max_samples: The maximum number of most recent requests kept per endpoint.
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self._events: dict[tuple[str, str], deque[RequestEvent]] = {}
+        self._lock = threading.Lock()
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        with self._lock:
+            key = (event.verb, event.path)
+            if key not in self._events:
+                self._events[key] = deque(maxlen=self.max_samples)
+            self._events[key].append(event)
+
+    def events(self) -> list[RequestEvent]:
+        """
+        Retrieve the collected requests.
+
+        Returns:
+            list[RequestEvent]: The collected requests, ordered by their start.
+        """
+        with self._lock:
+            events = [e for events in self._events.values() for e in events]
+        return sorted(events, key=lambda e: e.started_at)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Summarize the collected requests per verb and path.
+
+        Returns:
+            pd.DataFrame: The number of requests, errors and retries, the latency percentiles, the mean time spent in case
+            conversion, model construction and request compression, the mean compression ratio of compressed
+            requests, and the total bytes sent and received, per endpoint.
+        """
+        df = pd.DataFrame([asdict(e) for e in self.events()], columns=_EVENT_COLUMNS)
+        df = df.astype(
+            {
+                "total_seconds": "float64",
+                "conversion_seconds": "float64",
+                "model_seconds": "float64",
+                "compression_seconds": "float64",
+                "compression_ratio": "float64",
+                "request_bytes": "int64",
+                "response_bytes": "int64",
+            }
+        )
+        df["is_error"] = df["error"].notna()
+        df["is_retry"] = df["attempt"] > 0
+        grouped = df.groupby(["verb", "path"], sort=False)
+        seconds = grouped["total_seconds"]
+        return pd.DataFrame(
+            {
+                "count": grouped.size(),
+                "errors": grouped["is_error"].sum(),
+                "retries": grouped["is_retry"].sum(),
+                "mean_seconds": seconds.mean(),
+                "p50_seconds": seconds.quantile(0.5),
+                "p90_seconds": seconds.quantile(0.9),
+                "p99_seconds": seconds.quantile(0.99),
+                "max_seconds": seconds.max(),
+                "conversion_seconds": grouped["conversion_seconds"].mean(),
+                "model_seconds": grouped["model_seconds"].mean(),
+                "compression_seconds": grouped["compression_seconds"].mean(),
+                "compression_ratio": grouped["compression_ratio"].mean(),
+                "request_bytes": grouped["request_bytes"].sum(),
+                "response_bytes": grouped["response_bytes"].sum(),
+            }
+        ).reset_index()
+
+    def reset(self) -> None:
+        """
+        Discard the collected requests.
+        """
+        with self._lock:
+            self._events.clear()
@@ -0,0 +1,351 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import pandas as pd
+from rich.progress import (
+    BarColumn,
+    Progress,
+    TaskProgressColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+from rich.style import Style
+
+from mostlyai.client._base_utils import get_executor
+from mostlyai.client._mostly_utils import Seed, _retry_delay, harmonize_sd_config
+from mostlyai.domain import (
+    Generator,
+    GeneratorConfig,
+    ProgressStatus,
+    SyntheticDataset,
+    SyntheticDatasetConfig,
+)
+
+_FINAL_STATUSES = (ProgressStatus.done, ProgressStatus.failed, ProgressStatus.canceled)
+
+
+def _then(future: Future, fn: Callable[[Any], Any]) -> Future:
+    # chain `fn` to the result of `future`, without blocking a thread while waiting for it
+    result = Future()
+
+    def resolve(f: Future) -> None:
+        if f.exception() is not None:
+            result.set_exception(f.exception())
+        else:
+            result.set_result(f.result())
+
+    def schedule(f: Future) -> None:
+        if f.exception() is not None:
+            result.set_exception(f.exception())
+        else:
+            get_executor().submit(fn, f.result()).add_done_callback(resolve)
+
+    future.add_done_callback(schedule)
+    return result
+
+
+def _resolved(value: Any) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class TrainStep:
+    """
+    A training step of a pipeline. Its generator is created and started in the background.
+    """
+
+    def __init__(self, future: Future):
+        self._future = future
+        self.status: Optional[ProgressStatus] = None
+        self.error: Optional[str] = None
+        self._poll_errors = 0
+        self._next_poll = 0  # the polling round, in which the step is polled next
+
+    def __repr__(self) -> str:
+        return f"TrainStep(status={self.status})"
+
+    @property
+    def generator(self) -> Generator:
+        """
+        The generator of this step. Blocks until the generator has been created.
+        """
+        return self._future.result()
+
+
+class GenerateStep:
+    """
+    A generation step of a pipeline. Its configuration, including its seed, is prepared in the background, and its
+    synthetic dataset is created and started as soon as the generator has been trained.
+    """
+
+    def __init__(self, train_step: Optional[TrainStep], config: Future):
+        self.train_step = train_step
+        self._config = config
+        self._created: Optional[Future] = None
+        self.synthetic_dataset: Optional[SyntheticDataset] = None
+        self.status: Optional[ProgressStatus] = None
+        self.error: Optional[str] = None
+        self._poll_errors = 0
+        self._next_poll = 0  # the polling round, in which the step is polled next
+
+    def __repr__(self) -> str:
+        return f"GenerateStep(status={self.status})"
+
+
+class Pipeline:
+    """
+    A pipeline of training and generation steps, that are executed with as little idle time as possible.
+
+    Generation steps can be declared against generators, that are still training. Their configurations and seeds
+    are prepared ahead, and their synthetic datasets are created and started the moment that training is done.
+
+    Example for training two generators, and generating from each of them as soon as it is ready:
+        ```python
+        from mostlyai import MostlyAI
+        mostly = MostlyAI()
+        pipeline = mostly.pipeline()
+        for df in [df_census, df_baseball]:
+            g = pipeline.train(data=df)
+            pipeline.generate(g, size=1_000)
+        pipeline.run()
+        for step in pipeline.generate_steps:
+            print(step.status, step.synthetic_dataset.data().shape)
+        ```
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.train_steps: list[TrainStep] = []
+        self.generate_steps: list[GenerateStep] = []
+
+    def __repr__(self) -> str:
+        return f"Pipeline(train_steps={len(self.train_steps)}, generate_steps={len(self.generate_steps)})"
+
+    def train(
+        self,
+        config: Union[GeneratorConfig, dict, None] = None,
+        data: Union[pd.DataFrame, str, Path, None] = None,
+        name: Optional[str] = None,
+    ) -> TrainStep:
+        """
+        Declare a training step. The generator is created and its training is started right away in the background.
+
+        Args:
+            config: The configuration parameters of the generator to be created. Either `config` or `data` must be provided.
+            data: A single pandas DataFrame, or a path to a CSV or PARQUET file. Either `config` or `data` must be provided.
+            name: Name of the generator.
+
+        Returns:
+            TrainStep: The declared training step.
+        """
+        future = get_executor().submit(
+            lambda: self._client.train(
+                config=config, data=data, name=name, start=True, wait=False
+            )
+        )
+        step = TrainStep(future)
+        self.train_steps.append(step)
+        return step
+
+    def generate(
+        self,
+        generator: Union[TrainStep, Generator, str],
+        size: Union[int, dict[str, int], None] = None,
+        seed: Union[Seed, dict[str, Seed], None] = None,
+        config: Union[SyntheticDatasetConfig, dict, None] = None,
+        name: Optional[str] = None,
+    ) -> GenerateStep:
+        """
+        Declare a generation step, possibly against a generator, that is still training.
+
+        The configuration is prepared, and the seed is encoded, as soon as the generator has been created, i.e. while it
+        is still training. The synthetic dataset is created and started by `run`, once training is done.
+
+        Args:
+            generator: A training step of this pipeline, a generator instance, or its UUID.
+            size: Sample size(s) for the subject table(s).
+            seed: Seed data for the subject table(s).
+            config: Configuration for the synthetic dataset.
+            name: Name of the synthetic dataset.
+
+        Returns:
+            GenerateStep: The declared generation step.
+        """
+        train_step = generator if isinstance(generator, TrainStep) else None
+        if train_step is not None:
+            generator_future = train_step._future
+        elif isinstance(generator, Generator):
+            generator_future = _resolved(generator)
+        else:
+            generator_future = get_executor().submit(
+                self._client.generators.get, generator
+            )
+
+        def prepare(g: Generator) -> SyntheticDatasetConfig:
+            return harmonize_sd_config(
+                g,
+                get_generator=self._client.generators.get,
+                size=size,
+                seed=seed,
+                config=config,
+                config_type=SyntheticDatasetConfig,
+                name=name,
+            )
+
+        step = GenerateStep(train_step, _then(generator_future, prepare))
+        self.generate_steps.append(step)
+        return step
+
+    def run(
+        self, progress_bar: bool = True, interval: float = 2, max_poll_errors: int = 5
+    ) -> None:
+        """
+        Run the pipeline until all of its steps have ended.
+
+        Synthetic datasets are created and started as soon as their generators are done. Generation steps, whose
+        training has failed, are canceled. Errors while polling the progress of a job are retried with backoff, up to
+        `max_poll_errors` times in a row, after which its step is considered failed.
+
+        Args:
+            progress_bar: If true, displays the number of ended steps.
+            interval: The interval in seconds to poll the jobs.
+            max_poll_errors: The maximum number of consecutive errors while polling a job, before giving up on it.
+        """
+        interval = max(interval, 1)
+        rounds = 0
+        total = len(self.train_steps) + len(self.generate_steps)
+        if progress_bar:
+            progress = Progress(
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(
+                    style=Style(color="rgb(245,245,245)"),
+                    complete_style=Style(color="rgb(66,77,179)"),
+                    finished_style=Style(color="rgb(36,219,149)"),
+                    pulse_style=Style(color="rgb(245,245,245)"),
+                ),
+                TaskProgressColumn(),
+                TimeElapsedColumn(),
+            )
+            overall = progress.add_task(
+                description="[bold]Pipeline steps[/b]", total=total
+            )
+            progress.start()
+        try:
+            while True:
+                poll = lambda step, get_status: _poll(  # noqa: E731
+                    step, get_status, rounds, interval, max_poll_errors
+                )
+                self._poll_train_steps(poll)
+                self._advance_generate_steps(poll)
+                ended = sum(
+                    step.status in _FINAL_STATUSES
+                    for step in self.train_steps + self.generate_steps
+                )
+                if progress_bar:
+                    progress.update(overall, completed=ended)
+                if ended == total:
+                    break
+                time.sleep(interval)
+                rounds += 1
+        finally:
+            if progress_bar:
+                progress.stop()
+        for step in self.train_steps:
+            if step.status == ProgressStatus.done:
+                step.generator.reload()
+
+    def _poll_train_steps(self, poll: Callable) -> None:
+        for step in self.train_steps:
+            if step.status in _FINAL_STATUSES or not step._future.done():
+                continue
+            if step._future.exception() is not None:
+                step.status = ProgressStatus.failed
+                step.error = str(step._future.exception())
+                continue
+            poll(step, lambda: step.generator.training.progress().status)
+
+    def _advance_generate_steps(self, poll: Callable) -> None:
+        for step in self.generate_steps:
+            if step.status in _FINAL_STATUSES:
+                continue
+            if step.synthetic_dataset is not None:
+                poll(step, lambda: _generation_status(step.synthetic_dataset))
+                continue
+            if step._created is not None:
+                if step._created.done():
+                    if step._created.exception() is not None:
+                        step.status = ProgressStatus.failed
+                        step.error = str(step._created.exception())
+                    else:
+                        step.synthetic_dataset = step._created.result()
+                        step.status = ProgressStatus.queued
+                continue
+            upstream = (
+                step.train_step.status if step.train_step else ProgressStatus.done
+            )
+            if upstream in (ProgressStatus.failed, ProgressStatus.canceled):
+                step.status = ProgressStatus.canceled
+                step.error = "training has not completed"
+                continue
+            if upstream != ProgressStatus.done or not step._config.done():
+                continue
+            if step._config.exception() is not None:
+                step.status = ProgressStatus.failed
+                step.error = str(step._config.exception())
+                continue
+            step._created = get_executor().submit(
+                self._create_and_start, step._config.result()
+            )
+
+    def _create_and_start(self, config: SyntheticDatasetConfig) -> SyntheticDataset:
+        sd = self._client.synthetic_datasets.create(config)
+        sd.generation.start()
+        return sd
+
+
+def _poll(
+    step: Union[TrainStep, GenerateStep],
+    get_status: Callable[[], ProgressStatus],
+    rounds: int,
+    interval: float,
+    max_poll_errors: int,
+) -> None:
+    # errors, e.g. due to a flaky connection, are retried with backoff, rather than aborting the pipeline, which would
+    # leave the jobs in flight behind
+    if step._next_poll > rounds:
+        return
+    try:
+        step.status = get_status()
+    except Exception as e:
+        step._poll_errors += 1
+        if step._poll_errors > max_poll_errors:
+            step.status = ProgressStatus.failed
+            step.error = str(e)
+        else:
+            step._next_poll = rounds + int(_retry_delay(step._poll_errors) / interval)
+        return
+    step._poll_errors = 0
+
+
+def _generation_status(sd: SyntheticDataset) -> ProgressStatus:
+    status = sd.generation.progress().status
+    if status in _FINAL_STATUSES:
+        sd.reload()
+    return status
@@ -0,0 +1,329 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterator, Literal, Optional, Union
+
+import pandas as pd
+
+from mostlyai.domain import JobProgress, ProgressStatus, ProgressStep
+
+_STARTED = (ProgressStatus.in_progress, ProgressStatus.done, ProgressStatus.failed)
+_ENDED = (ProgressStatus.done, ProgressStatus.failed, ProgressStatus.canceled)
+
+
+@dataclass
+class ProgressEvent:
+    """
+    A change of a training or generation job, derived from two successive snapshots of its progress.
+
+    Example for logging the progress of a training:
+        ```python
+        from mostlyai.client.progress import ProgressUpdated, StepFailed, StepFinished
+
+        for event in g.training.events():
+            if isinstance(event, ProgressUpdated) and event.step is None:
+                logger.info(f"training {event.value}/{event.max}")
+            elif isinstance(event, StepFinished):
+                logger.info(f"step {event.step.step_code} done")
+            elif isinstance(event, StepFailed):
+                logger.error(f"step {event.step.step_code} {event.step.status}: {event.step.error_message}")
+        ```
+    """
+
+    job: JobProgress  # the snapshot, that the event has been derived from
+
+
+@dataclass
+class JobStarted(ProgressEvent):
+    """
+    The job has started.
+    """
+
+
+@dataclass
+class StepStarted(ProgressEvent):
+    """
+    A step of the job has started.
+    """
+
+    step: ProgressStep
+
+
+@dataclass
+class ProgressUpdated(ProgressEvent):
+    """
+    The progress of the job, or of one of its steps, has changed.
+    """
+
+    step: Optional[ProgressStep]  # None for the progress of the job itself
+    value: int
+    max: int
+    delta: int  # the change of `value` since the previous snapshot
+
+
+@dataclass
+class StepFinished(ProgressEvent):
+    """
+    A step of the job has finished successfully.
+    """
+
+    step: ProgressStep
+
+
+@dataclass
+class StepFailed(ProgressEvent):
+    """
+    A step of the job has failed, or has been canceled.
+    """
+
+    step: ProgressStep
+
+
+@dataclass
+class JobFinished(ProgressEvent):
+    """
+    The job has ended, either successfully or not. This is the last event of a job.
+    """
+
+    status: ProgressStatus
+
+
+def _started(x: Union[JobProgress, ProgressStep, None]) -> bool:
+    return x is not None and (x.start_date is not None or x.status in _STARTED)
+
+
+def _ended(x: Union[JobProgress, ProgressStep, None]) -> bool:
+    return x is not None and (x.end_date is not None or x.status in _ENDED)
+
+
+def _progress_updated(
+    job: JobProgress,
+    step: Optional[ProgressStep],
+    previous: Union[JobProgress, ProgressStep, None],
+    current: Union[JobProgress, ProgressStep],
+) -> list[ProgressUpdated]:
+    old = previous.progress if previous is not None else None
+    new = current.progress
+    if new is None or new.value is None or not new.max:
+        return []
+    if old is not None and (old.value, old.max) == (new.value, new.max):
+        return []
+    old_value = (old.value or 0) if old is not None else 0
+    return [ProgressUpdated(job, step, new.value, new.max, new.value - old_value)]
+
+
+def diff_progress(
+    previous: Optional[JobProgress], current: JobProgress
+) -> list[ProgressEvent]:
+    """
+    Derive the events, that lead from one snapshot of a job's progress to the next.
+
+    Args:
+        previous: The previous snapshot, or None for the first one.
+        current: The current snapshot.
+
+    Returns:
+        list[ProgressEvent]: The events, ordered from the job to its steps, and ending with `JobFinished`, if the
+        job has ended.
+    """
+    events = []
+    if _started(current) and not _started(previous):
+        events.append(JobStarted(current))
+    events += _progress_updated(current, None, previous, current)
+    previous_steps = {s.id: s for s in (previous.steps or [])} if previous else {}
+    for step in current.steps or []:
+        previous_step = previous_steps.get(step.id)
+        if _started(step) and not _started(previous_step):
+            events.append(StepStarted(current, step))
+        events += _progress_updated(current, step, previous_step, step)
+        if _ended(step) and not _ended(previous_step):
+            failed = step.status in (ProgressStatus.failed, ProgressStatus.canceled)
+            events.append((StepFailed if failed else StepFinished)(current, step))
+    if _ended(current) and not _ended(previous):
+        status = current.status if current.status in _ENDED else ProgressStatus.done
+        events.append(JobFinished(current, status))
+    return events
+
+
+def job_events(
+    get_progress: Callable[[], JobProgress],
+    interval: float,
+    job: Optional[JobProgress] = None,
+) -> Iterator[ProgressEvent]:
+    """
+    Poll the progress of a job, and yield its events until it has ended.
+
+    Args:
+        get_progress: A function that retrieves the progress of the job.
+        interval: The interval in seconds to poll the job progress, with a minimum of 1 second.
+        job: The current progress of the job, if already retrieved. It is used as first snapshot instead of polling.
+
+    Returns:
+        Iterator[ProgressEvent]: The events of the job, ending with `JobFinished`.
+    """
+    interval = max(interval, 1)
+    previous, current = None, job if job is not None else get_progress()
+    while True:
+        yield from diff_progress(previous, current)
+        if _ended(current):
+            return
+        time.sleep(interval)
+        # a copy is kept, as `get_progress` may return the same, updated object; the client is shared, not copied
+        previous = copy.deepcopy(current, {id(current.client): current.client})
+        current = get_progress()
+
+
+def _seconds(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    return (end - start).total_seconds() if start and end else None
+
+
+def _timeline_rows(job: JobProgress) -> list[dict]:
+    steps = job.steps or []
+    lanes = [step.model_label or "common" for step in steps]
+    rows, predecessors = [], []
+    for i, step in enumerate(steps):
+        # a step is ready to start, once the preceding steps of its model, and the preceding common steps, have
+        # ended; common steps wait for the steps of all models
+        preceding = [
+            j
+            for j in range(i)
+            if step.start_date is not None
+            and steps[j].end_date is not None
+            and steps[j].end_date <= step.start_date
+            and (lanes[j] == lanes[i] or "common" in (lanes[i], lanes[j]))
+        ]
+        predecessor = max(preceding, key=lambda j: steps[j].end_date, default=None)
+        predecessors.append(predecessor)
+        ready = (
+            steps[predecessor].end_date if predecessor is not None else job.start_date
+        )
+        rows.append(
+            {
+                "step_id": step.id,
+                "model_label": step.model_label,
+                "step_code": step.step_code.value if step.step_code else None,
+                "compute_name": step.compute_name,
+                "restarts": step.restarts or 0,
+                "status": step.status.value if step.status else None,
+                "ready_date": ready,
+                "start_date": step.start_date,
+                "end_date": step.end_date,
+                "queue_seconds": _seconds(ready, step.start_date),
+                "duration_seconds": _seconds(step.start_date, step.end_date),
+                "critical": False,
+            }
+        )
+    # the critical path leads from the start of the job to the step that has ended last
+    ended = [i for i, step in enumerate(steps) if step.end_date is not None]
+    current = max(ended, key=lambda i: steps[i].end_date, default=None)
+    while current is not None:
+        rows[current]["critical"] = True
+        current = predecessors[current]
+    return rows
+
+
+def _chrome_trace(job: JobProgress, rows: list[dict]) -> dict[str, Any]:
+    starts = [row["ready_date"] or row["start_date"] for row in rows]
+    origin = job.start_date or min((s for s in starts if s is not None), default=None)
+    tids = {
+        lane: tid
+        for tid, lane in enumerate(
+            dict.fromkeys(r["model_label"] or "common" for r in rows), 1
+        )
+    }
+    events = [
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": f"job {job.id}"}}
+    ]
+    events += [
+        {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane}}
+        for lane, tid in tids.items()
+    ]
+    for row in rows:
+        if row["start_date"] is None or origin is None:
+            continue
+        tid = tids[row["model_label"] or "common"]
+        if row["queue_seconds"]:
+            events.append(
+                {
+                    "name": "queued",
+                    "cat": "queue",
+                    "ph": "X",
+                    "ts": _seconds(origin, row["ready_date"]) * 1e6,
+                    "dur": row["queue_seconds"] * 1e6,
+                    "pid": 1,
+                    "tid": tid,
+                }
+            )
+        events.append(
+            {
+                "name": row["step_code"],
+                "cat": "critical" if row["critical"] else "step",
+                "ph": "X",
+                "ts": _seconds(origin, row["start_date"]) * 1e6,
+                "dur": (row["duration_seconds"] or 0) * 1e6,
+                "pid": 1,
+                "tid": tid,
+                "args": {
+                    k: row[k]
+                    for k in (
+                        "step_id",
+                        "compute_name",
+                        "restarts",
+                        "status",
+                        "critical",
+                    )
+                },
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def job_timeline(
+    job: JobProgress, return_type: Literal["dataframe", "chrome"] = "dataframe"
+) -> Union[pd.DataFrame, dict[str, Any]]:
+    """
+    Lay out the steps of a job on a timeline, along with the time they have been waiting to start.
+
+    Args:
+        job: The progress of the job.
+        return_type: Either "dataframe" for one row per step, or "chrome" for a trace in the Chrome trace event
+            format, which can be opened in `chrome://tracing` or in Perfetto.
+
+    Returns:
+        pd.DataFrame | dict[str, Any]: The timeline of the job.
+    """
+    rows = _timeline_rows(job)
+    if return_type == "chrome":
+        return _chrome_trace(job, rows)
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "step_id",
+            "model_label",
+            "step_code",
+            "compute_name",
+            "restarts",
+            "status",
+            "ready_date",
+            "start_date",
+            "end_date",
+            "queue_seconds",
+            "duration_seconds",
+            "critical",
+        ],
+    )
@@ -14,14 +14,31 @@
 
 import io
 import re
+import warnings
 import zipfile
-from typing import Any, Iterator, Optional, Union
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Literal, Optional, Union
 
 import pandas as pd
-
+import pyarrow as pa
+
+from mostlyai.client._base_utils import (
+    DataTables,
+    convert_tables,
+    extract_parquet_archive,
+    index_parquet_parts,
+    parallel_map,
+    read_parquet_archive,
+    read_parquet_parts,
+)
+from mostlyai.client._cache import DiskCache
 from mostlyai.client.base import DELETE, GET, PATCH, POST, Paginator, _MostlyBaseClient
 from mostlyai.domain import (
+    Generator,
     JobProgress,
+    ModelEncodingType,
+    ProgressStatus,
     SyntheticDataset,
     SyntheticDatasetFormat,
     SyntheticDatasetListItem,
@@ -29,12 +46,17 @@ from mostlyai.domain import (
     SyntheticProbeConfig,
     SyntheticDatasetPatchConfig,
 )
-from mostlyai.client._mostly_utils import job_wait
+from mostlyai.client._mostly_utils import job_wait, wait_all
+from mostlyai.client.progress import ProgressEvent, job_events, job_timeline
 
 
 class _MostlySyntheticDatasetsClient(_MostlyBaseClient):
     SECTION = ["synthetic-datasets"]
 
+    def __init__(self, *args, cache: Optional[DiskCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
     # PUBLIC METHODS #
 
     def list(
@@ -150,6 +172,81 @@ class _MostlySyntheticDatasetsClient(_MostlyBaseClient):
         )
         return synthetic_dataset
 
+    def load(
+        self,
+        file_path: Union[str, Path],
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+        columns: Union[List[str], Dict[str, List[str]], None] = None,
+        filters: Union[List, Dict[str, List], None] = None,
+    ) -> DataTables:
+        """
+        Load a previously downloaded synthetic dataset in PARQUET format.
+
+        ZIP archives are read without being extracted. Parquet files, that are stored without compression within
+        the archive, are read from a memory map of the archive, rather than being copied into memory first. Note,
+        that the returned tables are decoded into memory nevertheless, thus use `columns` and `filters` to limit
+        their size, or `extract` and `pyarrow.dataset` to scan datasets, that do not fit into memory.
+        Alternatively, a directory, as created by `extract`, can be loaded as well.
+
+        Example for loading a downloaded synthetic dataset:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            sd = mostly.synthetic_datasets.get('INSERT_YOUR_SYNTHETIC_DATASET_ID')
+            file_path = sd.download(format="PARQUET")
+            tables = mostly.synthetic_datasets.load(file_path, return_type="arrow")
+            ```
+
+        Args:
+            file_path: The path to a downloaded ZIP archive, or to an extracted directory.
+            return_type (Literal["auto", "dict", "arrow", "polars"]): The format of the returned data. "auto" and
+                "dict" return pandas DataFrames, "arrow" returns Arrow tables, and "polars" returns polars DataFrames.
+            columns: The columns to read, either for all tables, or as dictionary per table.
+            filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as
+                dictionary per table.
+
+        Returns:
+            The synthetic dataset as a single table, if it consists of a single table and `return_type` is not
+            "dict". Otherwise, a dictionary mapping table names to tables.
+        """
+        file_path = Path(file_path)
+        if file_path.is_dir():
+            tables = _read_parquet_dir(file_path, columns, filters)
+        else:
+            tables = read_parquet_archive(file_path, columns=columns, filters=filters)
+        return convert_tables(tables, return_type)
+
+    def extract(
+        self,
+        file_path: Union[str, Path],
+        target_dir: Union[str, Path, None] = None,
+    ) -> Path:
+        """
+        Extract a previously downloaded synthetic dataset in PARQUET format into a directory.
+
+        Each table is extracted into a sub-directory of parquet files, so that the result can be scanned directly
+        via `pyarrow.dataset`, or any other parquet reader.
+
+        Example for scanning an extracted synthetic dataset:
+            ```python
+            import pyarrow.dataset as ds
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            path = mostly.synthetic_datasets.extract("synthetic-dataset.zip", "synthetic-dataset")
+            dataset = ds.dataset(path / "INSERT_YOUR_TABLE_NAME", format="parquet")
+            ```
+
+        Args:
+            file_path: The path to a downloaded ZIP archive.
+            target_dir: The directory to extract into. Defaults to the archive's path without its file suffix.
+
+        Returns:
+            The path to the directory containing the extracted tables.
+        """
+        file_path = Path(file_path)
+        target_dir = target_dir or file_path.with_suffix("")
+        return extract_parquet_archive(file_path, target_dir)
+
     # PRIVATE METHODS #
 
     def _update(
@@ -208,29 +305,67 @@ class _MostlySyntheticDatasetsClient(_MostlyBaseClient):
         return content_bytes, filename
 
     def _data(
-        self, synthetic_dataset_id: str, short_lived_file_token: Optional[str]
-    ) -> dict[str, pd.DataFrame]:
+        self,
+        synthetic_dataset_id: str,
+        short_lived_file_token: Optional[str],
+        generation_time: Optional[datetime] = None,
+        columns: Union[List[str], Dict[str, List[str]], None] = None,
+        filters: Union[List, Dict[str, List], None] = None,
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "dict",
+    ) -> DataTables:
+        tables = self._tables(
+            synthetic_dataset_id=synthetic_dataset_id,
+            short_lived_file_token=short_lived_file_token,
+            generation_time=generation_time,
+            columns=columns,
+            filters=filters,
+        )
+        return convert_tables(tables, return_type)
+
+    def _tables(
+        self,
+        synthetic_dataset_id: str,
+        short_lived_file_token: Optional[str],
+        generation_time: Optional[datetime] = None,
+        columns: Union[List[str], Dict[str, List[str]], None] = None,
+        filters: Union[List, Dict[str, List], None] = None,
+    ) -> Dict[str, pa.Table]:
+        # only finished synthetic datasets, identified via their generation time, are cached
+        cache_key = None
+        if self.cache is not None and generation_time is not None:
+            cache_key = (
+                synthetic_dataset_id,
+                generation_time.isoformat(),
+                SyntheticDatasetFormat.parquet.value,
+            )
+            cache_path = self.cache.get(cache_key)
+            if cache_path is not None:
+                tables = _read_cache_entry(cache_path, columns, filters)
+                if tables is not None:
+                    return tables
+                # evicted by a concurrent process, thus download again
         # download pqt
         pqt_zip_bytes, filename = self._download(
             synthetic_dataset_id=synthetic_dataset_id,
             ds_format=SyntheticDatasetFormat.parquet,
             short_lived_file_token=short_lived_file_token,
         )
-        # read each parquet file into a pandas dataframe
+        # read all parquet files concurrently into Arrow tables
         with zipfile.ZipFile(io.BytesIO(pqt_zip_bytes), "r") as z:
-            dir_list = set([name.split("/")[0] for name in z.namelist()])
-            dfs = {}
-            for table in dir_list:
-                pqt_files = [
-                    name
-                    for name in z.namelist()
-                    if name.startswith(f"{table}/") and name.endswith(".parquet")
-                ]
-                dfs[table] = pd.concat(
-                    [pd.read_parquet(z.open(name)) for name in pqt_files], axis=0
-                )
-                dfs[table].name = table
-        return dfs
+            if cache_key is not None:
+                # datasets, that exceed the size limit of the cache, are not cached, and read from memory instead
+                cache_path = self.cache.put(cache_key, z.extractall)
+                if cache_path is not None:
+                    tables = _read_cache_entry(cache_path, columns, filters)
+                    if tables is not None:
+                        return tables
+                    # evicted by a concurrent process, thus read from memory
+            return read_parquet_parts(
+                index_parquet_parts(z.namelist()),
+                read=lambda name: pa.BufferReader(z.read(name)),
+                columns=columns,
+                filters=filters,
+            )
 
     def _generation_start(self, synthetic_dataset_id: str) -> None:
         self.request(verb=POST, path=[synthetic_dataset_id, "generation", "start"])
@@ -246,6 +381,20 @@ class _MostlySyntheticDatasetsClient(_MostlyBaseClient):
         )
         return response
 
+    def _generation_events(
+        self, synthetic_dataset_id: str, interval: float
+    ) -> Iterator[ProgressEvent]:
+        return job_events(
+            lambda: self._generation_progress(synthetic_dataset_id), interval
+        )
+
+    def _generation_timeline(
+        self, synthetic_dataset_id: str, return_type: Literal["dataframe", "chrome"]
+    ) -> Union[pd.DataFrame, dict[str, Any]]:
+        return job_timeline(
+            self._generation_progress(synthetic_dataset_id), return_type
+        )
+
     def _generation_wait(
         self, synthetic_dataset_id: str, progress_bar: bool, interval: float
     ) -> SyntheticDataset:
@@ -258,12 +407,159 @@ class _MostlySyntheticDatasetsClient(_MostlyBaseClient):
         return synthetic_dataset
 
 
+class ShardedSyntheticDataset:
+    """
+    A synthetic dataset, that has been generated as multiple shards, each being a separate synthetic dataset.
+
+    See [`mostly.generate_sharded`](api_client.md#mostlyai.client.api.MostlyAI.generate_sharded) for more details.
+
+    Example for iterating over the shards of a synthetic dataset:
+        ```python
+        from mostlyai import MostlyAI
+        mostly = MostlyAI()
+        sharded = mostly.generate_sharded(generator='INSERT_YOUR_GENERATOR_ID', size=1_000_000_000, shards=100)
+        for df in sharded.iter_data():
+            print(len(df))
+        ```
+    """
+
+    def __init__(self, shards: List[SyntheticDataset]):
+        self.shards = shards
+
+    def __repr__(self) -> str:
+        return f"ShardedSyntheticDataset(shards={[sd.id for sd in self.shards]})"
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def __iter__(self) -> Iterator[SyntheticDataset]:
+        return iter(self.shards)
+
+    @property
+    def generation_status(self) -> ProgressStatus:
+        """
+        The combined generation status of all shards, as of their last reload.
+        """
+        statuses = {sd.generation_status for sd in self.shards}
+        for status in (
+            ProgressStatus.failed,
+            ProgressStatus.canceled,
+            ProgressStatus.in_progress,
+            ProgressStatus.queued,
+            ProgressStatus.on_hold,
+            ProgressStatus.new,
+        ):
+            if status in statuses:
+                return status
+        return ProgressStatus.done
+
+    def reload(self) -> None:
+        """
+        Reload all shards.
+        """
+        parallel_map(lambda sd: sd.reload(), self.shards)
+
+    def start(self) -> None:
+        """
+        Start the generation of all shards.
+        """
+        parallel_map(lambda sd: sd.generation.start(), self.shards)
+        self.reload()
+
+    def wait(self, progress_bar: bool = True, interval: float = 2) -> None:
+        """
+        Poll the generation progress of all shards within a single loop, and wait until all of them have completed.
+
+        Args:
+            progress_bar: If true, displays an overall progress bar, as well as one progress bar per shard.
+            interval: Interval in seconds to poll the job progress.
+        """
+        wait_all(
+            {
+                f"{i + 1}/{len(self.shards)} {sd.id}": sd.generation.progress
+                for i, sd in enumerate(self.shards)
+            },
+            interval=interval,
+            progress_bar=progress_bar,
+        )
+        self.reload()
+
+    def delete(self) -> None:
+        """
+        Delete all shards.
+        """
+        parallel_map(lambda sd: sd.delete(), self.shards)
+
+    def iter_data(
+        self,
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+        columns: Union[List[str], Dict[str, List[str]], None] = None,
+        filters: Union[List, Dict[str, List], None] = None,
+    ) -> Iterator[Any]:
+        """
+        Iterate over the data of all shards. Each shard is only downloaded once the iteration reaches it.
+
+        Args:
+            return_type (Literal["auto", "dict", "arrow", "polars"]): The format of the data of each shard. See
+                `SyntheticDataset.data` for details.
+            columns: The columns to read, either for all tables, or as dictionary per table.
+            filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as
+                dictionary per table.
+
+        Returns:
+            An iterator over the data of the shards.
+        """
+        for sd in self.shards:
+            yield sd.data(return_type=return_type, columns=columns, filters=filters)
+
+    def data(
+        self,
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+        columns: Union[List[str], Dict[str, List[str]], None] = None,
+        filters: Union[List, Dict[str, List], None] = None,
+    ) -> DataTables:
+        """
+        Download all shards, and return their data combined into a single table per table.
+
+        Args:
+            return_type (Literal["auto", "dict", "arrow", "polars"]): The format of the returned data. See
+                `SyntheticDataset.data` for details.
+            columns: The columns to read, either for all tables, or as dictionary per table.
+            filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as
+                dictionary per table.
+
+        Returns:
+            The combined synthetic dataset as a single table, or as a dictionary of tables.
+        """
+        tables = {}
+        for sd in self.shards:
+            shard_tables = sd.client._tables(
+                synthetic_dataset_id=sd.id,
+                short_lived_file_token=sd.metadata.short_lived_file_token,
+                generation_time=sd.generation_time
+                if sd.generation_status == ProgressStatus.done
+                else None,
+                columns=columns,
+                filters=filters,
+            )
+            for table, arrow_table in shard_tables.items():
+                tables.setdefault(table, []).append(arrow_table)
+        tables = {
+            table: pa.concat_tables(arrow_tables, promote_options="default")
+            for table, arrow_tables in tables.items()
+        }
+        return convert_tables(tables, return_type)
+
+
 class _MostlySyntheticProbesClient(_MostlyBaseClient):
     SECTION = ["synthetic-probes"]
 
     def create(
-        self, config: Union[SyntheticProbeConfig, dict[str, Any]]
-    ) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]:
+        self,
+        config: Union[SyntheticProbeConfig, dict[str, Any]],
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "dict",
+        generator: Optional[Generator] = None,
+    ) -> DataTables:
         """
         Create a synthetic probe.
 
@@ -271,13 +567,111 @@ class _MostlySyntheticProbesClient(_MostlyBaseClient):
 
         Args:
             config: Configuration for the synthetic probe.
+            return_type: "auto" and "dict" for pandas DataFrames, "arrow" for Arrow tables, or "polars" for polars
+                DataFrames. Except for "dict", a probe with a single table is returned as that table.
+            generator: The probed generator. If provided, the columns are typed according to their encoding types.
 
         Returns:
-            A dictionary mapping probe names to pandas DataFrames.
+            A single table, or a dictionary mapping probe names to tables.
         """
         dicts = self.request(
             verb=POST,
             path=[],
             json=config,
         )
-        return {dct["name"]: pd.DataFrame(dct["rows"]) for dct in dicts}
+        encoding_types = _get_encoding_types(generator) if generator else {}
+        tables = {
+            dct["name"]: _rows_to_arrow(dct["rows"], encoding_types.get(dct["name"]))
+            for dct in dicts
+        }
+        return convert_tables(tables, return_type)
+
+
+def _read_parquet_dir(
+    path: Path,
+    columns: Union[list[str], dict[str, list[str]], None] = None,
+    filters: Union[list, dict[str, list], None] = None,
+) -> dict[str, pa.Table]:
+    # read the parquet files of an extracted archive, with one sub-directory per table
+    names = [f.relative_to(path).as_posix() for f in path.glob("*/*.parquet")]
+    return read_parquet_parts(
+        index_parquet_parts(names),
+        read=lambda name: pa.memory_map(str(path / name), "r"),
+        columns=columns,
+        filters=filters,
+    )
+
+
+def _read_cache_entry(
+    path: Path,
+    columns: Union[list[str], dict[str, list[str]], None] = None,
+    filters: Union[list, dict[str, list], None] = None,
+) -> Optional[dict[str, pa.Table]]:
+    # read a cached synthetic dataset, or return None, if it has been evicted by a concurrent process meanwhile. As
+    # entries are removed atomically, an evicted entry has either vanished as a whole, or fails to be read.
+    try:
+        tables = _read_parquet_dir(path, columns, filters)
+    except OSError:
+        return None
+    return tables or None
+
+
+_ARROW_TYPES = {
+    ModelEncodingType.tabular_categorical: pa.string(),
+    ModelEncodingType.tabular_character: pa.string(),
+    ModelEncodingType.tabular_lat_long: pa.string(),
+    ModelEncodingType.language_text: pa.string(),
+    ModelEncodingType.tabular_datetime: pa.timestamp("us"),
+    ModelEncodingType.tabular_datetime_relative: pa.timestamp("us"),
+}
+
+
+def _get_encoding_types(
+    generator: Generator,
+) -> dict[str, dict[str, ModelEncodingType]]:
+    return {
+        table.name: {
+            column.name: column.model_encoding_type for column in table.columns or []
+        }
+        for table in generator.tables or []
+    }
+
+
+def _rows_to_arrow(
+    rows: list[dict[str, Any]],
+    encoding_types: Optional[dict[str, ModelEncodingType]] = None,
+) -> pa.Table:
+    # transpose the records to columns, with the keys of all records, as `pa.Table.from_pylist` infers the columns
+    # from the first record only
+    names = list(dict.fromkeys(key for row in rows for key in row))
+    columns = {}
+    for name in names:
+        values = [row.get(name) for row in rows]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # values of mixed types within a column are kept as strings
+            columns[name] = pa.array(
+                [None if v is None else str(v) for v in values], pa.string()
+            )
+    table = pa.table(columns)
+    # apply the column types of the generator, as these can not be inferred from JSON
+    for name, encoding_type in (encoding_types or {}).items():
+        arrow_type = _ARROW_TYPES.get(encoding_type)
+        idx = table.schema.get_field_index(name)
+        if arrow_type is None or idx < 0 or table.column(idx).type == arrow_type:
+            continue
+        if (
+            encoding_type == ModelEncodingType.tabular_categorical
+            and not pa.types.is_null(table.column(idx).type)
+        ):
+            # categories are kept as received, e.g. numeric codes stay numeric, and only columns without any values
+            # are typed as strings
+            continue
+        try:
+            table = table.set_column(idx, name, table.column(idx).cast(arrow_type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            warnings.warn(
+                f"column `{name}` could not be converted to {arrow_type}, and is kept as {table.column(idx).type}"
+            )
+    return table
@@ -19,11 +19,27 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, ClassVar, Union, Literal, Annotated
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    ClassVar,
+    Union,
+    Literal,
+    Annotated,
+    Iterator,
+)
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
 from pydantic import field_validator
-from mostlyai.client._base_utils import convert_to_base64
+from mostlyai.client._base_utils import (
+    DataTables,
+    convert_to_base64,
+    encode_seed,
+    encode_tables,
+)
 from pydantic import Field, RootModel
 
 from mostlyai.client.base import CustomBaseModel
@@ -347,6 +363,9 @@ class Connector(CustomBaseModel):
             - `POSTGRES`: `schema.table`
             - `SNOWFLAKE`: `schema.table`
 
+        If the client has been created with a `metadata_cache_ttl`, then locations are cached in memory for that
+        time. Call `invalidate_cache()` to retrieve fresh locations.
+
         Args:
             prefix: The prefix to filter the results by.
 
@@ -359,6 +378,9 @@ class Connector(CustomBaseModel):
         Retrieve the schema of the table at a connector location.
         Please refer to `locations()` for the format of the location.
 
+        If the client has been created with a `metadata_cache_ttl`, then schemas are cached in memory for that
+        time. Call `invalidate_cache()` to retrieve a fresh schema.
+
         Args:
             location: The location of the table.
 
@@ -367,6 +389,126 @@ class Connector(CustomBaseModel):
         """
         return self.client._schema(connector_id=self.id, location=location)
 
+    def schemas(
+        self, locations: list[str], max_workers: int = 16
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Retrieve the schemas of many tables at once, by sending up to `max_workers` requests concurrently.
+
+        Example for retrieving the schemas of all tables of a database schema:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            c = mostly.connectors.get('INSERT_YOUR_CONNECTOR_ID')
+            schemas = c.schemas(c.locations("public"))
+            ```
+
+        Args:
+            locations: The locations of the tables.
+            max_workers: The maximum number of concurrent requests.
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: The retrieved schemas, keyed by their location.
+        """
+        return self.client._schemas(
+            connector_id=self.id, locations=locations, max_workers=max_workers
+        )
+
+    def walk(
+        self,
+        prefix: str = "",
+        max_depth: Optional[int] = None,
+        concurrency: int = 16,
+        include_schema: bool = False,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Crawl the tree of locations below `prefix` breadth-first, and yield each location as soon as it has been listed.
+
+        Each yielded item is a dictionary with the keys `location`, `depth` (1 for the children of `prefix`) and
+        `is_leaf`, i.e. whether it is a table, respectively file. Locations at `max_depth` are not listed any further,
+        and thus their `is_leaf` is None. Each location is yielded only once, even if it is listed repeatedly. If
+        `include_schema` is true, then leaves additionally carry their `schema`.
+
+        Example for discovering all tables of a connector:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            c = mostly.connectors.get('INSERT_YOUR_CONNECTOR_ID')
+            tables = [item["location"] for item in c.walk() if item["is_leaf"]]
+            ```
+
+        Args:
+            prefix: The location to start crawling from.
+            max_depth: The maximum depth to crawl to. If None, the whole tree is crawled.
+            concurrency: The maximum number of concurrent requests.
+            include_schema: If true, the schemas of all leaves are retrieved as well.
+
+        Returns:
+            Iterator[dict[str, Any]]: An iterator over the crawled locations.
+        """
+        return self.client._walk(
+            connector_id=self.id,
+            prefix=prefix,
+            max_depth=max_depth,
+            concurrency=concurrency,
+            include_schema=include_schema,
+        )
+
+    def generator_config(
+        self,
+        locations: list[str],
+        name: Optional[str] = None,
+        primary_keys: Optional[dict[str, str]] = None,
+        foreign_keys: Optional[dict[str, list[dict[str, Any]]]] = None,
+        max_workers: int = 16,
+    ) -> GeneratorConfig:
+        """
+        Build a generator configuration, that trains on the given tables in place, i.e. without any data passing
+        through the client.
+
+        Primary and foreign keys are taken from the retrieved schemas, i.e. from the columns flagged via
+        `isPrimaryKey`, respectively via `foreignKey` with its `referencedTable`. They can be overridden per location
+        via `primary_keys` and `foreign_keys`. Only foreign keys referencing one of the given tables are kept, and the
+        first of them becomes the context foreign key, unless `is_context` is set explicitly for any of them.
+
+        Example for training a generator on two related tables of a database:
+            ```python
+            from mostlyai import MostlyAI
+            mostly = MostlyAI()
+            c = mostly.connectors.get('INSERT_YOUR_CONNECTOR_ID')
+            config = c.generator_config(
+                ["public.players", "public.batting"],
+                foreign_keys={"public.batting": [{"column": "players_id", "referenced_table": "public.players"}]},
+            )
+            g = mostly.train(config=config)
+            ```
+
+        Args:
+            locations: The locations of the tables.
+            name: Name of the generator.
+            primary_keys: The primary key column per location, overriding the schema.
+            foreign_keys: The foreign keys per location, overriding the schema. Each foreign key is a dictionary with
+                the keys `column`, `referenced_table` (a location or a table name) and optionally `is_context`.
+            max_workers: The maximum number of concurrent requests to retrieve the schemas.
+
+        Returns:
+            GeneratorConfig: The generator configuration.
+        """
+        return self.client._generator_config(
+            connector_id=self.id,
+            locations=locations,
+            name=name,
+            primary_keys=primary_keys,
+            foreign_keys=foreign_keys,
+            max_workers=max_workers,
+        )
+
+    def invalidate_cache(self) -> None:
+        """
+        Discard the cached locations and schemas of this connector.
+        """
+        self.client._invalidate_cache(connector_id=self.id)
+
 
 class ConnectorConfig(CustomBaseModel):
     """
@@ -1286,6 +1428,52 @@ class Accuracy(CustomBaseModel):
         le=1.0,
     )
 
+    @classmethod
+    def compute(
+        cls,
+        original: pd.DataFrame,
+        synthetic: pd.DataFrame,
+        sequence_key: Optional[str] = None,
+        max_pairs: int = 1_000,
+        seed: int = 0,
+    ) -> "Accuracy":
+        """
+        Compute the accuracy of synthetic data locally, without waiting for the model report of a generator.
+
+        Columns are discretized into 10 quantile bins, respectively into their 10 most frequent categories, as
+        derived from the original data. The metrics are thus comparable to, but not identical with, the ones reported
+        by the platform.
+
+        Example for a quick quality gate on a probe:
+            ```python
+            from mostlyai.domain import Accuracy
+            syn = mostly.probe(g, size=10_000)
+            accuracy = Accuracy.compute(original=df, synthetic=syn)
+            assert accuracy.univariate > 0.95
+            ```
+
+        Args:
+            original: The original data.
+            synthetic: The synthetic data. Only the columns that it has in common with the original data are compared.
+            sequence_key: The column that identifies the sequences of sequential data. If set, also the coherence of
+                successive values within the sequences is computed.
+            max_pairs: The maximum number of column pairs, that the bivariate accuracy is computed for. For wider
+                tables, the pairs are sampled.
+            seed: The seed for sampling the column pairs.
+
+        Returns:
+            Accuracy: The overall, univariate, bivariate and coherence accuracy.
+        """
+        from mostlyai.client._accuracy import compute_accuracy
+
+        return compute_accuracy(
+            original,
+            synthetic,
+            sequence_key=sequence_key,
+            max_pairs=max_pairs,
+            seed=seed,
+        )
+
 
 class Similarity(CustomBaseModel):
     """
@@ -1726,16 +1914,18 @@ class SyntheticTableConfiguration(CustomBaseModel):
     @field_validator("sample_seed_dict", mode="before")
     @classmethod
     def validate_dict_before(cls, value):
-        return (
-            convert_to_base64(value, format="jsonl")
-            if isinstance(value, dict)
-            else value
-        )
+        if isinstance(value, dict):
+            return convert_to_base64(value, format="jsonl")
+        if isinstance(value, list):
+            return encode_seed(value, format="jsonl")[0]
+        return value
 
     @field_validator("sample_seed_data", mode="before")
     @classmethod
     def validate_data_before(cls, value):
-        return convert_to_base64(value) if isinstance(value, pd.DataFrame) else value
+        if isinstance(value, (pd.DataFrame, pa.Table)):
+            return encode_seed(value, format="parquet")[0]
+        return value
 
 
 class SyntheticTablePatchConfig(CustomBaseModel):
@@ -2168,22 +2358,23 @@ class Generator(CustomBaseModel):
     def export_to_file(
         self,
         file_path: Union[str, Path, None] = None,
+        progress_bar: bool = True,
     ) -> Path:
         """
         Export generator and save to file.
 
+        The file is streamed to disk. An interrupted export is resumed, when being called again with the same `file_path`.
+
         Args:
             file_path: The file path to save the generator.
+            progress_bar: If true, displays the progress of the download.
 
         Returns:
             The path to the saved file.
         """
-        bytes, filename = self.client._export_to_file(generator_id=self.id)
-        file_path = Path(file_path or ".")
-        if file_path.is_dir():
-            file_path = file_path / filename
-        file_path.write_bytes(bytes)
-        return file_path
+        return self.client._export_to_file(
+            generator_id=self.id, file_path=file_path, progress_bar=progress_bar
+        )
 
     def clone(self, training_status: Literal["NEW", "CONTINUE"] = "NEW") -> "Generator":
         """
@@ -2197,6 +2388,35 @@ class Generator(CustomBaseModel):
         """
         return self.client._clone(generator_id=self.id, training_status=training_status)
 
+    def timeline(
+        self, return_type: Literal["dataframe", "chrome"] = "dataframe"
+    ) -> Union[pd.DataFrame, dict[str, Any]]:
+        """
+        Retrieve the timeline of the training steps, to see where the time of the training went.
+
+        Example for the time spent per step:
+            ```python
+            df = g.timeline()
+            df.groupby("step_code")[["queue_seconds", "duration_seconds"]].sum()
+            ```
+
+        Example for exporting a trace, that can be opened in Perfetto or in `chrome://tracing`:
+            ```python
+            import json
+            with open("training.json", "w") as f:
+                json.dump(g.timeline(return_type="chrome"), f)
+            ```
+
+        Args:
+            return_type (Literal["dataframe", "chrome"]): Either "dataframe" for one row per step, with its model
+                label, compute, restarts, queue and run time, and whether it is on the critical path of the job.
+                Or "chrome" for a trace in the Chrome trace event format.
+
+        Returns:
+            pd.DataFrame | dict: The timeline of the training.
+        """
+        return self.client._training_timeline(self.id, return_type=return_type)
+
     class Training:
         def __init__(self, _generator: "Generator"):
             self.generator = _generator
@@ -2223,6 +2443,20 @@ class Generator(CustomBaseModel):
             """
             return self.generator.client._training_progress(self.generator.id)
 
+        def events(self, interval: float = 2) -> Iterator:
+            """
+            Poll training progress, and yield its changes until training has ended.
+
+            Args:
+                interval: The interval in seconds to poll the job progress.
+
+            Returns:
+                Iterator[ProgressEvent]: The events of the training, as defined in `mostlyai.client.progress`.
+            """
+            return self.generator.client._training_events(
+                self.generator.id, interval=interval
+            )
+
         def wait(self, progress_bar: bool = True, interval: float = 2) -> None:
             """
             Poll training progress and loop until training has completed.
@@ -2250,6 +2484,14 @@ class GeneratorConfig(CustomBaseModel):
         None, description="The tables of a generator"
     )
 
+    @field_validator("tables", mode="before")
+    @classmethod
+    def validate_tables_before(cls, value):
+        # encode DataFrames of all tables concurrently, rather than one by one within SourceTableConfig
+        if isinstance(value, list):
+            value = encode_tables(value, read_paths=False)
+        return value
+
 
 class SyntheticDataset(CustomBaseModel):
     """
@@ -2358,25 +2600,64 @@ class SyntheticDataset(CustomBaseModel):
         return file_path
 
     def data(
-        self, return_type: Literal["auto", "dict"] = "auto"
-    ) -> Union[pd.DataFrame, dict[str, pd.DataFrame]]:
+        self,
+        return_type: Literal["auto", "dict", "arrow", "polars"] = "auto",
+        columns: Union[list[str], dict[str, list[str]], None] = None,
+        filters: Union[list, dict[str, list], None] = None,
+    ) -> DataTables:
         """
         Download synthetic dataset and return as dictionary of pandas DataFrames.
 
+        If the client has been configured with a `cache_dir`, then the data of a finished synthetic dataset is
+        downloaded only once, and subsequently read from disk.
+
+        Example for reading a subset of a synthetic dataset:
+            ```python
+            sd.data(columns=["age", "income"], filters=[("age", ">=", 18)])
+            ```
+
         Args:
-            return_type (Literal["auto", "dict"]): The format of the returned data.
+            return_type (Literal["auto", "dict", "arrow", "polars"]): The format of the returned data. "auto" and
+                "dict" return pandas DataFrames, "arrow" returns Arrow tables, and "polars" returns polars DataFrames.
+                Except for "dict", a synthetic dataset with a single table is returned as that table.
+            columns: The columns to read, either for all tables, or as dictionary per table.
+            filters: Row filters in the format of `pyarrow.parquet.read_table`, either for all tables, or as dictionary per table.
 
         Returns:
-            Union[pd.DataFrame, dict[str, pd.DataFrame]]: The synthetic dataset as a dictionary of pandas DataFrames.
+            The synthetic dataset as a single table, or as a dictionary of tables.
         """
-        dfs = self.client._data(
+        return self.client._data(
             synthetic_dataset_id=self.id,
             short_lived_file_token=self.metadata.short_lived_file_token,
+            generation_time=self.generation_time
+            if self.generation_status == ProgressStatus.done
+            else None,
+            columns=columns,
+            filters=filters,
+            return_type=return_type,
         )
-        if return_type == "auto" and len(dfs) == 1:
-            return list(dfs.values())[0]
-        else:
-            return dfs
+
+    def timeline(
+        self, return_type: Literal["dataframe", "chrome"] = "dataframe"
+    ) -> Union[pd.DataFrame, dict[str, Any]]:
+        """
+        Retrieve the timeline of the generation steps, to see where the time of the generation went.
+
+        Example for the time spent per step:
+            ```python
+            df = sd.timeline()
+            df.groupby("step_code")[["queue_seconds", "duration_seconds"]].sum()
+            ```
+
+        Args:
+            return_type (Literal["dataframe", "chrome"]): Either "dataframe" for one row per step, with its model
+                label, compute, restarts, queue and run time, and whether it is on the critical path of the job.
+                Or "chrome" for a trace in the Chrome trace event format.
+
+        Returns:
+            pd.DataFrame | dict: The timeline of the generation.
+        """
+        return self.client._generation_timeline(self.id, return_type=return_type)
 
     class Generation:
         def __init__(self, _synthetic_dataset: "SyntheticDataset"):
@@ -2406,6 +2687,20 @@ class SyntheticDataset(CustomBaseModel):
                 self.synthetic_dataset.id
             )
 
+        def events(self, interval: float = 2) -> Iterator:
+            """
+            Poll the generation progress, and yield its changes until the process has ended.
+
+            Args:
+                interval: Interval in seconds to poll the job progress.
+
+            Returns:
+                Iterator[ProgressEvent]: The events of the generation, as defined in `mostlyai.client.progress`.
+            """
+            return self.synthetic_dataset.client._generation_events(
+                self.synthetic_dataset.id, interval=interval
+            )
+
         def wait(self, progress_bar: bool = True, interval: float = 2) -> None:
             """
             Poll the generation progress and wait until the process is complete.
@@ -0,0 +1,125 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Run the benchmarks against a local mock server, and report regressions against the stored baseline.
+
+    python -m tests.benchmarks                    # run all benchmarks, and compare them to the baseline
+    python -m tests.benchmarks pagination probe_throughput
+    python -m tests.benchmarks --update-baseline  # store the results as new baseline
+
+Timings depend on the machine, thus the baseline shall be updated on the machine that the benchmarks are compared on.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from mostlyai import MostlyAI
+from tests.benchmarks.benchmarks import BENCHMARKS
+from tests.benchmarks.server import MockServer
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+_KEYS = ("seconds", "throughput", "unit")
+
+
+def run_benchmarks(names: list[str], repeat: int) -> dict[str, dict]:
+    results = {}
+    os.environ.pop("MOSTLY_CACHE_DIR", None)
+    # the output of the client, e.g. its progress bars, is discarded
+    with MockServer() as server, contextlib.redirect_stdout(io.StringIO()):
+        mostly = MostlyAI(base_url=server.url, api_key="mock", metadata_cache_ttl=0)
+        for name in names:
+            setup, unit = BENCHMARKS[name]
+            run = setup(mostly, server)
+            run()  # warm up
+            seconds, units, extras = [], 0, {}
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                units = run()
+                seconds.append(time.perf_counter() - t0)
+                if isinstance(units, tuple):
+                    # benchmarks may report further measurements of their last run
+                    units, extras = units
+            median = statistics.median(seconds)
+            results[name] = {
+                "seconds": median,
+                "throughput": units / median,
+                "unit": unit,
+                **extras,
+            }
+    return results
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], tolerance: float
+) -> list[str]:
+    regressions = []
+    print(
+        f"{'benchmark':<20} {'seconds':>10} {'baseline':>10} {'change':>8}  throughput"
+    )
+    for name, result in results.items():
+        seconds = result["seconds"]
+        base = baseline.get(name, {}).get("seconds")
+        change = f"{seconds / base - 1:+.0%}" if base else "new"
+        flag = ""
+        if base and seconds > base * (1 + tolerance):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<20} {seconds:>10.4f} {base or float('nan'):>10.4f} {change:>8}  "
+            f"{result['throughput']:,.0f} {result['unit']}/s{flag}"
+            + "".join(f"  {k}={v:.4g}" for k, v in result.items() if k not in _KEYS)
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(BENCHMARKS)}")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed runs per benchmark"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative slowdown against the baseline, beyond which a benchmark is reported as regression",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    if unknown := set(args.names) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.names or list(BENCHMARKS), args.repeat)
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    regressions = compare(results, baseline, args.tolerance)
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps(baseline | results, indent=2) + "\n")
+        print(f"Updated {BASELINE_PATH}")
+        return 0
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
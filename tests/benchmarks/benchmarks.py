@@ -0,0 +1,257 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks of the client against the mock server. Each benchmark consists of a `setup`, that is not timed, and of a
+`run`, that is timed, and that returns the number of processed units, e.g. rows or requests.
+"""
+
+import atexit
+import contextlib
+import importlib.util
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import pandas as pd
+
+from mostlyai import MostlyAI
+from mostlyai.client.base import HTTP_LIMITS
+from mostlyai.client.exceptions import APIError
+from mostlyai.client.generators import _MostlyGeneratorsClient
+from mostlyai.client.instrumentation import InMemoryMetrics
+from mostlyai.domain import Accuracy
+from tests.benchmarks.server import MockServer, make_table
+
+Benchmark = tuple[Callable[[MostlyAI, MockServer], Callable[[], int]], str]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str):
+    def register(setup: Callable[[MostlyAI, MockServer], Callable[[], int]]):
+        BENCHMARKS[name] = (setup, unit)
+        return setup
+
+    return register
+
+
+@benchmark("upload_encoding", unit="rows")
+def upload_encoding(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # encode a table to parquet, and send it along with the generator config
+    df = make_table(200_000)
+
+    def run() -> int:
+        mostly.train(data=df, start=False)
+        return len(df)
+
+    return run
+
+
+@benchmark("upload_compressed", unit="rows")
+def upload_compressed(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # as `upload_encoding`, but with the gzip-compressed JSON body
+    client = MostlyAI(base_url=server.url, api_key="mock", request_compression="gzip")
+    metrics = InMemoryMetrics()
+    client.generators.hooks.append(metrics)
+    df = make_table(200_000)
+
+    def run() -> tuple[int, dict]:
+        metrics.reset()
+        client.train(data=df, start=False)
+        [event] = metrics.events()
+        return len(df), {
+            "compression_ratio": event.compression_ratio,
+            "compression_seconds": event.compression_seconds,
+        }
+
+    return run
+
+
+@benchmark("download_decoding", unit="rows")
+def download_decoding(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # download the zipped parquet files of a synthetic dataset, and decode them to a DataFrame
+    g = next(iter(mostly.generators.list(limit=1)))
+    sd = mostly.generate(g.id, size=10, start=False)
+    sd.generation.start()
+    sd.reload()
+    return lambda: len(sd.data())
+
+
+@benchmark("generator_export", unit="bytes")
+def generator_export(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # stream the archive of a generator to disk, and verify its checksums
+    g = mostly.generators.get(next(iter(server.state.generators)))
+    tmp_dir = Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
+
+    def run() -> int:
+        file_path = g.export_to_file(tmp_dir / "generator.mostly", progress_bar=False)
+        return file_path.stat().st_size
+
+    return run
+
+
+@benchmark("generator_import", unit="bytes")
+def generator_import(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # verify the checksums of a generator archive, and upload it in chunks as multipart
+    tmp_dir = Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
+    file_path = tmp_dir / "generator.mostly"
+    file_path.write_bytes(server.state.download)
+
+    def run() -> int:
+        g = mostly.generators.import_from_file(file_path, progress_bar=False)
+        # drop the imported generator, so that other benchmarks are not affected by it
+        with server.state.lock:
+            server.state.generators.pop(g.id)
+            server.state.jobs.pop(g.id)
+        return file_path.stat().st_size
+
+    return run
+
+
+@benchmark("pagination", unit="items")
+def pagination(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # list all generators page by page
+    return lambda: len(list(mostly.generators.list()))
+
+
+@benchmark("polling_overhead", unit="polls")
+def polling_overhead(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # poll the progress of a training job, as done while waiting for it
+    g = mostly.generators.get(next(iter(server.state.generators)))
+
+    def run() -> int:
+        for _ in range(100):
+            g.training.progress()
+        return 100
+
+    return run
+
+
+@benchmark("reload", unit="reloads")
+def reload(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # reload unchanged generators, as done by dashboards, which are revalidated via their ETag
+    metrics = InMemoryMetrics()
+    client = MostlyAI(base_url=server.url, api_key="mock", hooks=[metrics])
+    generators = [client.generators.get(g) for g in list(server.state.generators)[:100]]
+
+    def run() -> tuple[int, dict]:
+        metrics.reset()
+        for g in generators:
+            g.reload()
+        return len(generators), {
+            "response_bytes": sum(e.response_bytes for e in metrics.events())
+        }
+
+    return run
+
+
+def _poll_concurrently(
+    server: MockServer, http_client: httpx.Client
+) -> tuple[int, dict]:
+    # poll the progress of many jobs from many threads, as done by `wait_all`, with a cold client, so that the opened
+    # connections are counted, too
+    metrics = InMemoryMetrics()
+    client = _MostlyGeneratorsClient(
+        base_url=server.url, api_key="mock", hooks=[metrics], http_client=http_client
+    )
+    generator_ids = list(server.state.generators)[:500]
+
+    def poll(generator_id: str) -> None:
+        # failed requests are counted, rather than failing the benchmark
+        with contextlib.suppress(APIError):
+            client._training_progress(generator_id)
+
+    connections = server.state.connections
+    with client, ThreadPoolExecutor(32) as executor:
+        list(executor.map(poll, generator_ids))
+    summary = metrics.summary()
+    return len(generator_ids), {
+        "connections": server.state.connections - connections,
+        "p99_seconds": summary["p99_seconds"].max(),
+        "errors": int(summary["errors"].sum()),
+    }
+
+
+@benchmark("concurrent_polling", unit="polls")
+def concurrent_polling(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # via HTTP/1.1, i.e. with one connection per concurrent request
+    return lambda: _poll_concurrently(server, httpx.Client(limits=HTTP_LIMITS))
+
+
+if importlib.util.find_spec("h2") is not None:
+
+    @benchmark("concurrent_polling_http2", unit="polls")
+    def concurrent_polling_http2(
+        mostly: MostlyAI, server: MockServer
+    ) -> Callable[[], int]:
+        # as `concurrent_polling`, but via HTTP/2, i.e. with all requests being multiplexed over a single connection.
+        # Note, that the synchronous HTTP/2 connections of httpcore are not thread-safe, thus a few requests fail.
+        h2_server = MockServer(server.state, http2=True).start()
+        atexit.register(h2_server.stop)
+        return lambda: _poll_concurrently(
+            h2_server, httpx.Client(http1=False, http2=True, limits=HTTP_LIMITS)
+        )
+
+
+@benchmark("probe_throughput", unit="rows")
+def probe_throughput(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # probe a generator repeatedly, and type the columns by their encoding types
+    g = mostly.generators.get(next(iter(server.state.generators)))
+    return lambda: sum(len(mostly.probe(g, size=1_000)) for _ in range(10))
+
+
+@benchmark("connector_schemas", unit="schemas")
+def connector_schemas(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # fetch the schemas of all locations of a connector, bypassing the metadata cache
+    def run() -> int:
+        mostly.connectors._invalidate_cache("connector")
+        locations = mostly.connectors._locations("connector", "")
+        return len(mostly.connectors._schemas("connector", locations))
+
+    return run
+
+
+@benchmark("local_accuracy", unit="columns")
+def local_accuracy(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # compute the accuracy of a wide table locally, with the column pairs being sampled
+    def wide_table(seed: int) -> pd.DataFrame:
+        tables = [
+            make_table(20_000, seed=seed + i).add_suffix(f"_{i}") for i in range(84)
+        ]
+        return pd.concat(tables, axis=1).iloc[:, :500]
+
+    original, synthetic = wide_table(0), wide_table(1_000)
+
+    def run() -> int:
+        Accuracy.compute(original, synthetic)
+        return original.shape[1]
+
+    return run
+
+
+@benchmark("import_time", unit="imports")
+def import_time(mostly: MostlyAI, server: MockServer) -> Callable[[], int]:
+    # import the package in a fresh interpreter, including the startup time of the interpreter itself
+    def run() -> int:
+        subprocess.run([sys.executable, "-c", "import mostlyai"], check=True)
+        return 1
+
+    return run
@@ -0,0 +1,812 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A local stand-in for the MOSTLY AI API, that serves realistic payloads without doing any actual work.
+
+Its payloads are built from the models of `mostlyai.domain`. Jobs pass through QUEUED, IN_PROGRESS and DONE (or
+FAILED) over time, and latency as well as 429 and 503 responses can be injected. All randomness is seeded, thus probes
+are deterministic. Run it standalone via:
+
+    python -m tests.benchmarks.server --port 8000 --latency 0.05 --error-rate 0.01 --job-seconds 30
+"""
+
+import argparse
+import gzip
+import io
+import json
+import random
+import re
+import socket
+import socketserver
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from mostlyai.domain import (
+    AboutService,
+    BaseResource,
+    CurrentUser,
+    Generator,
+    JobProgress,
+    Metadata,
+    ModelEncodingType,
+    ParallelTrainingJobs,
+    ProgressStatus,
+    ProgressStep,
+    ProgressValue,
+    SourceColumn,
+    SourceTable,
+    StepCode,
+    SyntheticDataset,
+    SyntheticDatasetConfig,
+    SyntheticTable,
+    UserUsage,
+)
+
+
+def make_table(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A table with a typical mix of numeric, categorical, datetime and text columns.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "id": np.arange(n_rows),
+            "age": rng.integers(18, 90, n_rows),
+            "income": rng.normal(50_000, 15_000, n_rows).round(2),
+            "country": rng.choice(["AT", "DE", "CH", "US", "FR"], n_rows),
+            "joined": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 1_500, n_rows), unit="D"),
+            "comment": rng.choice(
+                ["lorem ipsum dolor", "sit amet", "consectetur adipiscing elit"],
+                n_rows,
+            ),
+        }
+    )
+
+
+_ENCODING_TYPES = {
+    "id": ModelEncodingType.tabular_numeric_auto,
+    "age": ModelEncodingType.tabular_numeric_auto,
+    "income": ModelEncodingType.tabular_numeric_auto,
+    "country": ModelEncodingType.tabular_categorical,
+    "joined": ModelEncodingType.tabular_datetime,
+    "comment": ModelEncodingType.language_text,
+}
+_TRAINING_STEPS = [
+    StepCode.pull_training_data,
+    StepCode.analyze_training_data,
+    StepCode.encode_training_data,
+    StepCode.train_model,
+    StepCode.finalize_training,
+]
+_GENERATION_STEPS = [
+    StepCode.generate_data,
+    StepCode.create_data_report,
+    StepCode.finalize_generation,
+]
+_ENDED = (ProgressStatus.done, ProgressStatus.failed, ProgressStatus.canceled)
+
+
+def _dump(model: BaseModel) -> dict:
+    return model.model_dump(by_alias=True, mode="json", exclude_none=True)
+
+
+class Job:
+    """
+    A training or generation job, whose status is derived from the time passed since its start.
+    """
+
+    def __init__(
+        self,
+        steps: list[StepCode],
+        queue_seconds: float,
+        job_seconds: float,
+        fails: bool,
+    ):
+        self.id = str(uuid.uuid4())
+        self.steps = steps
+        self.queue_seconds = queue_seconds
+        self.job_seconds = job_seconds
+        self.fails = fails
+        self.started_at: Optional[float] = None
+        self.canceled_at: Optional[float] = None
+
+    def status(self, now: float) -> tuple[ProgressStatus, float]:
+        # the status, and the share of the job, that has been completed
+        if self.started_at is None:
+            return ProgressStatus.new, 0.0
+        elapsed = (self.canceled_at or now) - self.started_at - self.queue_seconds
+        if self.job_seconds > 0:
+            completed = min(max(elapsed / self.job_seconds, 0.0), 1.0)
+        else:
+            completed = 1.0 if elapsed >= 0 else 0.0
+        if self.canceled_at is not None and completed < 1:
+            return ProgressStatus.canceled, completed
+        if elapsed < 0:
+            return ProgressStatus.queued, 0.0
+        if completed < 1:
+            return ProgressStatus.in_progress, completed
+        return (ProgressStatus.failed if self.fails else ProgressStatus.done), 1.0
+
+    def _date(self, offset: float) -> datetime:
+        # the date at the given seconds after the job has left the queue
+        ts = self.started_at + self.queue_seconds + offset
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+    def progress(self, now: float) -> JobProgress:
+        status, completed = self.status(now)
+        step_seconds = self.job_seconds / len(self.steps)
+        steps = []
+        for i, step_code in enumerate(self.steps):
+            # each step takes an equal share of the job, and the last step is the one to fail
+            step_completed = min(max(completed * len(self.steps) - i, 0.0), 1.0)
+            if step_completed == 1 and not (
+                status == ProgressStatus.failed and i == len(self.steps) - 1
+            ):
+                step_status = ProgressStatus.done
+            elif status == ProgressStatus.in_progress:
+                step_status = (
+                    ProgressStatus.in_progress
+                    if step_completed > 0
+                    else ProgressStatus.queued
+                )
+            else:
+                step_status = status
+            steps.append(
+                ProgressStep(
+                    id=f"{self.id}-{i}",
+                    step_code=step_code,
+                    model_label="data:tabular",
+                    progress=ProgressValue(value=round(step_completed * 100), max=100),
+                    status=step_status,
+                    start_date=self._date(i * step_seconds)
+                    if step_completed > 0 or step_status == ProgressStatus.done
+                    else None,
+                    end_date=self._date((i + 1) * step_seconds)
+                    if step_completed == 1
+                    else None,
+                    error_message="injected failure"
+                    if step_status == ProgressStatus.failed
+                    else None,
+                )
+            )
+        ended = status in (
+            ProgressStatus.done,
+            ProgressStatus.failed,
+            ProgressStatus.canceled,
+        )
+        return JobProgress(
+            id=self.id,
+            start_date=self._date(-self.queue_seconds) if self.started_at else None,
+            end_date=self._date(self.job_seconds * completed) if ended else None,
+            progress=ProgressValue(value=round(completed * 100), max=100),
+            status=status,
+            steps=steps,
+        )
+
+
+class MockState:
+    """
+    The objects held by the mock server, the payloads it serves, and the faults it injects.
+
+    Args:
+        n_generators: The number of generators, that exist from the start.
+        download_rows: The number of rows of each downloaded synthetic dataset.
+        n_locations: The number of locations of each connector.
+        latency: The latency in seconds added to each response.
+        jitter: The maximum random latency in seconds added on top of `latency`.
+        error_rate: The share of requests, that are answered with either 429 or 503.
+        queue_seconds: The time in seconds, that jobs stay QUEUED after their start.
+        job_seconds: The time in seconds, that jobs stay IN_PROGRESS.
+        job_failure_rate: The share of jobs, that end as FAILED.
+        parallel_training_jobs: The limit of parallel training jobs reported for the current user.
+        seed: The seed of all randomness.
+    """
+
+    def __init__(
+        self,
+        n_generators: int = 1_000,
+        download_rows: int = 500_000,
+        n_locations: int = 200,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        queue_seconds: float = 0.0,
+        job_seconds: float = 0.0,
+        job_failure_rate: float = 0.0,
+        parallel_training_jobs: Optional[int] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.queue_seconds = queue_seconds
+        self.job_seconds = job_seconds
+        self.job_failure_rate = job_failure_rate
+        self.parallel_training_jobs = parallel_training_jobs
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.generators: dict[str, Generator] = {}
+        self.synthetic_datasets: dict[str, SyntheticDataset] = {}
+        self.jobs: dict[str, Job] = {}
+        self.connections = 0
+        for i in range(n_generators):
+            generator = self.add_generator({"name": f"generator {i}"})
+            self.jobs[generator.id].started_at = 0.0  # i.e. trained long ago
+        self.download = self._make_archive(make_table(download_rows))
+        self.locations = [f"public.table_{i}" for i in range(n_locations)]
+
+    @staticmethod
+    def _make_archive(df: pd.DataFrame, n_parts: int = 4) -> bytes:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as z:
+            for i, part in enumerate(np.array_split(np.arange(len(df)), n_parts)):
+                pqt = io.BytesIO()
+                df.iloc[part].to_parquet(pqt, index=False)
+                z.writestr(f"data/part.{i:06d}.parquet", pqt.getvalue())
+        return buffer.getvalue()
+
+    def _new_job(self, steps: list[StepCode]) -> Job:
+        with self.lock:
+            fails = self.rng.random() < self.job_failure_rate
+        return Job(steps, self.queue_seconds, self.job_seconds, fails)
+
+    def add_generator(self, config: dict) -> Generator:
+        generator = Generator(
+            id=str(uuid.uuid4()),
+            name=config.get("name") or "generator",
+            training_status=ProgressStatus.new,
+            metadata=Metadata(owner_id="owner", owner_name="Owner"),
+            tables=[
+                SourceTable(
+                    id=str(uuid.uuid4()),
+                    name=table["name"],
+                    total_rows=100_000,
+                    columns=[
+                        SourceColumn(
+                            id=str(uuid.uuid4()),
+                            name=column,
+                            included=True,
+                            model_encoding_type=encoding_type,
+                        )
+                        for column, encoding_type in _ENCODING_TYPES.items()
+                    ],
+                )
+                for table in config.get("tables") or [{"name": "data"}]
+            ],
+        )
+        job = self._new_job(_TRAINING_STEPS)
+        with self.lock:
+            self.generators[generator.id] = generator
+            self.jobs[generator.id] = job
+        return generator
+
+    def add_synthetic_dataset(self, config: dict) -> SyntheticDataset:
+        config = SyntheticDatasetConfig(**config)
+        generator = self.generators.get(config.generator_id)
+        synthetic_dataset = SyntheticDataset(
+            id=str(uuid.uuid4()),
+            generator=BaseResource(id=config.generator_id),
+            name=config.name or "synthetic dataset",
+            generation_status=ProgressStatus.new,
+            metadata=Metadata(owner_id="owner", short_lived_file_token="token"),
+            tables=[
+                SyntheticTable(name=table.name)
+                for table in (generator.tables if generator else [])
+            ],
+        )
+        job = self._new_job(_GENERATION_STEPS)
+        with self.lock:
+            self.synthetic_datasets[synthetic_dataset.id] = synthetic_dataset
+            self.jobs[synthetic_dataset.id] = job
+        return synthetic_dataset
+
+    def get(self, collection: str, object_id: str) -> Optional[BaseModel]:
+        obj = getattr(self, collection).get(object_id)
+        if obj is None:
+            return None
+        # reflect the current status of the job in the object
+        status, _ = self.jobs[object_id].status(time.time())
+        field = "training_status" if collection == "generators" else "generation_status"
+        return obj.model_copy(update={field: status})
+
+    def me(self) -> CurrentUser:
+        now = time.time()
+        running = sum(
+            job.status(now)[0] in (ProgressStatus.queued, ProgressStatus.in_progress)
+            for object_id, job in list(self.jobs.items())
+            if object_id in self.generators
+        )
+        return CurrentUser(
+            id="owner",
+            email="mock@mostly.ai",
+            usage=UserUsage(
+                parallel_training_jobs=ParallelTrainingJobs(
+                    current=running, limit=self.parallel_training_jobs
+                )
+            ),
+        )
+
+    def probe(self, config: dict) -> list[dict]:
+        # the rows are derived deterministically from the generator, the table and the sample size
+        results = []
+        for table in config.get("tables") or [{"name": "data"}]:
+            size = (table.get("configuration") or {}).get("sampleSize") or 1
+            key = f"{config.get('generatorId')}/{table['name']}/{size}"
+            df = make_table(size, seed=zlib.crc32(key.encode()))
+            df["joined"] = df["joined"].astype(str)
+            results.append({"name": table["name"], "rows": df.to_dict("records")})
+        return results
+
+    def inject(self) -> Optional[int]:
+        # sleep for the configured latency, and possibly pick an error status
+        with self.lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            fault = self.rng.random() < self.error_rate
+            status = self.rng.choice([429, 503])
+        if delay > 0:
+            time.sleep(delay)
+        return status if fault else None
+
+
+Route = tuple[str, re.Pattern, Callable[..., Any]]
+
+
+def _handle(
+    state: MockState,
+    routes: list[Route],
+    verb: str,
+    target: str,
+    headers: dict[str, str],
+    body: bytes,
+) -> tuple[int, dict[str, str], bytes]:
+    # serve a single request, independent of the HTTP version; `headers` are keyed by their lower-case names
+    url = urlparse(target)
+    params = {k: v[0] for k, v in parse_qs(url.query).items()}
+    if headers.get("content-encoding") == "gzip":
+        body = gzip.decompress(body)
+    elif headers.get("content-encoding") == "zstd":
+        import zstandard
+
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    if (status := state.inject()) is not None:
+        message = "Too many requests" if status == 429 else "Service unavailable"
+        return _response(status, {"message": message}, {"Retry-After": "1"})
+    for route_verb, pattern, handler in routes:
+        match = pattern.fullmatch(url.path)
+        if route_verb == verb and match:
+            result = handler(state, params, body, *match.groups())
+            break
+    else:
+        result = (404, {"message": f"{verb} {url.path} not found"})
+    if not isinstance(result, tuple):
+        result = (200, result)
+    status, payload, response_headers = (*result, {})[:3]
+    status, response_headers, content = _response(status, payload, response_headers)
+    if verb == "GET" and status == 200 and not isinstance(payload, bytes):
+        # JSON responses carry an ETag of their content, and are not sent again, while they have not changed
+        etag = f'"{zlib.crc32(content):08x}"'
+        response_headers["ETag"] = etag
+        if headers.get("if-none-match") == etag:
+            status, content = 304, b""
+    return status, response_headers, content
+
+
+def _response(
+    status: int, payload: Any, headers: dict[str, str]
+) -> tuple[int, dict[str, str], bytes]:
+    if isinstance(payload, bytes):
+        return status, {"Content-Type": "application/zip"} | headers, payload
+    if isinstance(payload, BaseModel):
+        payload = _dump(payload)
+    return (
+        status,
+        {"Content-Type": "application/json"} | headers,
+        json.dumps(payload).encode(),
+    )
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, which would be delayed on kept-alive connections otherwise
+    disable_nagle_algorithm = True
+    state: MockState
+    routes: list[Route]
+
+    def setup(self) -> None:
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # keep the output of benchmarks clean
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PATCH(self) -> None:
+        self._dispatch("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _read_chunked(self) -> bytes:
+        chunks = []
+        while size := int(self.rfile.readline().split(b";")[0], 16):
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+        # skip any trailers, up to the final empty line
+        while self.rfile.readline().strip():
+            pass
+        return b"".join(chunks)
+
+    def _dispatch(self, verb: str) -> None:
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        if headers.get("transfer-encoding") == "chunked":
+            body = self._read_chunked()
+        else:
+            length = int(headers.get("content-length", 0))
+            body = self.rfile.read(length) if length else b""
+        status, response_headers, content = _handle(
+            self.state, self.routes, verb, self.path, headers, body
+        )
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in response_headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class MockH2Handler(socketserver.BaseRequestHandler):
+    """
+    Serve the mock API via HTTP/2 with prior knowledge, i.e. without TLS and without an upgrade from HTTP/1.1. The
+    streams of a connection are served concurrently, as they are multiplexed by the client. Requires the `h2` package.
+    """
+
+    state: MockState
+    routes: list[Route]
+
+    def setup(self) -> None:
+        with self.state.lock:
+            self.state.connections += 1
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+        # guards the connection, and signals the workers about flow control windows, that have been opened
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def handle(self) -> None:
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+        from h2.events import (
+            ConnectionTerminated,
+            DataReceived,
+            RequestReceived,
+            StreamEnded,
+        )
+        from h2.exceptions import ProtocolError
+
+        config = H2Configuration(client_side=False, header_encoding="utf-8")
+        self.connection = H2Connection(config)
+        with self.condition:
+            self.connection.initiate_connection()
+            self._flush()
+        streams: dict[int, tuple[dict[str, str], list[bytes]]] = {}
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            try:
+                while data := self.request.recv(1 << 16):
+                    with self.condition:
+                        events = self.connection.receive_data(data)
+                        self._flush()
+                        self.condition.notify_all()
+                    for event in events:
+                        if isinstance(event, RequestReceived):
+                            streams[event.stream_id] = (dict(event.headers), [])
+                        elif isinstance(event, DataReceived):
+                            streams[event.stream_id][1].append(event.data)
+                            with self.condition:
+                                self.connection.acknowledge_received_data(
+                                    event.flow_controlled_length, event.stream_id
+                                )
+                                self._flush()
+                        elif isinstance(event, StreamEnded):
+                            headers, body = streams.pop(event.stream_id)
+                            executor.submit(
+                                self._serve, event.stream_id, headers, b"".join(body)
+                            )
+                        elif isinstance(event, ConnectionTerminated):
+                            return
+            except ProtocolError:
+                pass  # e.g. streams opened out of order, which closes the connection
+            finally:
+                with self.condition:
+                    self.closed = True
+                    self.condition.notify_all()
+
+    def _serve(self, stream_id: int, headers: dict[str, str], body: bytes) -> None:
+        from h2.exceptions import StreamClosedError
+
+        status, response_headers, content = _handle(
+            self.state, self.routes, headers[":method"], headers[":path"], headers, body
+        )
+        response_headers = {":status": str(status)} | response_headers
+        response_headers["Content-Length"] = str(len(content))
+        with self.condition:
+            try:
+                self.connection.send_headers(
+                    stream_id,
+                    [(key.lower(), value) for key, value in response_headers.items()],
+                    end_stream=not content,
+                )
+                self._flush()
+                view = memoryview(content)
+                while view:
+                    # wait for the client to open the flow control windows of the connection and the stream
+                    window = self.connection.local_flow_control_window(stream_id)
+                    if window <= 0:
+                        if self.closed:
+                            return
+                        self.condition.wait()
+                        continue
+                    size = min(
+                        len(view), window, self.connection.max_outbound_frame_size
+                    )
+                    self.connection.send_data(
+                        stream_id, view[:size].tobytes(), end_stream=size == len(view)
+                    )
+                    self._flush()
+                    view = view[size:]
+            except (StreamClosedError, OSError):
+                pass  # reset by the client
+
+    def _flush(self) -> None:
+        if data := self.connection.data_to_send():
+            self.request.sendall(data)
+
+
+def _paginate(state: MockState, collection: str, params: dict) -> dict:
+    offset, limit = int(params.get("offset", 0)), int(params.get("limit", 50))
+    ids = list(getattr(state, collection))
+    return {
+        "totalCount": len(ids),
+        "results": [
+            _dump(state.get(collection, object_id))
+            for object_id in ids[offset : offset + limit]
+        ],
+    }
+
+
+def _get(collection: str) -> Callable[..., Any]:
+    def handler(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+        obj = state.get(collection, object_id)
+        return obj if obj is not None else (404, {"message": "not found"})
+
+    return handler
+
+
+def _delete(collection: str) -> Callable[..., Any]:
+    def handler(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+        with state.lock:
+            getattr(state, collection).pop(object_id, None)
+            state.jobs.pop(object_id, None)
+        return 204, b""
+
+    return handler
+
+
+def _start(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+    job = state.jobs.get(object_id)
+    if job is None:
+        return 404, {"message": "not found"}
+    if job.status(time.time())[0] in (
+        ProgressStatus.queued,
+        ProgressStatus.in_progress,
+    ):
+        return 409, {"message": "The job is already running"}
+    job.started_at, job.canceled_at = time.time(), None
+    return 204, b""
+
+
+def _cancel(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+    job = state.jobs.get(object_id)
+    if job is None:
+        return 404, {"message": "not found"}
+    job.canceled_at = time.time()
+    return 204, b""
+
+
+def _progress(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+    job = state.jobs.get(object_id)
+    if job is None:
+        return 404, {"message": "not found"}
+    return job.progress(time.time())
+
+
+def _download(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+    job = state.jobs.get(object_id)
+    if job is None or job.status(time.time())[0] != ProgressStatus.done:
+        return 404, {"message": "The synthetic dataset is not available"}
+    return state.download
+
+
+def _import(state: MockState, params: dict, body: bytes) -> Any:
+    # the multipart body is not parsed, but has to contain a ZIP archive
+    if b"PK\x03\x04" not in body:
+        return 400, {"message": "The file is not a generator archive"}
+    generator = state.add_generator({"name": "imported generator"})
+    state.jobs[generator.id].started_at = 0.0  # i.e. imported as trained
+    return state.get("generators", generator.id)
+
+
+def _export(state: MockState, params: dict, body: bytes, object_id: str) -> Any:
+    job = state.jobs.get(object_id)
+    if object_id not in state.generators or job is None:
+        return 404, {"message": "not found"}
+    if job.status(time.time())[0] != ProgressStatus.done:
+        return 409, {"message": "The generator is not trained"}
+    filename = f"generator-{object_id[:8]}.mostly"
+    return (
+        200,
+        state.download,
+        {"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+_ID = r"([^/]+)"
+ROUTES: list[tuple[str, str, Callable[..., Any]]] = [
+    ("GET", "/api/v2/about", lambda *_: AboutService(version="mock")),
+    ("GET", "/api/v2/users/me", lambda s, *_: s.me()),
+    ("GET", "/api/v2/generators", lambda s, p, b: _paginate(s, "generators", p)),
+    ("POST", "/api/v2/generators", lambda s, p, b: s.add_generator(json.loads(b))),
+    ("POST", "/api/v2/generators/import-from-file", _import),
+    ("GET", f"/api/v2/generators/{_ID}", _get("generators")),
+    ("DELETE", f"/api/v2/generators/{_ID}", _delete("generators")),
+    ("POST", f"/api/v2/generators/{_ID}/training/start", _start),
+    ("POST", f"/api/v2/generators/{_ID}/training/cancel", _cancel),
+    ("GET", f"/api/v2/generators/{_ID}/training", _progress),
+    ("GET", f"/api/v2/generators/{_ID}/export-to-file", _export),
+    ("GET", "/api/v2/synthetic-datasets", lambda s, p, b: _paginate(s, "synthetic_datasets", p)),
+    ("POST", "/api/v2/synthetic-datasets", lambda s, p, b: s.add_synthetic_dataset(json.loads(b))),
+    ("GET", f"/api/v2/synthetic-datasets/{_ID}", _get("synthetic_datasets")),
+    ("DELETE", f"/api/v2/synthetic-datasets/{_ID}", _delete("synthetic_datasets")),
+    ("POST", f"/api/v2/synthetic-datasets/{_ID}/generation/start", _start),
+    ("POST", f"/api/v2/synthetic-datasets/{_ID}/generation/cancel", _cancel),
+    ("GET", f"/api/v2/synthetic-datasets/{_ID}/generation", _progress),
+    ("GET", f"/api/v2/synthetic-datasets/{_ID}/download", _download),
+    ("POST", "/api/v2/synthetic-probes", lambda s, p, b: s.probe(json.loads(b))),
+    ("GET", f"/api/v2/connectors/{_ID}/locations", lambda s, *_: s.locations),
+    ("GET", f"/api/v2/connectors/{_ID}/schema", lambda s, p, b, _: [{"name": c, "type": "VARCHAR"} for c in _ENCODING_TYPES]),
+]  # fmt: skip
+
+
+class MockServer:
+    """
+    Serve the mock API in a background thread, by default on a free local port.
+
+    With `http2`, the API is served via HTTP/2 with prior knowledge, which clients have to be configured for, e.g. via
+    `httpx.Client(http1=False, http2=True)`. Otherwise, it is served via HTTP/1.1.
+
+    Example for running the client against the mock server:
+        ```python
+        with MockServer(MockState(job_seconds=5, error_rate=0.01)) as server:
+            mostly = MostlyAI(base_url=server.url, api_key="mock")
+            mostly.generators.list()
+        ```
+    """
+
+    def __init__(
+        self,
+        state: Optional[MockState] = None,
+        routes: Optional[list] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        http2: bool = False,
+    ):
+        self.state = state or MockState()
+        handler = type(
+            "Handler",
+            (MockH2Handler if http2 else MockHandler,),
+            {
+                "state": self.state,
+                "routes": [
+                    (verb, re.compile(path), fn) for verb, path, fn in routes or ROUTES
+                ],
+            },
+        )
+        server_class = type(
+            "Server",
+            (socketserver.ThreadingTCPServer if http2 else ThreadingHTTPServer,),
+            # cold clients open as many connections at once, as they send concurrent requests
+            {"request_queue_size": 128, "daemon_threads": True},
+        )
+        self._server = server_class((host, port), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--generators", type=int, default=1_000)
+    parser.add_argument("--download-rows", type=int, default=500_000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--queue-seconds", type=float, default=2.0)
+    parser.add_argument("--job-seconds", type=float, default=10.0)
+    parser.add_argument("--job-failure-rate", type=float, default=0.0)
+    parser.add_argument("--parallel-training-jobs", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--http2", action="store_true", help="serve via HTTP/2 with prior knowledge"
+    )
+    args = parser.parse_args()
+    state = MockState(
+        n_generators=args.generators,
+        download_rows=args.download_rows,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        queue_seconds=args.queue_seconds,
+        job_seconds=args.job_seconds,
+        job_failure_rate=args.job_failure_rate,
+        parallel_training_jobs=args.parallel_training_jobs,
+        seed=args.seed,
+    )
+    server = MockServer(state, host=args.host, port=args.port, http2=args.http2).start()
+    print(f"Serving the mock API at {server.url}; stop with Ctrl+C")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mostlyai.domain import Accuracy
+
+
+@pytest.fixture
+def original():
+    rng = np.random.default_rng(0)
+    n = 1_000
+    return pd.DataFrame(
+        {
+            "id": np.repeat(np.arange(n // 5), 5),
+            "age": rng.integers(18, 90, n),
+            "income": np.where(rng.random(n) < 0.1, np.nan, rng.normal(5e4, 1e4, n)),
+            "city": rng.choice(["Vienna", "Graz", "Linz", None], n),
+            "date": pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC"),
+            "step": np.tile(np.arange(5), n // 5),
+        }
+    )
+
+
+def test_identical_data_is_fully_accurate(original):
+    accuracy = Accuracy.compute(original, original, sequence_key="id")
+    assert accuracy.model_dump(exclude_none=True) == {
+        "overall": 1.0,
+        "univariate": 1.0,
+        "bivariate": 1.0,
+        "coherence": 1.0,
+    }
+
+
+def test_accuracy_is_one_minus_tvd():
+    original = pd.DataFrame({"x": ["a", "a", "b", "b"], "y": [1.0, 2.0, 3.0, 4.0]})
+    synthetic = pd.DataFrame({"x": ["a", "a", "a", "b"], "y": [1.0, 2.0, 3.0, 4.0]})
+    accuracy = Accuracy.compute(original, synthetic)
+    # TVD of x is 0.5 * (|0.5 - 0.75| + |0.5 - 0.25|)
+    assert accuracy.univariate == pytest.approx((0.75 + 1.0) / 2)
+    assert accuracy.bivariate == pytest.approx(0.75)
+    assert accuracy.coherence is None
+
+
+def test_accuracy_detects_shifts(original):
+    synthetic = original.assign(
+        income=original["income"] + 2e4,
+        city=original["city"].fillna("Salzburg"),
+        # the steps are shuffled across sequences, thus only their coherence is lost
+        step=original["step"].sample(frac=1, random_state=0).to_numpy(),
+    )
+    accuracy = Accuracy.compute(original, synthetic, sequence_key="id")
+    assert accuracy.univariate < 0.9
+    assert accuracy.coherence < accuracy.univariate
+    # a single column pair out of 10 is sampled
+    sampled = Accuracy.compute(
+        original, synthetic, sequence_key="id", max_pairs=1, seed=1
+    )
+    assert sampled.bivariate != accuracy.bivariate
+    assert sampled.univariate == accuracy.univariate
+
+
+def test_accuracy_requires_common_columns(original):
+    with pytest.raises(ValueError):
+        Accuracy.compute(original, pd.DataFrame({"other": [1]}))
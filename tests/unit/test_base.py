@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import gzip
+import json
 import re
 from unittest import mock
 
@@ -21,6 +23,7 @@ from httpx import NetworkError, Response
 
 from mostlyai.client.base import DEFAULT_BASE_URL, Paginator, _MostlyBaseClient
 from mostlyai.client.exceptions import APIError, APIStatusError
+from mostlyai.client.instrumentation import InMemoryMetrics, RequestHook
 
 
 @pytest.fixture
@@ -102,6 +105,159 @@ class TestMostlyBaseClient:
         assert mock_url.called
         assert response == {"success": True}
 
+    @respx.mock
+    def test_requests_share_connections(self):
+        respx.get("https://app.mostly.ai/api/v2/test").mock(
+            return_value=Response(200, json={"success": True})
+        )
+        client = _MostlyBaseClient(api_key="test_api_key")
+        other = _MostlyBaseClient(
+            api_key="test_api_key", http_client=client._http_client
+        )
+        with mock.patch.object(
+            client._http_client, "request", wraps=client._http_client.request
+        ) as request:
+            client.request(path="test", verb="GET")
+            other.request(path="test", verb="GET")
+        assert request.call_count == 2
+        with client:
+            pass
+        assert client._http_client.is_closed
+
+    @respx.mock
+    def test_request_compression(self):
+        received = []
+
+        def respond(request):
+            received.append(request)
+            return Response(200, json={"success": True})
+
+        respx.post("https://app.mostly.ai/api/v2/test").mock(side_effect=respond)
+        metrics = InMemoryMetrics()
+        client = _MostlyBaseClient(
+            api_key="test_api_key", request_compression="gzip", hooks=[metrics]
+        )
+        large = {"some_data": "A" * 100_000}
+        client.request(path="test", verb="POST", json=large)
+        client.request(path="test", verb="POST", json={"some_data": "A"})
+
+        assert received[0].headers["Content-Encoding"] == "gzip"
+        # the compressed body is streamed, rather than held in memory as a whole
+        assert received[0].headers["Transfer-Encoding"] == "chunked"
+        assert json.loads(gzip.decompress(received[0].content)) == {
+            "someData": "A" * 100_000
+        }
+        assert "Content-Encoding" not in received[1].headers
+        assert json.loads(received[1].content) == {"someData": "A"}
+        compressed, uncompressed = metrics.events()
+        assert compressed.compression_ratio > 100
+        assert compressed.request_bytes == len(received[0].content)
+        assert uncompressed.compression_ratio is None
+        with pytest.raises(ValueError):
+            _MostlyBaseClient(api_key="test_api_key", request_compression="brotli")
+
+    @respx.mock
+    def test_compressed_response_bytes(self):
+        content = gzip.compress(json.dumps({"data": "A" * 100_000}).encode())
+        respx.get("https://app.mostly.ai/api/v2/test").mock(
+            return_value=Response(
+                200, content=content, headers={"Content-Encoding": "gzip"}
+            )
+        )
+        metrics = InMemoryMetrics()
+        client = _MostlyBaseClient(api_key="test_api_key", hooks=[metrics])
+        assert client.request(path="test", verb="GET") == {"data": "A" * 100_000}
+        # the size on the wire is recorded, rather than the decoded size
+        [event] = metrics.events()
+        assert event.response_bytes == len(content)
+
+    @respx.mock
+    def test_conditional_requests(self):
+        route = respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(
+            side_effect=[
+                Response(
+                    200, json={"id": "g1", "name": "one"}, headers={"ETag": '"1"'}
+                ),
+                Response(304),
+                Response(
+                    200, json={"id": "g1", "name": "two"}, headers={"ETag": '"2"'}
+                ),
+            ]
+        )
+        client = _MostlyBaseClient(api_key="test_api_key")
+        first = client.request(path=["generators", "g1"], verb="GET")
+        second = client.request(path=["generators", "g1"], verb="GET")
+        third = client.request(path=["generators", "g1"], verb="GET")
+        assert "If-None-Match" not in route.calls[0].request.headers
+        assert route.calls[1].request.headers["If-None-Match"] == '"1"'
+        assert route.calls[2].request.headers["If-None-Match"] == '"1"'
+        # unchanged resources are served from the cache, as copies
+        assert second == first and second is not first
+        assert third == {"id": "g1", "name": "two"}
+
+    @respx.mock
+    def test_conditional_request_with_replaced_entry(self):
+        client = _MostlyBaseClient(api_key="test_api_key")
+        key = ("https://app.mostly.ai/api/v2/generators/g1", "null")
+
+        def respond(request):
+            # the cached entry is replaced, while the conditional request is in flight
+            client._conditional_cache.put(key, {"ETag": '"2"'}, b'{"name": "two"}')
+            return Response(304)
+
+        client._conditional_cache.put(key, {"ETag": '"1"'}, b'{"name": "one"}')
+        respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(
+            side_effect=respond
+        )
+        # the 304 refers to the body, whose validators have been sent
+        assert client.request(path=["generators", "g1"], verb="GET") == {"name": "one"}
+
+    @respx.mock
+    def test_request_hooks(self):
+        generator_id = "8a8f3a32-7b5c-4e2c-9d2e-1f2a3b4c5d6e"
+        respx.get(f"https://app.mostly.ai/api/v2/generators/{generator_id}").mock(
+            return_value=Response(200, json={"id": generator_id, "tableCount": 1})
+        )
+        respx.get("https://app.mostly.ai/api/v2/generators/0/progress").mock(
+            return_value=Response(503, json={"message": "Unavailable"})
+        )
+        started = []
+        hook = RequestHook()
+        hook.on_request_start = started.append
+        metrics = InMemoryMetrics()
+        client = _MostlyBaseClient(api_key="test_api_key", hooks=[hook, metrics])
+        for _ in range(3):
+            client.request(path=["generators", generator_id], verb="GET")
+        with pytest.raises(APIStatusError):
+            client.request(path=["generators", 0, "progress"], verb="GET")
+
+        assert len(started) == 4
+        [event, *_] = metrics.events()
+        assert event.path == "/api/v2/generators/{id}"
+        assert event.status_code == 200
+        assert event.response_bytes > 0
+        assert event.total_seconds >= event.latency_seconds >= 0
+        summary = metrics.summary().set_index("path")
+        assert summary.loc["/api/v2/generators/{id}", "count"] == 3
+        assert summary.loc["/api/v2/generators/{id}", "errors"] == 0
+        assert summary.loc["/api/v2/generators/{id}/progress", "errors"] == 1
+        metrics.reset()
+        assert metrics.summary().empty
+
+    @respx.mock
+    def test_failing_request_hook(self):
+        respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(
+            return_value=Response(200, json={"id": "g1"})
+        )
+        hook = RequestHook()
+        hook.on_request_start = mock.Mock(side_effect=RuntimeError("broken"))
+        metrics = InMemoryMetrics()
+        client = _MostlyBaseClient(api_key="test_api_key", hooks=[hook, metrics])
+        # the request succeeds, and the remaining hooks are still notified
+        with pytest.warns(UserWarning, match="on_request_start failed"):
+            assert client.request(path=["generators", "g1"], verb="GET") == {"id": "g1"}
+        assert len(metrics.events()) == 1
+
 
 class TestPaginator:
     @respx.mock
@@ -139,3 +295,117 @@ class TestPaginator:
 
         items = list(paginator)
         assert len(items) == 0
+
+
+@respx.mock
+def test_reload_patches_changed_fields():
+    from mostlyai.client.generators import _MostlyGeneratorsClient
+
+    def generator(training_status, total_rows, n_tables=2):
+        tables = [
+            {"id": f"t{i}", "name": f"t{i}", "columns": [], "totalRows": total_rows}
+            for i in range(n_tables)
+        ]
+        return {
+            "id": "g1",
+            "name": "census",
+            "trainingStatus": training_status,
+            "metadata": {},
+            "tables": tables,
+        }
+
+    route = respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(
+        side_effect=[
+            Response(200, json=generator("IN_PROGRESS", None), headers={"ETag": '"1"'}),
+            Response(200, json=generator("DONE", 100), headers={"ETag": '"2"'}),
+            Response(304),
+            Response(200, json=generator("DONE", 100, 3), headers={"ETag": '"3"'}),
+            Response(200, json=generator("DONE", 100, 1), headers={"ETag": '"4"'}),
+        ]
+    )
+    metrics = InMemoryMetrics()
+    client = _MostlyGeneratorsClient(api_key="test_api_key", hooks=[metrics])
+    g = client.get("g1")
+    tables, training = g.tables, g.training
+
+    assert g.reload() == {
+        "training_status",
+        "tables.0.total_rows",
+        "tables.1.total_rows",
+    }
+    assert g.training_status == "DONE"
+    assert g.tables[1].total_rows == 100
+    # the object graph is kept, and helpers still refer to the reloaded instance
+    assert g.tables is tables
+    assert g.training is training and g.training.generator is g
+    # an unchanged generator is not parsed at all
+    assert g.reload() == set()
+    assert route.calls[2].request.headers["If-None-Match"] == '"2"'
+    assert metrics.events()[2].model_seconds == 0
+    # added and removed tables are reported by their index
+    assert g.reload() == {"tables.2"}
+    assert g.tables is tables and len(tables) == 3
+    assert g.reload() == {"tables.1", "tables.2"}
+    assert [t.id for t in g.tables] == ["t0"]
+
+
+@respx.mock
+def test_reload_after_newer_get():
+    from mostlyai.client.generators import _MostlyGeneratorsClient
+
+    def generator(name, training_status="IN_PROGRESS"):
+        return {
+            "id": "g1",
+            "name": name,
+            "trainingStatus": training_status,
+            "metadata": {},
+        }
+
+    route = respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(
+        side_effect=[
+            Response(200, json=generator("one"), headers={"ETag": '"1"'}),
+            Response(200, json=generator("two"), headers={"ETag": '"2"'}),
+            Response(200, json=generator("two"), headers={"ETag": '"2"'}),
+        ]
+    )
+    client = _MostlyGeneratorsClient(api_key="test_api_key")
+    a = client.get("g1")
+    b = client.get("g1")
+    # the cached response of the client is more recent than `a`, thus `a` is reloaded on its own ETag
+    assert a.reload() == {"name"}
+    assert route.calls[2].request.headers["If-None-Match"] == '"1"'
+    assert a.name == b.name == "two"
+
+
+@respx.mock
+def test_training_wait_reloads_status():
+    from mostlyai.client.generators import _MostlyGeneratorsClient
+
+    def generator(training_status):
+        return {
+            "id": "g1",
+            "name": "census",
+            "trainingStatus": training_status,
+            "metadata": {},
+        }
+
+    def respond(request):
+        # the generator is done, once its training is polled as done
+        if request.headers.get("If-None-Match") == f'"{state["etag"]}"':
+            return Response(304)
+        return Response(
+            200,
+            json=generator(state["status"]),
+            headers={"ETag": f'"{state["etag"]}"'},
+        )
+
+    state = {"status": "IN_PROGRESS", "etag": 1}
+    respx.get("https://app.mostly.ai/api/v2/generators/g1").mock(side_effect=respond)
+    respx.get("https://app.mostly.ai/api/v2/generators/g1/training").mock(
+        return_value=Response(200, json={"id": "j1", "status": "DONE", "steps": []})
+    )
+    client = _MostlyGeneratorsClient(api_key="test_api_key")
+    g = client.get("g1")
+    state.update(status="DONE", etag=2)
+    g.training.wait(progress_bar=False, interval=0)
+    assert g.training_status == "DONE"
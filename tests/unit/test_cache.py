@@ -0,0 +1,175 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import shutil
+import zipfile
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import respx
+from httpx import Response
+
+from mostlyai.client._cache import ConditionalCache, DiskCache, TTLCache
+from mostlyai.client.synthetic_datasets import _MostlySyntheticDatasetsClient
+
+
+def _write(content: bytes):
+    def write(path):
+        (path / "file.bin").write_bytes(content)
+
+    return write
+
+
+class TestDiskCache:
+    def test_get_and_put(self, tmp_path):
+        cache = DiskCache(tmp_path)
+        key = ("some_id", "2024-01-01T00:00:00", "PARQUET")
+        assert cache.get(key) is None
+        path = cache.put(key, _write(b"content"))
+        assert cache.get(key) == path
+        assert (path / "file.bin").read_bytes() == b"content"
+        # no temporary directories are left behind
+        assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+    def test_put_existing_entry(self, tmp_path):
+        cache = DiskCache(tmp_path)
+        first = cache.put(("key",), _write(b"first"))
+        second = cache.put(("key",), _write(b"second"))
+        assert first == second
+        assert (first / "file.bin").read_bytes() == b"first"
+
+    def test_lru_eviction(self, tmp_path):
+        cache = DiskCache(tmp_path, size_limit=350)
+        for i, key in enumerate(["a", "b", "c"]):
+            path = cache.put((key,), _write(b"x" * 100))
+            os.utime(path, (i, i))
+        # mark `a` as recently used, so that `b` is evicted instead
+        cache.get(("a",))
+        cache.put(("d",), _write(b"x" * 100))
+        assert cache.get(("b",)) is None
+        for key in ["a", "c", "d"]:
+            assert cache.get((key,)) is not None
+
+    def test_entry_exceeding_size_limit(self, tmp_path):
+        cache = DiskCache(tmp_path, size_limit=150)
+        kept = cache.put(("a",), _write(b"x" * 100))
+        # an entry larger than the limit is not cached, and does not evict others
+        assert cache.put(("b",), _write(b"x" * 200)) is None
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == kept
+        assert [p.name for p in tmp_path.iterdir()] == [kept.name]
+        # the entry just written is kept, even if older entries have to go
+        path = cache.put(("c",), _write(b"x" * 150))
+        assert path.exists() and cache.get(("a",)) is None
+
+    def test_clear(self, tmp_path):
+        cache = DiskCache(tmp_path)
+        cache.put(("key",), _write(b"content"))
+        cache.clear()
+        assert cache.get(("key",)) is None
+
+
+@respx.mock
+def test_synthetic_dataset_tables_cache(tmp_path):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr(
+            "census/part.000000.parquet", pd.DataFrame({"x": [1, 2]}).to_parquet()
+        )
+    route = respx.get(
+        "https://app.mostly.ai/api/v2/synthetic-datasets/sd1/download"
+    ).mock(return_value=Response(200, content=archive.getvalue()))
+    cache = DiskCache(tmp_path)
+    client = _MostlySyntheticDatasetsClient(api_key="test_api_key", cache=cache)
+
+    def tables():
+        tables = client._tables("sd1", None, generation_time=datetime(2024, 1, 1))
+        return {name: table.to_pydict() for name, table in tables.items()}
+
+    # the first call downloads and caches the dataset, and the second one reads it from the cache
+    assert tables() == {"census": {"x": [1, 2]}}
+    assert tables() == {"census": {"x": [1, 2]}}
+    assert route.call_count == 1
+    [entry] = tmp_path.iterdir()
+    assert (entry / "census" / "part.000000.parquet").exists()
+
+    # an entry, that is evicted by a concurrent process after having been looked up, is downloaded again
+    with patch.object(cache, "get", return_value=entry):
+        shutil.rmtree(entry)
+        assert tables() == {"census": {"x": [1, 2]}}
+    assert route.call_count == 2
+
+
+class TestTTLCache:
+    def test_get_or_set(self):
+        cache = TTLCache(ttl=10)
+        fetch = Mock(return_value=[{"name": "id"}])
+        assert cache.get_or_set(("c1", "schema", "t1"), fetch) == [{"name": "id"}]
+        # cached values can not be altered by callers
+        cache.get_or_set(("c1", "schema", "t1"), fetch).append({"name": "other"})
+        assert cache.get_or_set(("c1", "schema", "t1"), fetch) == [{"name": "id"}]
+        assert fetch.call_count == 1
+
+    def test_expiry(self):
+        cache = TTLCache(ttl=10)
+        fetch = Mock(return_value=1)
+        with patch("time.monotonic", return_value=0):
+            cache.get_or_set(("key",), fetch)
+        with patch("time.monotonic", return_value=11):
+            cache.get_or_set(("key",), fetch)
+        assert fetch.call_count == 2
+
+    def test_invalidate(self):
+        cache = TTLCache(ttl=10)
+        fetch = Mock(return_value=1)
+        for key in [
+            ("c1", "schema", "t1"),
+            ("c1", "locations", ""),
+            ("c2", "schema", "t1"),
+        ]:
+            cache.get_or_set(key, fetch)
+        cache.invalidate("c1")
+        for key in [
+            ("c1", "schema", "t1"),
+            ("c1", "locations", ""),
+            ("c2", "schema", "t1"),
+        ]:
+            cache.get_or_set(key, fetch)
+        assert fetch.call_count == 5
+
+    def test_disabled(self):
+        cache = TTLCache(ttl=0)
+        fetch = Mock(return_value=1)
+        cache.get_or_set(("key",), fetch)
+        cache.get_or_set(("key",), fetch)
+        assert fetch.call_count == 2
+
+
+class TestConditionalCache:
+    def test_put_and_lookup(self):
+        cache = ConditionalCache(max_entries=2)
+        cache.put(("url/a", "null"), {"ETag": '"1"'}, b"a")
+        cache.put(("url/b", "null"), {}, b"b")
+        assert cache.lookup(("url/a", "null")) == ({"If-None-Match": '"1"'}, b"a")
+        assert cache.lookup(("url/b", "null")) is None
+        # least recently used entries are evicted
+        cache.put(("url/c", "null"), {"Last-Modified": "Mon"}, b"c")
+        cache.put(("url/d", "null"), {"Last-Modified": "Mon"}, b"d")
+        assert cache.lookup(("url/a", "null")) is None
+        cache.invalidate("url/c")
+        assert cache.lookup(("url/c", "null")) is None
+        assert cache.lookup(("url/d", "null")) == ({"If-Modified-Since": "Mon"}, b"d")
@@ -0,0 +1,177 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import respx
+from httpx import Response
+
+from mostlyai.client.connectors import _MostlyConnectorsClient
+from mostlyai.client.exceptions import APIStatusError
+
+
+@respx.mock
+def test_connector_schemas():
+    route = respx.get("https://app.mostly.ai/api/v2/connectors/c1/schema").mock(
+        side_effect=lambda request: Response(
+            200, json=[{"name": request.url.params["location"]}]
+        )
+    )
+    client = _MostlyConnectorsClient(api_key="test_api_key", metadata_cache_ttl=300)
+    locations = [f"public.table{i}" for i in range(20)]
+    schemas = client._schemas("c1", locations + locations[:5], max_workers=4)
+    assert list(schemas) == locations
+    assert schemas["public.table3"] == [{"name": "public.table3"}]
+    assert route.call_count == 20
+    # subsequent calls are served from the cache, until it is invalidated
+    client._schema("c1", "public.table3")
+    assert route.call_count == 20
+    client._invalidate_cache("c1")
+    client._schema("c1", "public.table3")
+    assert route.call_count == 21
+    # caching is opt-in
+    client = _MostlyConnectorsClient(api_key="test_api_key")
+    client._schema("c1", "public.table3")
+    client._schema("c1", "public.table3")
+    assert route.call_count == 23
+
+
+@respx.mock
+def test_connector_walk():
+    tree = {
+        "": ["bucket"],
+        "bucket": ["bucket/a/", "bucket/b.csv"],
+        "bucket/a/": ["bucket/a/c.csv", "bucket/a/d.csv"],
+    }
+    respx.get("https://app.mostly.ai/api/v2/connectors/c1/locations").mock(
+        side_effect=lambda request: Response(
+            200, json=tree.get(request.url.params["prefix"], [])
+        )
+    )
+    respx.get("https://app.mostly.ai/api/v2/connectors/c1/schema").mock(
+        return_value=Response(200, json=[{"name": "id"}])
+    )
+    client = _MostlyConnectorsClient(api_key="test_api_key")
+    items = {item["location"]: item for item in client._walk("c1", concurrency=4)}
+    assert sorted(items) == [
+        "bucket",
+        "bucket/a/",
+        "bucket/a/c.csv",
+        "bucket/a/d.csv",
+        "bucket/b.csv",
+    ]
+    assert items["bucket/a/"] == {"location": "bucket/a/", "depth": 2, "is_leaf": False}
+    assert items["bucket/a/c.csv"]["depth"] == 3
+    assert items["bucket/a/c.csv"]["is_leaf"]
+
+    items = list(client._walk("c1", prefix="bucket", max_depth=1))
+    assert {item["location"]: item["is_leaf"] for item in items} == {
+        "bucket/a/": None,
+        "bucket/b.csv": None,
+    }
+
+    items = list(client._walk("c1", prefix="bucket/a/", include_schema=True))
+    assert [item["schema"] for item in items] == [[{"name": "id"}]] * 2
+
+    assert list(client._walk("c1", prefix="bucket", max_depth=0)) == []
+
+
+@respx.mock
+def test_connector_walk_errors():
+    # `loop/` lists its parent as a child, and files can not be listed at all
+    tree = {"": ["a/"], "a/": ["a/loop/", "a/b.csv"], "a/loop/": ["a/"]}
+
+    def locations(request):
+        prefix = request.url.params["prefix"]
+        if prefix == "broken/":
+            return Response(500, json={"message": "internal error"})
+        if prefix in tree:
+            return Response(200, json=tree[prefix])
+        return Response(404, json={"message": "not a directory"})
+
+    respx.get("https://app.mostly.ai/api/v2/connectors/c1/locations").mock(
+        side_effect=locations
+    )
+    client = _MostlyConnectorsClient(api_key="test_api_key")
+    items = {item["location"]: item["is_leaf"] for item in client._walk("c1")}
+    assert items == {"a/": False, "a/loop/": False, "a/b.csv": True}
+
+    tree[""] = ["a/", "broken/"]
+    with pytest.raises(APIStatusError):
+        list(client._walk("c1"))
+
+
+@respx.mock
+def test_connector_generator_config():
+    schemas = {
+        "public.players": [{"name": "id", "isPrimaryKey": True}, {"name": "country"}],
+        "public.batting": [
+            {"name": "id", "isPrimaryKey": True},
+            {"name": "players_id", "foreignKey": {"referencedTable": "public.players"}},
+            {"name": "team_id", "foreignKey": {"referencedTable": "public.teams"}},
+        ],
+        "bucket/events.csv": [{"name": "player", "type": "VARCHAR"}],
+    }
+    respx.get("https://app.mostly.ai/api/v2/connectors/c1/schema").mock(
+        side_effect=lambda request: Response(
+            200, json=schemas[request.url.params["location"]]
+        )
+    )
+    client = _MostlyConnectorsClient(api_key="test_api_key")
+    config = client._generator_config(
+        "c1",
+        list(schemas),
+        name="baseball",
+        foreign_keys={
+            "bucket/events.csv": [{"column": "player", "referenced_table": "players"}]
+        },
+    )
+    assert config.name == "baseball"
+    tables = {t.name: t for t in config.tables}
+    assert list(tables) == ["players", "batting", "events"]
+    assert all(t.source_connector_id == "c1" for t in config.tables)
+    assert tables["events"].location == "bucket/events.csv"
+    assert tables["players"].primary_key == "id"
+    assert tables["players"].foreign_keys is None
+    # the foreign key to the table, that is not part of the config, is dropped
+    [fk] = tables["batting"].foreign_keys
+    assert (fk.column, fk.referenced_table, fk.is_context) == (
+        "players_id",
+        "players",
+        True,
+    )
+    assert tables["events"].primary_key is None
+    assert tables["events"].foreign_keys[0].referenced_table == "players"
+
+    # an explicit `is_context=False` is kept
+    config = client._generator_config(
+        "c1",
+        list(schemas),
+        foreign_keys={
+            "public.batting": [
+                {
+                    "column": "players_id",
+                    "referenced_table": "players",
+                    "is_context": False,
+                }
+            ]
+        },
+    )
+    [fk] = [t for t in config.tables if t.name == "batting"][0].foreign_keys
+    assert fk.is_context is False
+
+    # related tables without any keys are most likely a mistake
+    schemas = {"public.a": [{"name": "id"}], "public.b": [{"name": "a_id"}]}
+    with pytest.warns(UserWarning, match="no primary or foreign keys"):
+        config = client._generator_config("c1", list(schemas))
+    assert all(t.foreign_keys is None for t in config.tables)
@@ -0,0 +1,109 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+from mostlyai.client.pipelines import Pipeline
+from mostlyai.domain import (
+    Generator,
+    JobProgress,
+    Metadata,
+    ProgressStatus,
+    SourceTable,
+)
+
+
+def _job(statuses):
+    statuses = iter(statuses)
+    return lambda: JobProgress(status=next(statuses))
+
+
+def _generator(name, training_statuses):
+    g = Generator(
+        id=f"{name}_id",
+        name=name,
+        training_status=ProgressStatus.in_progress,
+        metadata=Metadata(),
+        tables=[SourceTable(id="table_id", name="data", columns=[])],
+    )
+    g.training = Mock()
+    g.training.progress.side_effect = _job(training_statuses)
+    return g
+
+
+def test_pipeline():
+    generators = {
+        "census": _generator(
+            "census", [ProgressStatus.in_progress, ProgressStatus.done]
+        ),
+        "failing": _generator("failing", [ProgressStatus.failed]),
+    }
+    created_configs = []
+
+    def create(config):
+        # the generator must be done at the moment its synthetic dataset gets created
+        assert generators["census"].training.progress.call_count == 2
+        created_configs.append(config)
+        sd = Mock()
+        sd.generation.progress.side_effect = _job([ProgressStatus.done])
+        return sd
+
+    client = Mock()
+    client.train.side_effect = lambda name, **kwargs: generators[name]
+    client.synthetic_datasets.create.side_effect = create
+
+    pipeline = Pipeline(client)
+    census = pipeline.train(data=pd.DataFrame(), name="census")
+    failing = pipeline.train(data=pd.DataFrame(), name="failing")
+    step = pipeline.generate(census, seed=pd.DataFrame({"age": [42]}))
+    skipped = pipeline.generate(failing, size=10)
+    with patch("time.sleep"):
+        pipeline.run(progress_bar=False)
+
+    assert census.status == ProgressStatus.done
+    assert failing.status == ProgressStatus.failed
+    assert step.status == ProgressStatus.done
+    assert step.synthetic_dataset.generation.start.called
+    assert skipped.status == ProgressStatus.canceled
+    assert skipped.synthetic_dataset is None
+    # the seed has been encoded ahead of the creation of the synthetic dataset
+    assert len(created_configs) == 1
+    assert isinstance(created_configs[0].tables[0].configuration.sample_seed_data, str)
+
+
+def test_pipeline_retries_polling():
+    flaky = _generator("flaky", [])
+    flaky.training.progress.side_effect = [
+        ConnectionError("connection reset"),
+        JobProgress(status=ProgressStatus.done),
+    ]
+    broken = _generator("broken", [])
+    broken.training.progress.side_effect = ConnectionError("connection refused")
+    generators = {"flaky": flaky, "broken": broken}
+    client = Mock()
+    client.train.side_effect = lambda name, **kwargs: generators[name]
+
+    pipeline = Pipeline(client)
+    flaky_step = pipeline.train(data=pd.DataFrame(), name="flaky")
+    broken_step = pipeline.train(data=pd.DataFrame(), name="broken")
+    with patch("time.sleep"):
+        pipeline.run(progress_bar=False, max_poll_errors=2)
+
+    # a transient error does not abort the pipeline, while persistent errors fail the step
+    assert flaky_step.status == ProgressStatus.done
+    assert broken_step.status == ProgressStatus.failed
+    assert broken_step.error == "connection refused"
+    assert broken.training.progress.call_count == 3
@@ -0,0 +1,177 @@
+# Copyright 2024 MOSTLY AI
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from mostlyai.client.progress import (
+    JobFinished,
+    JobStarted,
+    ProgressUpdated,
+    StepFailed,
+    StepFinished,
+    StepStarted,
+    diff_progress,
+    job_events,
+    job_timeline,
+)
+from mostlyai.domain import (
+    JobProgress,
+    ProgressStatus,
+    ProgressStep,
+    ProgressValue,
+    StepCode,
+)
+
+
+def snapshot(value: int, *step_statuses: ProgressStatus) -> JobProgress:
+    ended = all(s == ProgressStatus.done for s in step_statuses)
+    return JobProgress(
+        id="job",
+        status=ProgressStatus.done if ended else ProgressStatus.in_progress,
+        progress=ProgressValue(value=value, max=4),
+        steps=[
+            ProgressStep(
+                id=f"step{i}",
+                step_code=StepCode.train_model,
+                status=status,
+                progress=ProgressValue(
+                    value=2 if status == ProgressStatus.done else 0, max=2
+                ),
+            )
+            for i, status in enumerate(step_statuses)
+        ],
+    )
+
+
+def describe(events) -> list[tuple]:
+    return [
+        (
+            type(e).__name__,
+            getattr(e, "step", None) and e.step.id,
+            getattr(e, "delta", None),
+        )
+        for e in events
+    ]
+
+
+def test_diff_progress():
+    queued, running, done = (
+        ProgressStatus.queued,
+        ProgressStatus.in_progress,
+        ProgressStatus.done,
+    )
+    first = snapshot(0, running, queued)
+    assert describe(diff_progress(None, first)) == [
+        ("JobStarted", None, None),
+        ("ProgressUpdated", None, 0),
+        ("StepStarted", "step0", None),
+        ("ProgressUpdated", "step0", 0),
+        ("ProgressUpdated", "step1", 0),
+    ]
+    # unchanged snapshots do not yield any events
+    assert diff_progress(first, snapshot(0, running, queued)) == []
+    second = snapshot(2, done, running)
+    assert describe(diff_progress(first, second)) == [
+        ("ProgressUpdated", None, 2),
+        ("ProgressUpdated", "step0", 2),
+        ("StepFinished", "step0", None),
+        ("StepStarted", "step1", None),
+    ]
+    events = diff_progress(second, snapshot(4, done, done))
+    assert describe(events) == [
+        ("ProgressUpdated", None, 2),
+        ("ProgressUpdated", "step1", 2),
+        ("StepFinished", "step1", None),
+        ("JobFinished", None, None),
+    ]
+    assert events[-1].status == ProgressStatus.done
+
+
+def test_job_events():
+    snapshots = [
+        snapshot(0, ProgressStatus.in_progress),
+        snapshot(0, ProgressStatus.failed),
+        JobProgress(status=ProgressStatus.failed, steps=[]),
+    ]
+    for s in snapshots:
+        s.client = threading.Lock()  # as retrieved by a client, which cannot be copied
+    snapshots = iter(snapshots)
+    with patch("time.sleep") as sleep:
+        events = list(job_events(lambda: next(snapshots), interval=0))
+    assert [type(e) for e in events] == [
+        JobStarted,
+        ProgressUpdated,
+        StepStarted,
+        ProgressUpdated,
+        StepFailed,
+        JobFinished,
+    ]
+    assert events[-1].status == ProgressStatus.failed
+    # the job is polled at least every second, and not anymore once it has ended
+    assert [c.args for c in sleep.call_args_list] == [(1,), (1,)]
+    assert not any(isinstance(e, StepFinished) for e in events)
+
+
+def test_job_timeline():
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def step(code, label, start, end, restarts=0):
+        return ProgressStep(
+            id=f"{label}-{code.value}",
+            step_code=code,
+            model_label=label,
+            start_date=t0 + timedelta(seconds=start),
+            end_date=t0 + timedelta(seconds=end),
+            restarts=restarts,
+            status=ProgressStatus.done,
+        )
+
+    # two models are trained in parallel, after the data has been pulled, and the job is finalized after both
+    job = JobProgress(
+        id="job",
+        start_date=t0,
+        end_date=t0 + timedelta(seconds=100),
+        status=ProgressStatus.done,
+        steps=[
+            step(StepCode.pull_training_data, None, 5, 10),
+            step(StepCode.train_model, "a:tabular", 10, 40),
+            step(StepCode.train_model, "b:tabular", 30, 90, restarts=1),
+            step(StepCode.finalize_training, None, 90, 100),
+        ],
+    )
+    df = job_timeline(job)
+    assert df["queue_seconds"].tolist() == [5, 0, 20, 0]
+    assert df["duration_seconds"].tolist() == [5, 30, 60, 10]
+    assert df["critical"].tolist() == [True, False, True, True]
+    assert df["restarts"].tolist() == [0, 0, 1, 0]
+
+    trace = job_timeline(job, return_type="chrome")
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    threads = {
+        e["tid"]: e["args"]["name"]
+        for e in trace["traceEvents"]
+        if e["name"] == "thread_name"
+    }
+    assert [(e["name"], threads[e["tid"]], e["ts"], e["dur"]) for e in spans] == [
+        ("queued", "common", 0, 5e6),
+        ("PULL_TRAINING_DATA", "common", 5e6, 5e6),
+        ("TRAIN_MODEL", "a:tabular", 10e6, 30e6),
+        ("queued", "b:tabular", 10e6, 20e6),
+        ("TRAIN_MODEL", "b:tabular", 30e6, 60e6),
+        ("FINALIZE_TRAINING", "common", 90e6, 10e6),
+    ]
+    json.dumps(trace)  # the trace is serializable as is
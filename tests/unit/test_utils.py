@@ -16,12 +16,18 @@ import base64
 import io
 import math
 import tempfile
+import threading
+import zipfile
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import patch, Mock, ANY
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import pytest
+import respx
+from httpx import ConnectError, ReadTimeout, Response
 from rich.console import Console
 
 from mostlyai.domain import (
@@ -31,19 +37,48 @@ from mostlyai.domain import (
     ProgressValue,
     StepCode,
     Generator,
+    GeneratorConfig,
     Metadata,
+    ModelEncodingType,
+    SourceColumn,
     SourceTable,
+    SyntheticDataset,
     SyntheticDatasetConfig,
     SyntheticTableConfig,
+    SyntheticTableConfiguration,
     SyntheticProbeConfig,
 )
 from mostlyai.client._base_utils import (
+    convert_tables,
     convert_to_base64,
+    encode_seed,
+    encode_tables,
+    estimate_size,
+    extract_parquet_archive,
+    index_parquet_parts,
+    parallel_map,
+    read_parquet_archive,
+    read_parquet_parts,
     read_table_from_path,
 )
 from mostlyai.client._mostly_utils import (
+    _sample_batches,
+    download_file,
     job_wait,
     harmonize_sd_config,
+    shard_sd_config,
+    subsample_tables,
+    train_queue,
+    upload_file,
+    wait_all,
+)
+from mostlyai.client.api import MostlyAI
+from mostlyai.client.base import POST, _MostlyBaseClient
+from mostlyai.client.exceptions import APIError, APIStatusError
+from mostlyai.client.instrumentation import InMemoryMetrics
+from mostlyai.client.synthetic_datasets import (
+    _MostlySyntheticProbesClient,
+    _rows_to_arrow,
 )
 
 UTILS_MODULE = "mostlyai.utils"
@@ -64,6 +99,176 @@ def test_convert_to_base64():
     pd.testing.assert_frame_equal(df, decoded_df)
 
 
+def test_encode_seed(tmp_path):
+    def decode_parquet(value):
+        return pd.read_parquet(io.BytesIO(base64.b64decode(value)))
+
+    rows = [{"age": 42, "born": datetime(1982, 1, 1)}, {"age": 21, "born": None}]
+    # lists of dictionaries are converted to Parquet via Arrow, as DataFrames are
+    value, format = encode_seed(rows * 100)
+    assert format == "parquet"
+    seed = decode_parquet(value)
+    assert seed["age"].tolist() == [42, 21] * 100
+    assert seed["born"].iloc[0] == pd.Timestamp(1982, 1, 1)
+
+    # JSONL is written column by column, as it has been before
+    value, format = encode_seed(rows, format="jsonl")
+    assert format == "jsonl"
+    assert base64.b64decode(value).decode().splitlines() == [
+        '{"age":42,"born":"1982-01-01T00:00:00.000"}',
+        '{"age":21,"born":null}',
+    ]
+
+    # numpy scalars keep their types
+    value, format = encode_seed(
+        [
+            {
+                "n": np.int64(5),
+                "f": np.float32(0.5),
+                "b": np.bool_(True),
+                "t": np.datetime64("2024-01-01T10:00"),
+            }
+        ]
+    )
+    assert format == "parquet"
+    assert decode_parquet(value).iloc[0].to_dict() == {
+        "n": 5,
+        "f": 0.5,
+        "b": True,
+        "t": pd.Timestamp("2024-01-01T10:00"),
+    }
+
+    df = pd.DataFrame({"age": [42, 21]})
+    for seed in [df, pa.Table.from_pandas(df)]:
+        value, format = encode_seed(seed)
+        assert format == "parquet"
+        pd.testing.assert_frame_equal(decode_parquet(value), df)
+
+    df.to_parquet(tmp_path / "seed.parquet")
+    value, format = encode_seed(tmp_path / "seed.parquet")
+    assert base64.b64decode(value) == (tmp_path / "seed.parquet").read_bytes()
+
+    # mixed types within a column are kept as JSONL
+    _, format = encode_seed([{"x": 1}, {"x": "a"}] * 100)
+    assert format == "jsonl"
+
+
+def test_parallel_map():
+    assert parallel_map(lambda x: x * 2, range(20), sizes=[10**12] * 20) == [
+        x * 2 for x in range(20)
+    ]
+    assert parallel_map(lambda x: x, []) == []
+
+
+def test_encode_tables(tmp_path):
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    df.to_csv(tmp_path / "from_file.csv", index=False)
+    tables = [
+        {"name": "df", "data": df},
+        {"data": tmp_path / "from_file.csv"},
+        {"name": "connector", "source_connector_id": "some_id"},
+    ]
+    encoded = encode_tables(tables)
+    for table in encoded[:2]:
+        decoded = pd.read_parquet(io.BytesIO(base64.b64decode(table["data"])))
+        pd.testing.assert_frame_equal(decoded, df)
+    assert encoded[1]["name"] == "from_file"
+    assert "data" not in encoded[2]
+    # the provided tables are left untouched
+    assert tables[0]["data"] is df
+    assert "name" not in tables[1]
+
+    # strings are considered to be encoded already, unless paths shall be read
+    tables = [{"name": "encoded", "data": "some_base64_string"}]
+    assert encode_tables(tables, read_paths=False)[0]["data"] == "some_base64_string"
+
+    table = {"name": "df", "data": df}
+    config = GeneratorConfig(tables=[table])
+    assert isinstance(config.tables[0].data, str)
+    assert table["data"] is df
+
+
+def test_estimate_size():
+    df = pd.DataFrame({"a": ["x" * 1_000] * 100})
+    # the strings of object columns are accounted for
+    assert estimate_size(df) > 100_000
+
+    with pytest.raises(ValueError):
+        encode_tables([{"name": "invalid", "data": 123}])
+
+
+def test_read_parquet_parts(tmp_path):
+    for table in ["players", "games"]:
+        (tmp_path / table).mkdir()
+        for i in range(3):
+            df = pd.DataFrame({"id": [2 * i, 2 * i + 1], "name": [f"{table}{i}"] * 2})
+            df.to_parquet(tmp_path / table / f"part.{i:06}.parquet")
+    names = [f.relative_to(tmp_path).as_posix() for f in tmp_path.glob("*/*")]
+    parts = index_parquet_parts(names + ["README.txt"])
+    assert list(parts) == ["games", "players"]
+    assert len(parts["players"]) == 3
+
+    tables = read_parquet_parts(parts, read=lambda name: str(tmp_path / name))
+    assert tables["players"].column("id").to_pylist() == list(range(6))
+
+    tables = read_parquet_parts(
+        parts,
+        read=lambda name: str(tmp_path / name),
+        columns={"players": ["id"], "games": ["name"]},
+        filters=[("id", ">=", 4)],
+    )
+    assert tables["players"].column_names == ["id"]
+    assert tables["players"].num_rows == 2
+    assert tables["games"].column("name").to_pylist() == ["games2", "games2"]
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_read_parquet_archive(tmp_path, compression):
+    df = pd.DataFrame({"id": range(100), "name": ["a", "b"] * 50})
+    zip_path = tmp_path / "synthetic-dataset.zip"
+    with zipfile.ZipFile(zip_path, "w", compression=compression) as z:
+        for i in range(2):
+            buf = io.BytesIO()
+            df.iloc[i * 50 : (i + 1) * 50].to_parquet(buf)
+            z.writestr(f"players/part.{i:06}.parquet", buf.getvalue())
+        z.writestr("README.txt", "not a parquet file")
+
+    tables = read_parquet_archive(zip_path)
+    assert list(tables) == ["players"]
+    pd.testing.assert_frame_equal(tables["players"].to_pandas(), df)
+
+    tables = read_parquet_archive(zip_path, columns=["id"], filters=[("id", "<", 60)])
+    assert tables["players"].column("id").to_pylist() == list(range(60))
+
+    target_dir = extract_parquet_archive(zip_path, tmp_path / "extracted")
+    assert sorted(p.name for p in (target_dir / "players").iterdir()) == [
+        "part.000000.parquet",
+        "part.000001.parquet",
+    ]
+    pd.testing.assert_frame_equal(pd.read_parquet(target_dir / "players"), df)
+
+
+def test_convert_tables():
+    tables = {"players": pa.table({"id": [1, 2]}), "games": pa.table({"id": [3]})}
+    dfs = convert_tables(tables, "auto")
+    assert isinstance(dfs["players"], pd.DataFrame)
+    assert dfs["players"].name == "players"
+    assert convert_tables(tables, "arrow") is tables
+    single = {"players": tables["players"]}
+    assert isinstance(convert_tables(single, "auto"), pd.DataFrame)
+    assert isinstance(convert_tables(single, "dict"), dict)
+    assert convert_tables(single, "arrow") is tables["players"]
+    with pytest.raises(ValueError):
+        convert_tables(tables, "numpy")
+
+
+def test_convert_tables_polars():
+    pl = pytest.importorskip("polars")
+    df = convert_tables({"players": pa.table({"id": [1, 2]})}, "polars")
+    assert isinstance(df, pl.DataFrame)
+    assert df["id"].to_list() == [1, 2]
+
+
 def test_read_table_from_path():
     # Create a temporary CSV file for testing
     delimiters = ",;|\t' :"
@@ -212,3 +417,449 @@ def test__harmonize_sd_config(simple_sd_config):
     assert table.configuration.sample_size == 1234
     assert table.configuration.sample_seed_data == ANY
     assert table.configuration.sample_seed_dict is None
+
+
+def test_shard_sd_config():
+    shards = shard_sd_config(3, size=10)
+    assert [size for size, _, _ in shards] == [4, 3, 3]
+
+    seed = pd.DataFrame({"id": range(5)})
+    shards = shard_sd_config(
+        2, seed={"players": seed, "games": pa.Table.from_pandas(seed)}
+    )
+    assert shards[0][1]["players"]["id"].tolist() == [0, 1, 2]
+    assert shards[1][1]["players"]["id"].tolist() == [3, 4]
+    assert shards[1][1]["games"].column("id").to_pylist() == [3, 4]
+
+    config = SyntheticDatasetConfig(
+        tables=[
+            SyntheticTableConfig(
+                name="players", configuration=SyntheticTableConfiguration(sample_size=7)
+            )
+        ]
+    )
+    shards = shard_sd_config(2, config=config)
+    assert [c.tables[0].configuration.sample_size for _, _, c in shards] == [4, 3]
+    assert config.tables[0].configuration.sample_size == 7
+
+    config.tables[0].configuration.sample_seed_data = "encoded"
+    with pytest.raises(ValueError):
+        shard_sd_config(2, config=config)
+
+    # the number of shards is limited by the smallest sample size, and seed
+    assert len(shard_sd_config(5, size={"players": 10, "games": 2})) == 2
+    assert len(shard_sd_config(5, seed=seed.head(3))) == 3
+    config.tables[0].configuration.sample_seed_data = None
+    config.tables[0].configuration.sample_size = 1
+    assert len(shard_sd_config(5, config=config)) == 1
+
+    # without anything to split, each shard would generate the default sample size
+    with pytest.raises(ValueError):
+        shard_sd_config(2)
+
+
+def test_generate_sharded_deletes_shards_on_failure():
+    with patch.object(MostlyAI, "about"), patch.object(MostlyAI, "me"):
+        mostly = MostlyAI(base_url="https://example.com", api_key="key")
+    generator = Generator(
+        id="g", name="g", training_status=ProgressStatus.done, metadata=Metadata()
+    )
+    created, lock = [], threading.Lock()
+
+    def create(config):
+        # the last of the three shards fails to be created
+        with lock:
+            if len(created) == 2:
+                raise APIError("quota exceeded")
+            sd = Mock(spec=SyntheticDataset)
+            created.append(sd)
+            return sd
+
+    with patch("mostlyai.client.api.harmonize_sd_config"), patch.object(
+        mostly.synthetic_datasets, "create", side_effect=create
+    ):
+        with pytest.raises(APIError):
+            mostly.generate_sharded(generator, shards=3, size=30, start=False)
+    assert len(created) == 2
+    for sd in created:
+        sd.delete.assert_called_once()
+
+
+def test_wait_all():
+    def job(statuses):
+        progresses = iter(
+            JobProgress(status=status, progress=ProgressValue(value=0, max=1))
+            for status in statuses
+        )
+        return lambda: next(progresses)
+
+    with patch("time.sleep"):
+        statuses = wait_all(
+            {
+                "a": job([ProgressStatus.in_progress, ProgressStatus.done]),
+                "b": job([ProgressStatus.failed]),
+            },
+            interval=1,
+            progress_bar=False,
+        )
+    assert statuses == {"a": ProgressStatus.done, "b": ProgressStatus.failed}
+
+
+def test_train_queue():
+    running = set()
+    max_running = 0
+    # the training of `b` fails at its first attempt
+    outcomes = {
+        "a": [ProgressStatus.done],
+        "b": [ProgressStatus.failed, ProgressStatus.done],
+    }
+    outcomes["c"] = [ProgressStatus.done]
+
+    def create(name):
+        g = Mock()
+        g.name, g.id = name, f"{name}_id"
+
+        def start():
+            nonlocal max_running
+            running.add(name)
+            max_running = max(max_running, len(running))
+
+        def progress():
+            running.discard(name)
+            return JobProgress(status=outcomes[name].pop(0))
+
+        g.training.start.side_effect = start
+        g.training.progress.side_effect = progress
+        return g
+
+    with patch("time.sleep"):
+        summary = train_queue(
+            ["a", "b", "c"], create=create, slots=2, max_retries=1, progress_bar=False
+        )
+    assert max_running == 2
+    assert summary["name"].tolist() == ["a", "b", "c"]
+    assert summary["status"].tolist() == ["DONE"] * 3
+    assert summary["attempts"].tolist() == [1, 2, 1]
+    assert summary["upload_seconds"].notna().all()
+
+
+def test_train_queue_retries():
+    running, quota = set(), 2
+    # the restart of `a` is rejected, while `b` uses up the quota, and polling `b` fails twice in a row
+    outcomes = {
+        "a": [ProgressStatus.failed, ProgressStatus.done],
+        "b": [APIError("timeout", do_rich_print=False)] * 2
+        + [ProgressStatus.in_progress, ProgressStatus.done],
+    }
+
+    def create(name):
+        g = Mock()
+        g.name, g.id = name, f"{name}_id"
+
+        def start():
+            if len(running) >= quota:
+                raise APIStatusError("quota exceeded", do_rich_print=False)
+            running.add(name)
+
+        def progress():
+            nonlocal quota
+            outcome = outcomes[name].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            if outcome != ProgressStatus.in_progress:
+                running.discard(name)
+            if outcome == ProgressStatus.failed:
+                quota = 1
+            return JobProgress(status=outcome)
+
+        g.training.start.side_effect = start
+        g.training.progress.side_effect = progress
+        return g
+
+    with patch("time.sleep"):
+        summary = train_queue(
+            ["a", "b"], create=create, slots=2, max_retries=1, progress_bar=False
+        )
+    assert summary["status"].tolist() == ["DONE"] * 2
+    assert summary["attempts"].tolist() == [2, 1]
+    assert summary["error"].isna().all()
+
+
+def test_subsample_tables():
+    players = pd.DataFrame({"id": range(100), "name": [f"p{i}" for i in range(100)]})
+    games = pd.DataFrame({"player_id": [i % 100 for i in range(1000)], "score": 1})
+    tables = [
+        {
+            "name": "players",
+            "data": players,
+            "primary_key": "id",
+            "model_configuration": {"max_sample_size": 10},
+        },
+        {
+            "name": "games",
+            "data": games,
+            "foreign_keys": [
+                {
+                    "column": "player_id",
+                    "referenced_table": "players",
+                    "is_context": True,
+                }
+            ],
+        },
+    ]
+    sampled = subsample_tables(tables, seed=1)
+    sampled_players, sampled_games = sampled[0]["data"], sampled[1]["data"]
+    assert len(sampled_players) == 10
+    assert set(sampled_games["player_id"]) == set(sampled_players["id"])
+    assert len(sampled_games) == 100
+    # the provided tables are left untouched
+    assert tables[0]["data"] is players and tables[1]["data"] is games
+
+    # sampling is reproducible
+    pd.testing.assert_frame_equal(
+        subsample_tables(tables, seed=1)[0]["data"], sampled_players
+    )
+
+
+def test_subsample_tables_from_files(tmp_path):
+    players = pd.DataFrame({"id": range(1_000)})
+    games = pd.DataFrame({"player_id": [i % 1_000 for i in range(5_000)]})
+    players.to_parquet(tmp_path / "players.parquet")
+    games.to_csv(tmp_path / "games.csv", index=False)
+    tables = [
+        {
+            "data": tmp_path / "players.parquet",
+            "primary_key": "id",
+            "model_configuration": {"max_sample_size": 10},
+        },
+        {
+            "data": tmp_path / "games.csv",
+            "foreign_keys": [
+                {
+                    "column": "player_id",
+                    "referenced_table": "players",
+                    "is_context": True,
+                }
+            ],
+        },
+        # unnamed tables are sampled independently of each other
+        {"data": players, "model_configuration": {"max_sample_size": 20}},
+        {"data": players, "model_configuration": {"max_sample_size": 30}},
+    ]
+    with patch("mostlyai.client._mostly_utils.read_table_from_path") as read:
+        sampled = subsample_tables(tables, seed=1)
+    read.assert_not_called()
+    assert [t.get("name") for t in sampled] == ["players", "games", None, None]
+    assert len(sampled[0]["data"]) == 10
+    assert set(sampled[1]["data"]["player_id"]) == set(sampled[0]["data"]["id"])
+    assert len(sampled[1]["data"]) == 50
+    assert [len(t["data"]) for t in sampled[2:]] == [20, 30]
+    # batches are sampled uniformly, and reproducibly
+    batches = (players.iloc[i : i + 100] for i in range(0, 1_000, 100))
+    sample, total = _sample_batches(batches, 500, seed=1)
+    assert total == 1_000 and len(sample) == 500
+    assert sample["id"].is_unique
+    # about half of the sample stems from the first half of the rows
+    assert 200 < (sample["id"] < 500).sum() < 300
+
+
+@respx.mock
+def test_download_file_resumes_partial_file(tmp_path):
+    content = b"0123456789" * 100
+    (tmp_path / "export.bin.part").write_bytes(content[:300])
+    (tmp_path / "export.bin.part.etag").write_text('"v1"')
+
+    def respond(request):
+        assert request.headers["Range"] == "bytes=300-"
+        assert request.headers["If-Range"] == '"v1"'
+        return Response(
+            206,
+            content=content[300:],
+            headers={"Content-Range": f"bytes 300-{len(content) - 1}/{len(content)}"},
+        )
+
+    respx.get("https://app.mostly.ai/api/v2/export").mock(side_effect=respond)
+    client = _MostlyBaseClient(api_key="test_api_key")
+    file_path = download_file(
+        client,
+        path=["export"],
+        file_path=tmp_path / "export.bin",
+        default_filename="unused.bin",
+        progress_bar=False,
+    )
+    assert file_path.read_bytes() == content
+    assert [p.name for p in tmp_path.iterdir()] == ["export.bin"]
+
+
+@respx.mock
+def test_download_file_restarts_changed_file(tmp_path):
+    (tmp_path / "export.bin.part").write_bytes(b"old content")
+    (tmp_path / "export.bin.part.etag").write_text('"v1"')
+    # the file has changed, thus the server ignores the range, and responds with the full content
+    route = respx.get("https://app.mostly.ai/api/v2/export").mock(
+        side_effect=[
+            Response(503),
+            Response(200, content=b"new content", headers={"ETag": '"v2"'}),
+        ]
+    )
+    metrics = InMemoryMetrics()
+    client = _MostlyBaseClient(api_key="test_api_key", hooks=[metrics])
+    with patch("time.sleep"):
+        file_path = download_file(
+            client,
+            path=["export"],
+            file_path=tmp_path / "export.bin",
+            default_filename="unused.bin",
+            progress_bar=False,
+        )
+    assert file_path.read_bytes() == b"new content"
+    # the partial file has been kept after the transient error, and resumed with its ETag
+    assert [call.request.headers["If-Range"] for call in route.calls] == ['"v1"'] * 2
+    # the retry is visible to the hooks
+    assert [(e.status_code, e.attempt) for e in metrics.events()] == [
+        (503, 0),
+        (200, 1),
+    ]
+    assert metrics.summary()[["count", "errors", "retries"]].values.tolist() == [
+        [2, 1, 1]
+    ]
+
+
+@respx.mock
+def test_download_file_into_directory(tmp_path):
+    respx.get("https://app.mostly.ai/api/v2/export").mock(
+        return_value=Response(
+            200,
+            content=b"content",
+            headers={"Content-Disposition": "attachment; filename=generator.mostly"},
+        )
+    )
+    client = _MostlyBaseClient(api_key="test_api_key")
+    file_path = download_file(
+        client,
+        path=["export"],
+        file_path=tmp_path,
+        default_filename="unused.bin",
+        progress_bar=False,
+    )
+    assert file_path == tmp_path / "generator.mostly"
+    assert file_path.read_bytes() == b"content"
+
+
+@respx.mock
+def test_upload_file(tmp_path):
+    file_path = tmp_path / "generator.mostly"
+    file_path.write_bytes(b"content" * 1000)
+
+    def respond(request):
+        assert b"content" * 1000 in request.read()
+        return Response(200, json={"id": "some_id"})
+
+    respx.post("https://app.mostly.ai/api/v2/import").mock(side_effect=respond)
+    client = _MostlyBaseClient(api_key="test_api_key")
+    response = upload_file(
+        client, path=["import"], file_path=file_path, progress_bar=False, verb=POST
+    )
+    assert response == {"id": "some_id"}
+
+
+@respx.mock
+def test_upload_file_retries_connect_errors_only(tmp_path):
+    file_path = tmp_path / "generator.mostly"
+    file_path.write_bytes(b"content")
+    client = _MostlyBaseClient(api_key="test_api_key")
+
+    route = respx.post("https://app.mostly.ai/api/v2/import").mock(
+        side_effect=[ConnectError("refused"), Response(200, json={"id": "some_id"})]
+    )
+    with patch("time.sleep"):
+        response = upload_file(
+            client, path=["import"], file_path=file_path, progress_bar=False, verb=POST
+        )
+    assert response == {"id": "some_id"} and route.call_count == 2
+
+    # the server may have received the file already, thus the import is not repeated
+    route = respx.post("https://app.mostly.ai/api/v2/import").mock(
+        side_effect=ReadTimeout("timed out")
+    )
+    route.reset()
+    with pytest.raises(APIError):
+        upload_file(
+            client, path=["import"], file_path=file_path, progress_bar=False, verb=POST
+        )
+    assert route.call_count == 1
+
+
+@respx.mock
+def test_probe_columns_typed_by_encoding_type():
+    rows = [
+        {
+            "id": 1,
+            "zip": 1010,
+            "city": "Vienna",
+            "born": "2020-01-01 10:00:00",
+            "age": 3.5,
+        },
+        {"id": 2, "zip": None, "city": None, "born": None, "age": 4, "club": None},
+    ]
+    respx.post("https://app.mostly.ai/api/v2/synthetic-probes").mock(
+        return_value=Response(200, json=[{"name": "players", "rows": rows}])
+    )
+    encoding_types = {
+        "id": ModelEncodingType.tabular_numeric_auto,
+        "zip": ModelEncodingType.tabular_categorical,
+        "city": ModelEncodingType.tabular_categorical,
+        "born": ModelEncodingType.tabular_datetime,
+        "age": ModelEncodingType.tabular_numeric_binned,
+        "club": ModelEncodingType.tabular_categorical,
+    }
+    generator = Generator(
+        id="some_id",
+        training_status=ProgressStatus.done,
+        metadata=Metadata(),
+        tables=[
+            SourceTable(
+                id="table_id",
+                name="players",
+                columns=[
+                    SourceColumn(
+                        id=name, name=name, included=True, model_encoding_type=encoding
+                    )
+                    for name, encoding in encoding_types.items()
+                ],
+            )
+        ],
+    )
+    client = _MostlySyntheticProbesClient(api_key="test_api_key")
+    table = client.create({}, return_type="arrow", generator=generator)
+    assert table.schema.types == [
+        pa.int64(),
+        pa.int64(),
+        pa.string(),
+        pa.timestamp("us"),
+        pa.float64(),
+        pa.string(),
+    ]
+    # numeric categories are not converted to strings
+    assert table.column("zip").to_pylist() == [1010, None]
+
+    df = client.create({})["players"]
+    assert not pd.api.types.is_datetime64_any_dtype(df["born"])
+    assert df["id"].tolist() == [1, 2]
+
+
+def test_probe_rows_to_arrow():
+    # only the column of mixed types is converted to strings
+    table = _rows_to_arrow([{"a": 1, "b": "x"}, {"a": 2, "b": 3}])
+    assert table.column("a").to_pylist() == [1, 2]
+    assert table.column("b").to_pylist() == ["x", "3"]
+    # keys missing in the first record are kept
+    table = _rows_to_arrow([{"a": 1}, {"a": 2, "b": 3}])
+    assert table.to_pylist() == [{"a": 1, "b": None}, {"a": 2, "b": 3}]
+    # values, that can not be converted to the type of their column, are kept as is, with a warning
+    with pytest.warns(UserWarning, match="`born`"):
+        table = _rows_to_arrow(
+            [{"born": "not a date"}],
+            {"born": ModelEncodingType.tabular_datetime},
+        )
+    assert table.column("born").to_pylist() == ["not a date"]
@@ -40,13 +40,16 @@ def postprocess_model_file(file_path):
         # Skip the import line for UUID
         elif "import UUID" in line:
             new_lines.append(
-                "import pandas as pd\nfrom pathlib import Path\n"
-                "from pydantic import field_validator\nfrom mostlyai.client._base_utils import convert_to_base64"
+                "import pandas as pd\nimport pyarrow as pa\nfrom pathlib import Path\n"
+                "from pydantic import field_validator\n"
+                "from mostlyai.client._base_utils import DataTables, convert_to_base64, encode_seed, encode_tables"
             )
         elif "from typing" in line and not import_typing_updated:
             # Append ', ClassVar' to the line if it doesn't already contain ClassVar
             if "ClassVar" not in line:
-                line = line.rstrip() + ", ClassVar, Union, Literal, Annotated\n"
+                line = (
+                    line.rstrip() + ", ClassVar, Union, Literal, Annotated, Iterator\n"
+                )
                 import_typing_updated = True
             new_lines.append(line)
         else: